@@ -1,155 +1,15 @@
-import os  # 导入操作系统模块，用于文件和目录操作
-import pandas as pd  # 导入pandas库，用于数据处理和分析
-import numpy as np  # 导入numpy库，用于数值计算
-import re  # 导入正则表达式模块，用于字符串匹配
+"""预处理时分复用 10s_10ms 数据集
 
-
-"""
-# 该脚本用于处理HPC（高性能计数器）数据文件，提取相关信息并生成CSV格式的输出文件。
-# 主要功能包括解析HPC数据文件、处理数据并将其转换为DataFrame格式，最后保存为CSV文件。
+等价于 python -m hpc_classification preprocess --duration 10s --mode TDM --granularity fine,
+支持 --workers 和 --binary 参数,实现见 hpc_classification.preprocess。
 """
-def parse_hpc_file(file_path):
-    # 提取文件名中的信息
-    filename = os.path.basename(file_path)  # 获取文件名
-    x, y = filename.split('_')[:2]  # 从文件名中提取x和y的值
-    
-    # 读取文件内容
-    data = []  # 存储解析后的数据
-    current_time = None  # 当前时间初始化为None
-    current_values = {}  # 当前值初始化为空字典
-    
-    with open(file_path, 'r') as f:  # 打开文件进行读取
-        for line in f:  # 遍历文件中的每一行
-            if line.startswith('#') or not line.strip():  # 跳过注释行和空行
-                continue
-                
-            parts = line.strip().split()  # 将行内容按空格分割
-            if len(parts) < 3:  # 如果分割后的部分少于3，跳过该行
-                continue
-                
-            # 处理<not counted>的情况
-            if '<not counted>' in line:  # 检查是否包含<not counted>
-                time = float(parts[0])  # 获取时间
-                value = 0  # 设置值为0
-                event = parts[3]  # 获取事件名称
-            else:
-                time = float(parts[0])  # 获取时间
-                value = parts[1]  # 获取值
-                event = parts[2]  # 获取事件名称
-            
-            # 转换数值
-            if value != 0:  # 如果值不为0
-                try:
-                    value = int(value.replace(',', ''))  # 尝试将值转换为整数
-                except ValueError:  # 如果转换失败
-                    value = 0  # 设置值为0
-                
-            if current_time != time:  # 如果当前时间与读取的时间不同
-                if current_time is not None:  # 如果当前时间不为None
-                    data.append([current_time, current_values.copy()])  # 将当前时间和对应值添加到数据中
-                current_time = time  # 更新当前时间
-                current_values = {}  # 重置当前值
-            
-            current_values[event] = value  # 更新当前事件的值
-            
-        if current_time is not None:  # 如果当前时间不为None
-            data.append([current_time, current_values.copy()])  # 添加最后一组数据
-            
-    return x, y, data  # 返回提取的x, y值和数据
-
-def process_folder(input_dirs, output_file):
-    """处理文件夹中的所有HPC数据文件并生成CSV"""
-    # 20个HPC特征
-    hpc_events = [
-        "branch-instructions",
-        "branch-misses",
-        "cache-misses",
-        "cache-references",
-        "cpu-cycles",
-        "instructions",
-        "ref-cycles",
-        "L1-dcache-load-misses",
-        "L1-dcache-loads",
-        "L1-dcache-stores",
-        "L1-icache-load-misses",
-        "LLC-load-misses",
-        "LLC-loads",
-        "LLC-store-misses",
-        "LLC-stores",
-        "branch-load-misses",
-        "dTLB-load-misses",
-        "dTLB-loads",
-        "iTLB-load-misses",
-        "iTLB-loads"
-    ]
-    
-    all_data = {}  # 存储所有数据的字典
-    
-    # 处理每个文件
-    for file in os.listdir(input_dirs):  # 遍历文件夹中的每个文件
-        if file.endswith('.txt'):  # 只处理以.txt结尾的文件
-            file_path = os.path.join(input_dirs, file)  # 获取文件的完整路径
-            x, y, data = parse_hpc_file(file_path)  # 解析HPC文件
-            id_key = f"{x}_{y}"  # 创建唯一的ID键
-            
-            if id_key not in all_data:  # 如果ID键不在all_data中
-                all_data[id_key] = {}  # 初始化为一个空字典
-                
-            for time, values in data:  # 遍历解析后的数据
-                # 将时间转换为最接近的10ms时间点
-                time_point = round(time * 100)  # 将秒转换为10ms的时间点
-                if 0 <= time_point < 1000:  # 确保时间点在0-999范围内
-                    all_data[id_key][time_point] = values  # 将值存储在对应的时间点
-                
-    # 转换为DataFrame格式
-    rows = []  # 存储行数据
-    for id_key, time_series in all_data.items():  # 遍历所有数据
-        x = id_key.split('_')[0]  # 提取x值
-        # 确保所有时间点都存在，如果缺失则填充0
-        for time_point in range(1000):  # 遍历0到999的时间点
-            values = time_series.get(time_point, {})  # 获取对应时间点的值
-            row = {
-                'sample_id': id_key,  # ID键
-                'timestamp_id': time_point + 1,  # 保持从1开始
-                'label': 1 if x == 'M' else 0  # 分类标记
-            }
-            
-            for event in hpc_events:  # 遍历所有HPC事件
-                row[event] = values.get(event, 0)  # 获取事件的值，如果不存在则填0
-                
-            rows.append(row)  # 将行数据添加到rows中
-    
-    # 创建DataFrame并排序
-    df = pd.DataFrame(rows)  # 创建DataFrame
-    columns = ['sample_id', 'timestamp_id', 'label'] + hpc_events  # 定义列顺序
-    df = df[columns]  # 重新排列DataFrame的列顺序
-    
-    def extract_number(id_str):
-        match = re.search(r'(\d+)', id_str)  # 使用正则表达式提取数字
-        return int(match.group(1)) if match else 0  # 返回提取的数字或0
-    
-    df['sort_key'] = df['sample_id'].apply(lambda x: (x.startswith('M'), extract_number(x)))  # 创建排序键
-    df_sorted = df.sort_values(['sort_key', 'timestamp_id'])  # 按照排序键和时间戳排序
-    df_sorted = df_sorted.drop('sort_key', axis=1)  # 删除排序键列
-    
-    # 保存CSV文件
-    df_sorted.to_csv(output_file, index=False)  # 将DataFrame保存为CSV文件
-    return df_sorted  # 返回排序后的DataFrame
+import os  # 用于构建项目根目录路径
+import sys  # 用于设置模块搜索路径
 
-def main():
-    # 获取项目根目录的绝对路径
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-    
-    # 使用os.path.join()构建完整的路径
-    input_dirs = os.path.join(project_root, 'Datasets', 'Original', '10s', '20_per_1_time', '10s_10ms')
-    output_file = os.path.join(project_root, 'Datasets', 'Processed', '10s', '20_per_1_time', '10s_10ms.csv')
-    
-    # 创建输出目录(如果不存在)
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    print("正在处理HPC数据...")  # 打印处理信息
-    df_sorted = process_folder(input_dirs, output_file)  # 处理文件夹中的数据
-    print(f"已生成CSV文件: {output_file}")  # 打印生成的CSV文件路径
+# 获取项目根目录的绝对路径,并加入模块搜索路径以导入共享的 hpc_classification 包
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, PROJECT_ROOT)
+from hpc_classification.cli import main  # 统一的命令行入口
 
 if __name__ == "__main__":
-    main()  # 执行主函数
+    main(['preprocess', '--duration', '10s', '--mode', 'TDM', '--granularity', 'fine'] + sys.argv[1:])
@@ -0,0 +1,21 @@
+"""HPC_Classification 共享模块
+
+该包实现预处理和分类的全部功能,根目录下的脚本只是调用命令行入口的薄封装:
+- config: 采样周期、采样方式、数据粒度与数据集路径
+- perf_parser: perf stat -o 输出文件的批量解析引擎
+- parallel: 多进程执行工具(--workers 参数)
+- dataset: 间隔数据的 (样本, 时间点, 事件) 计数张量与长格式表格之间的转换,以及二进制数据集
+- preprocess: 时分复用/非时分复用各粒度原始数据的预处理
+- non_tsc: 汇总计数数据的传统机器学习分类
+- search: 传统机器学习模型共用交叉验证折的超参数搜索
+- tsc: 间隔采样时序数据的深度学习分类
+- results: 评估指标和预测结果的结构化保存
+- report: 由已保存的评估结果(并行)绘制图表
+- registry: 训练好的模型的版本化注册表
+- streaming: 运行中容器 perf stat -I 输出的实时分类服务
+- export: 时序分类模型的 TorchScript / ONNX 导出
+- runtime: 导出模型的推理运行时,不依赖训练代码
+- early: 在不断增长的前缀上评估时序分类模型的提前判定
+- benchmark: 深度学习模型的性能基准测试
+- cli: 命令行入口,python -m hpc_classification {preprocess,run,report,benchmark,export,early,serve}
+"""
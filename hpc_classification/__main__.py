@@ -0,0 +1,5 @@
+"""python -m hpc_classification 的入口,见 cli 模块"""
+from .cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""深度学习时序分类模型的性能基准测试
+
+precision: 在同一数据集上分别以 float32 和 bfloat16 自动混合精度训练各模型,比较训练和推理的
+吞吐量(样本/秒)以及测试集 AUC,结果保存为结果目录下的 precision_benchmark.csv。
+
+runtime: 对模型注册表中已训练的模型,比较 eager 模式、TorchScript 和 ONNX Runtime(已安装时)
+在测试集上逐个样本推理(批次大小为1)的延迟和整批推理的吞吐量,以及与 eager 模式的最大概率差,
+结果保存为结果目录下的 runtime_benchmark.csv。还没有导出的模型先导出到注册表中。
+
+quantization: 对模型注册表中已训练的模型做 int8 动态量化(tsc.quantize_model),在模型元数据中记录的
+训练时的测试集上比较量化前后的准确率、F1、AUC、模型大小、推理延迟和吞吐量,结果保存为结果目录下的
+quantization_benchmark.csv。
+"""
+import io  # 用于计算模型序列化后的大小
+import os  # 用于构建结果文件路径
+import statistics  # 用于计算延迟的中位数
+import time  # 用于计时
+
+import pandas as pd  # 用于整理和保存结果
+import torch  # 用于固定模型初始化的随机种子
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score  # 用于比较量化前后的评估指标
+
+from .config import TSC_MODEL_NAMES
+from .registry import ONNX_FILE, TORCHSCRIPT_FILE, load_model, model_versions, version_path
+from .tsc import (BiLSTMAttentionClassifier, autocast_context, bf16_supported, build_models,
+                  load_and_preprocess_data, load_sequences, normalize_test_split, predict, quantize_model,
+                  select_test_split, train_model)
+
+
+def warm_up(model, data_loader, autocast):
+    """用一个批次做一次完整的训练步骤,避免首次调用的初始化开销计入计时"""
+    X_batch, len_batch, _ = next(iter(data_loader))
+    optimizer = torch.optim.Adam(model.parameters())
+    with autocast_context(torch.device('cpu'), autocast):
+        outputs = model(X_batch, len_batch)
+    (outputs[0] if isinstance(model, BiLSTMAttentionClassifier) else outputs).float().sum().backward()
+    optimizer.step()
+
+
+def benchmark_precision(file_path, model_names=None, hidden_size=64, num_epochs=5):
+    """比较 float32 与 bfloat16 自动混合精度的训练吞吐量、推理吞吐量和 AUC
+
+    两种精度使用相同的初始参数和相同的训练轮数(不提前停止),以便直接比较。
+
+    Args:
+        file_path: 数据集文件的路径
+        model_names: 要测试的模型名称,None 表示全部模型
+        hidden_size: LSTM隐藏层的大小
+        num_epochs: 每种精度训练的轮数
+
+    Returns:
+        pd.DataFrame: 每个 (模型, 精度) 一行,包括训练和推理的样本/秒、最佳验证损失和测试集 AUC
+    """
+    train_loader, val_loader, test_loader, y_test, input_size, _ = load_and_preprocess_data(file_path)
+    print(f"CPU 原生支持 bfloat16: {bf16_supported()}")
+
+    rows = []
+    for model_name in [name for _, name in build_models(input_size, hidden_size, model_names)]:
+        for autocast in (False, True):
+            warm_up(build_models(input_size, hidden_size, [model_name])[0][0], train_loader, autocast)
+            torch.manual_seed(42)  # 两种精度使用相同的初始参数和训练数据顺序
+            (model, _), = build_models(input_size, hidden_size, [model_name])
+            start = time.perf_counter()
+            report = train_model(model, train_loader, val_loader, num_epochs=num_epochs,
+                                 patience=None, autocast=autocast)
+            train_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            probs = predict(model, test_loader, autocast)['y_prob']
+            inference_time = time.perf_counter() - start
+
+            rows.append({
+                'Model': model_name,
+                'dtype': 'bfloat16' if autocast else 'float32',
+                'Train samples/s': len(train_loader.dataset) * report['epochs'] / train_time,
+                'Inference samples/s': len(probs) / inference_time,
+                'Val Loss': report['best_val_loss'],
+                'AUC': roc_auc_score(y_test.numpy(), probs),
+            })
+    return pd.DataFrame(rows)
+
+
+def run_precision_benchmark(file_path, result_dir, model_names=None, num_epochs=5):
+    """对单个数据集运行精度基准测试,打印结果并保存为 precision_benchmark.csv"""
+    df = benchmark_precision(file_path, model_names, num_epochs=num_epochs)
+    print("\nPrecision Benchmark:")
+    print(df.to_string(index=False))
+    os.makedirs(result_dir, exist_ok=True)
+    df.to_csv(os.path.join(result_dir, 'precision_benchmark.csv'), index=False)
+    return df
+
+
+def time_calls(func, inputs, repeats=1):
+    """依次对每个输入调用 func,返回每次调用的秒数和最后一轮的输出"""
+    times, outputs = [], []
+    for _ in range(repeats):
+        outputs = []
+        for args in inputs:
+            start = time.perf_counter()
+            outputs.append(func(*args))
+            times.append(time.perf_counter() - start)
+    return times, outputs
+
+
+def test_inputs(X_test, len_test, num_samples):
+    """测试集的整批输入和前 num_samples 个截取到真实长度的单样本输入
+
+    Returns:
+        batch: (特征, 长度)
+        singles: [(特征, 长度)],每个批次大小为1
+    """
+    singles = [(X_test[i:i + 1, :int(len_test[i])], len_test[i:i + 1]) for i in range(min(num_samples, len(X_test)))]
+    return (X_test, len_test), singles
+
+
+def eager_runner(model):
+    """在 eager 模式下推理的函数,输入 (特征, 长度),返回恶意概率数组"""
+    def run(x, lengths):
+        with torch.no_grad():
+            outputs = model(x, lengths)
+        return (outputs[0] if isinstance(model, BiLSTMAttentionClassifier) else outputs).reshape(-1).numpy()
+    return run
+
+
+def measure_inference(run, batch, singles):
+    """测量批次大小为1的延迟和整批推理的吞吐量
+
+    Returns:
+        latency: 逐个样本推理的延迟中位数(毫秒)
+        throughput: 整批推理的样本/秒(3次中最快的一次)
+        probs: 整批推理的恶意概率
+    """
+    time_calls(run, singles[:10])  # 预热
+    latencies, _ = time_calls(run, singles)
+    batch_times, (probs,) = time_calls(run, [batch], repeats=3)
+    return statistics.median(latencies) * 1000, len(batch[0]) / min(batch_times), probs
+
+
+def registered_models(model_dir, model_names=None):
+    """模型注册表中已有版本的时序分类模型名称,没有的模型给出提示"""
+    names = []
+    for model_name in [name for name in TSC_MODEL_NAMES if model_names is None or name in model_names]:
+        if model_versions(model_dir, model_name):
+            names.append(model_name)
+        else:
+            print(f"模型注册表中没有 {model_name},跳过")
+    return names
+
+
+def benchmark_runtime(file_path, model_dir, model_names=None, num_samples=200, num_threads=1):
+    """比较 eager 模式、TorchScript 和 ONNX Runtime 的推理延迟和吞吐量
+
+    Args:
+        file_path: 数据集文件的路径,使用各模型元数据中记录的训练时的测试集样本
+        model_dir: 数据集的模型注册表目录,使用各模型的最新版本
+        model_names: 要测试的模型名称,None 表示全部模型
+        num_samples: 逐个样本推理的测试样本数
+        num_threads: 推理使用的线程数
+
+    Returns:
+        pd.DataFrame: 每个 (模型, 后端) 一行,包括批次大小为1时的延迟中位数(毫秒)、整批推理的样本/秒
+            和与 eager 模式的最大概率差
+    """
+    from .export import export_model  # 只在需要时导入导出代码
+    from .runtime import ExportedClassifier, onnxruntime_available
+
+    data = load_sequences(file_path)
+    torch.set_num_threads(num_threads)
+    backends = ['torchscript'] + (['onnx'] if onnxruntime_available() else [])
+    if 'onnx' not in backends:
+        print("没有安装 onnxruntime,只比较 eager 模式和 TorchScript")
+
+    rows = []
+    for model_name in registered_models(model_dir, model_names):
+        model, metadata, normalizer = load_model(model_dir, model_name)
+        X_raw, len_test, _ = select_test_split(data, metadata.get('test_sample_ids'))
+        batch, singles = test_inputs(normalize_test_split(X_raw, len_test, normalizer), len_test, num_samples)
+        path = version_path(model_dir, model_name)
+        missing = [name for name, file_name in (('torchscript', TORCHSCRIPT_FILE), ('onnx', ONNX_FILE))
+                   if name in backends and not os.path.exists(os.path.join(path, file_name))]
+        if missing:
+            export_model(model_dir, model_name, formats=missing)
+
+        runners = {'eager': eager_runner(model)}
+        for backend in backends:
+            classifier = ExportedClassifier(path, backend, num_threads)
+            runners[backend] = lambda x, lengths, classifier=classifier: classifier.forward(x.numpy(), lengths.numpy())
+
+        reference = None
+        for backend, run in runners.items():
+            latency, throughput, probs = measure_inference(run, batch, singles)
+            reference = probs if reference is None else reference
+            rows.append({
+                'Model': model_name,
+                'Backend': backend,
+                'Latency ms (batch=1)': latency,
+                'Batch samples/s': throughput,
+                'Max |p - eager|': float(abs(probs - reference).max()),
+            })
+    return pd.DataFrame(rows)
+
+
+def run_runtime_benchmark(file_path, result_dir, model_dir, model_names=None):
+    """对单个数据集运行推理后端基准测试,打印结果并保存为 runtime_benchmark.csv"""
+    df = benchmark_runtime(file_path, model_dir, model_names)
+    print("\nRuntime Benchmark:")
+    print(df.to_string(index=False))
+    os.makedirs(result_dir, exist_ok=True)
+    df.to_csv(os.path.join(result_dir, 'runtime_benchmark.csv'), index=False)
+    return df
+
+
+def state_dict_size(model):
+    """模型参数序列化后的字节数"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def benchmark_quantization(file_path, model_dir, model_names=None, num_samples=200, num_threads=1):
+    """比较 float32 模型与 int8 动态量化模型的评估指标、大小和推理速度
+
+    测试集为模型元数据中记录的训练时的测试集样本,输入使用模型注册表中与模型一起保存的归一化,
+    与 serve 命令相同。两种模型都在CPU上推理。
+
+    Args:
+        file_path: 数据集文件的路径,使用各模型元数据中记录的训练时的测试集样本
+        model_dir: 数据集的模型注册表目录,使用各模型的最新版本
+        model_names: 要测试的模型名称,None 表示全部模型
+        num_samples: 逐个样本推理的测试样本数
+        num_threads: 推理使用的线程数
+
+    Returns:
+        pd.DataFrame: 每个 (模型, 精度) 一行,包括准确率、F1、AUC、模型大小(MB)、批次大小为1时的
+            延迟中位数(毫秒)、整批推理的样本/秒和与 float32 模型的最大概率差
+    """
+    data = load_sequences(file_path)
+    torch.set_num_threads(num_threads)
+
+    rows = []
+    for model_name in registered_models(model_dir, model_names):
+        model, metadata, normalizer = load_model(model_dir, model_name)
+        X_raw, len_test, y_test = select_test_split(data, metadata.get('test_sample_ids'))
+        y_test = y_test.numpy()
+        batch, singles = test_inputs(normalize_test_split(X_raw, len_test, normalizer), len_test, num_samples)
+        reference = None
+        for dtype, variant in (('float32', model), ('int8', quantize_model(model))):
+            latency, throughput, probs = measure_inference(eager_runner(variant), batch, singles)
+            reference = probs if reference is None else reference
+            y_pred = (probs > 0.5).astype(int)
+            rows.append({
+                'Model': model_name,
+                'dtype': dtype,
+                'Accuracy': accuracy_score(y_test, y_pred),
+                'F1-Score': f1_score(y_test, y_pred, zero_division=0),
+                'AUC': roc_auc_score(y_test, probs),
+                'Size MB': state_dict_size(variant) / 2 ** 20,
+                'Latency ms (batch=1)': latency,
+                'Batch samples/s': throughput,
+                'Max |p - float32|': float(abs(probs - reference).max()),
+            })
+    return pd.DataFrame(rows)
+
+
+def run_quantization_benchmark(file_path, result_dir, model_dir, model_names=None):
+    """对单个数据集运行量化基准测试,打印结果并保存为 quantization_benchmark.csv"""
+    df = benchmark_quantization(file_path, model_dir, model_names)
+    print("\nQuantization Benchmark:")
+    print(df.to_string(index=False))
+    os.makedirs(result_dir, exist_ok=True)
+    df.to_csv(os.path.join(result_dir, 'quantization_benchmark.csv'), index=False)
+    return df
@@ -0,0 +1,353 @@
+"""统一的命令行入口
+
+预处理和分类都按 采样周期 x 采样方式 x 数据粒度 选择数据集,未指定的维度默认全部处理:
+
+    python -m hpc_classification preprocess --duration 10s --mode TDM --granularity fine --binary
+    python -m hpc_classification run --duration 10s 20s --granularity coarse fine --models lstm bilstm
+    python -m hpc_classification report --duration 10s --workers 8
+    python -m hpc_classification benchmark precision --duration 10s --mode TDM --granularity coarse
+    python -m hpc_classification export --duration 10s --mode TDM --granularity coarse --models lstm
+    python -m hpc_classification early --duration 10s --granularity coarse --step 5
+    python -m hpc_classification serve --watch /var/run/perf --duration 10s --mode TDM --granularity coarse --model bilstm
+
+short/full 数据集使用传统机器学习模型分类,coarse/fine 数据集使用深度学习模型分类。
+分类模块只在需要时导入,且每个进程只导入一次,不再为每个脚本重复加载 torch 和 sklearn。
+训练只保存结构化结果,图表在全部数据集训练完成后并行绘制(--no-plots 跳过),
+之后也可以用 report 命令单独绘制。
+"""
+import argparse  # 用于解析命令行参数
+import contextlib  # 用于按需创建训练进程池
+
+from .config import (COUNT_GRANULARITIES, DURATIONS, GRANULARITIES, MODES, NON_TSC_MODEL_NAMES,
+                     PROJECT_ROOT, SEQUENCE_GRANULARITIES, TSC_MODEL_NAMES, describe, interval_seconds,
+                     model_path, processed_path, result_path)
+from .parallel import add_workers_argument, default_workers
+
+
+def model_key(model_name):
+    """模型名称的命令行写法,例如 'Bi-LSTM + Attention' -> 'bilstm+attention'"""
+    return ''.join(c for c in model_name.lower() if c.isalnum() or c == '+')
+
+
+# 命令行写法 -> 模型名称
+MODEL_KEYS = {model_key(name): name for name in TSC_MODEL_NAMES + NON_TSC_MODEL_NAMES}
+
+
+def add_dataset_arguments(parser):
+    """添加选择数据集的参数"""
+    parser.add_argument('--duration', nargs='+', choices=DURATIONS, default=list(DURATIONS),
+                        help='采样周期(默认全部)')
+    parser.add_argument('--mode', nargs='+', choices=list(MODES), default=list(MODES),
+                        help='采样方式:TDM 为时分复用,Non-TDM 为非时分复用(默认全部)')
+    parser.add_argument('--granularity', nargs='+', choices=GRANULARITIES, default=list(GRANULARITIES),
+                        help='数据粒度:short/full 为汇总计数,coarse/fine 为间隔采样时序数据(默认全部)')
+    parser.add_argument('--root', default=PROJECT_ROOT,
+                        help='项目根目录,其下包含 Datasets 和 Results 目录(默认为代码所在目录)')
+
+
+def select_datasets(args, granularities, durations=DURATIONS):
+    """按固定顺序列出选中的 (采样周期, 采样方式, 数据粒度),与参数的书写顺序无关"""
+    return [(duration, mode, granularity)
+            for duration in durations if duration in args.duration
+            for mode in MODES if mode in args.mode
+            for granularity in granularities if granularity in args.granularity]
+
+
+def select_models(keys, model_names):
+    """从命令行给出的模型中选出属于 model_names 的模型,未指定 --models 时返回 None 表示全部"""
+    if keys is None:
+        return None
+    selected = {MODEL_KEYS[key] for key in keys}
+    return [name for name in model_names if name in selected]
+
+
+def print_banner(duration, mode, granularity):
+    """打印数据集的处理标题"""
+    print("\n" + "=" * 50)
+    print(f"开始处理{describe(duration, mode, granularity)} 数据集...")
+    print("=" * 50)
+
+
+def preprocess_command(args):
+    """预处理选中的数据集"""
+    from .preprocess import run_preprocess
+
+    for duration, mode, granularity in select_datasets(args, GRANULARITIES):
+        print(f"正在处理HPC数据: {describe(duration, mode, granularity)}")
+        output_file, stats = run_preprocess(duration, mode, granularity, args.workers, args.binary, args.root,
+                                            not args.no_cache)
+        print(f"{stats['cached']}/{stats['samples']} 个样本没有变化,使用缓存;"
+              f"解析 {stats['samples'] - stats['cached']} 个样本")
+        if stats['unchanged']:
+            print(f"数据集没有变化,保留已有的CSV文件: {output_file}")
+        else:
+            print(f"已生成CSV文件: {output_file}")
+
+
+def run_command(args):
+    """对选中的数据集训练和评估模型
+
+    每个采样周期先处理汇总计数数据集(传统机器学习),再处理时序数据集(深度学习),
+    与原先依次运行 Non_TSC_<周期>.py 和 TSC_<周期>.py 的顺序一致。--workers 大于1时,
+    同一采样周期全部时序数据集的各个模型先一起提交到进程池并行训练,再按顺序评估。
+    全部数据集评估完成后,除非指定 --no-plots,再在进程池中并行绘制各结果目录的图表。
+    """
+    non_tsc_models = select_models(args.models, NON_TSC_MODEL_NAMES)
+    tsc_models = select_models(args.models, TSC_MODEL_NAMES)
+    train_options = {
+        'num_epochs': args.epochs,
+        'patience': args.patience,
+        'lr_patience': args.lr_patience,
+        'autocast': args.bf16,
+        'accumulation_steps': args.accumulation_steps,
+    }
+
+    result_dirs = []  # 已评估的结果目录,训练完成后统一绘制图表
+    with contextlib.ExitStack() as stack:
+        pool = None  # 深度学习模型的训练进程池,第一次用到时创建
+        for duration in DURATIONS:
+            if non_tsc_models is None or non_tsc_models:
+                for dataset in select_datasets(args, COUNT_GRANULARITIES, [duration]):
+                    from . import non_tsc  # 只在需要时导入 sklearn
+                    print_banner(*dataset)
+                    non_tsc.process_dataset(
+                        data_path=processed_path(*dataset, root=args.root),
+                        result_dir=result_path(*dataset, root=args.root),
+                        model_names=non_tsc_models,
+                        model_dir=model_path(*dataset, root=args.root),
+                        search=args.search,
+                        time_budget=args.search_budget
+                    )
+                    result_dirs.append(result_path(*dataset, root=args.root))
+
+            if tsc_models is None or tsc_models:
+                datasets = select_datasets(args, SEQUENCE_GRANULARITIES, [duration])
+                if datasets:
+                    from . import tsc  # 只在需要时导入 torch
+                    if args.workers > 1 and pool is None:
+                        pool = stack.enter_context(tsc.TrainingPool(args.workers, train_options,
+                                                                      args.batch_size))
+                    if pool is not None:  # 提前提交全部作业,评估前面的数据集时后面的作业继续训练
+                        for dataset in datasets:
+                            pool.submit(processed_path(*dataset, root=args.root), tsc_models)
+                for dataset in datasets:
+                    print_banner(*dataset)
+                    tsc.process_dataset(
+                        file_path=processed_path(*dataset, root=args.root),
+                        result_dir=result_path(*dataset, root=args.root),
+                        model_names=tsc_models,
+                        pool=pool,
+                        model_dir=model_path(*dataset, root=args.root),
+                        train_options=train_options,
+                        batch_size=args.batch_size
+                    )
+                    result_dirs.append(result_path(*dataset, root=args.root))
+
+    if not args.no_plots and result_dirs:
+        from .report import render_reports
+        render_reports(result_dirs)
+
+
+def report_command(args):
+    """由已保存的评估结果绘制选中数据集的图表"""
+    from .report import render_reports
+
+    result_dirs = [result_path(*dataset, root=args.root) for dataset in select_datasets(args, GRANULARITIES)]
+    rendered = render_reports(result_dirs, args.workers)
+    for result_dir in rendered:
+        print(f"已生成图表: {result_dir}")
+    if len(rendered) < len(result_dirs):
+        print(f"{len(result_dirs) - len(rendered)} 个数据集没有评估结果,已跳过")
+
+
+def benchmark_command(args):
+    """在选中的时序数据集上运行性能基准测试"""
+    from .benchmark import run_precision_benchmark, run_quantization_benchmark, run_runtime_benchmark
+
+    benchmarks = {'runtime': run_runtime_benchmark, 'quantization': run_quantization_benchmark}
+
+    for dataset in select_datasets(args, SEQUENCE_GRANULARITIES):
+        print_banner(*dataset)
+        if args.kind == 'precision':
+            run_precision_benchmark(processed_path(*dataset, root=args.root), result_path(*dataset, root=args.root),
+                                    select_models(args.models, TSC_MODEL_NAMES), args.epochs)
+        else:
+            benchmarks[args.kind](processed_path(*dataset, root=args.root), result_path(*dataset, root=args.root),
+                                  model_path(*dataset, root=args.root), select_models(args.models, TSC_MODEL_NAMES))
+
+
+def export_command(args):
+    """把选中数据集的时序分类模型导出为 TorchScript / ONNX"""
+    from .export import export_model
+    from .registry import model_versions
+
+    for dataset in select_datasets(args, SEQUENCE_GRANULARITIES):
+        model_dir = model_path(*dataset, root=args.root)
+        for model_name in select_models(args.models, TSC_MODEL_NAMES) or TSC_MODEL_NAMES:
+            if not model_versions(model_dir, model_name):
+                continue
+            for export_format, path in export_model(model_dir, model_name, args.version, args.format).items():
+                print(f"已导出 {export_format}: {path}")
+
+
+def early_command(args):
+    """在选中的时序数据集上评估已训练模型的提前判定"""
+    from .early import run_early_classification
+
+    for dataset in select_datasets(args, SEQUENCE_GRANULARITIES):
+        print_banner(*dataset)
+        duration, _, granularity = dataset
+        run_early_classification(processed_path(*dataset, root=args.root), result_path(*dataset, root=args.root),
+                                 model_path(*dataset, root=args.root), interval_seconds(duration, granularity),
+                                 select_models(args.models, TSC_MODEL_NAMES), args.step, args.thresholds,
+                                 plots=not args.no_plots)
+
+
+def serve_command(args):
+    """实时分类运行中容器的 perf stat -I 输出"""
+    import asyncio
+    from .registry import load_model
+    from .streaming import StreamingClassifier
+
+    model_dir = model_path(args.duration, args.mode, args.granularity, root=args.root)
+    model, metadata, normalizer = load_model(model_dir, MODEL_KEYS[args.model], args.version)
+    if args.quantize:
+        from .tsc import quantize_model
+        model = quantize_model(model)
+    classifier = StreamingClassifier(
+        model, metadata['features'],
+        window=args.window or metadata['seq_len'],
+        threshold=args.threshold,
+        max_batch=args.max_batch,
+        max_delay=args.max_delay,
+        poll_interval=args.poll_interval,
+        stateful=args.stateful,
+        normalizer=normalizer
+    )
+    try:
+        asyncio.run(classifier.run(args.watch))
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog='python -m hpc_classification',
+                                     description='基于HPC数据的容器异常行为检测')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    preprocess_parser = subparsers.add_parser('preprocess', help='将原始 perf stat 输出整理为CSV数据集')
+    add_dataset_arguments(preprocess_parser)
+    add_workers_argument(preprocess_parser)
+    preprocess_parser.add_argument('--binary', action='store_true',
+                                   help='同时在CSV文件旁边输出 .npy/.npz 二进制数据集,供分类直接加载')
+    preprocess_parser.add_argument('--no-cache', action='store_true',
+                                   help='重新解析全部原始文件,不使用上次预处理缓存的结果(解析代码改动后使用)')
+    preprocess_parser.set_defaults(func=preprocess_command)
+
+    run_parser = subparsers.add_parser('run', help='训练和评估分类模型')
+    add_dataset_arguments(run_parser)
+    run_parser.add_argument('--models', nargs='+', choices=list(MODEL_KEYS), default=None,
+                            help='要训练的模型(默认全部),只对相应类型的数据集生效')
+    run_parser.add_argument('--workers', type=int, default=1,
+                            help='并行训练深度学习模型的进程数,每个进程使用 CPU核心数/N 个线程,'
+                                 '1 表示在当前进程中依次训练(默认: 1)')
+    run_parser.add_argument('--epochs', type=int, default=30, help='深度学习模型最多训练的轮数(默认: 30)')
+    run_parser.add_argument('--patience', type=int, default=5,
+                            help='验证损失连续 N 轮没有降低时提前停止训练并恢复最佳轮次的参数,'
+                                 '0 表示训练满 --epochs 轮(默认: 5)')
+    run_parser.add_argument('--lr-patience', type=int, default=None,
+                            help='验证损失连续 N 轮没有降低时把学习率减半(ReduceLROnPlateau),'
+                                 '应小于 --patience(默认: 不调整学习率)')
+    run_parser.add_argument('--bf16', action='store_true',
+                            help='深度学习模型以 bfloat16 自动混合精度训练和评估,'
+                                 '适用于支持 AVX512-BF16/AMX 的CPU(默认: float32)')
+    run_parser.add_argument('--batch-size', type=int, default=32, help='深度学习模型的批次大小(默认: 32)')
+    run_parser.add_argument('--accumulation-steps', type=int, default=1,
+                            help='深度学习模型每 N 个批次更新一次参数,梯度按样本数加权累加,'
+                                 '等价于批次大小为 --batch-size × N 的训练(默认: 1)')
+    run_parser.add_argument('--search', choices=['grid', 'halving', 'optuna'], default='grid',
+                            help='传统机器学习模型的超参数搜索方式:grid 为穷举网格搜索,halving 为逐次减半网格搜索,'
+                                 'optuna 为 Optuna 贝叶斯搜索(默认: grid)')
+    run_parser.add_argument('--search-budget', type=float, default=None,
+                            help='每个数据集全部传统机器学习模型超参数搜索的总时间预算,单位秒,剩余预算平均分给'
+                                 '尚未搜索的模型并在搜索过程中检查;用完后其余模型不再搜索(默认: 不限制)')
+    run_parser.add_argument('--no-plots', action='store_true',
+                            help='只保存评估指标和预测结果,不绘制图表,之后可用 report 命令绘制')
+    run_parser.set_defaults(func=run_command)
+
+    report_parser = subparsers.add_parser('report', help='由已保存的评估结果绘制图表')
+    add_dataset_arguments(report_parser)
+    report_parser.add_argument('--workers', type=int, default=default_workers(),
+                               help='并行绘图的进程数,每个进程绘制一个数据集,1 表示在当前进程中依次绘制'
+                                    '(默认: CPU核心数)')
+    report_parser.set_defaults(func=report_command)
+
+    benchmark_parser = subparsers.add_parser('benchmark', help='深度学习模型的性能基准测试')
+    benchmark_parser.add_argument('kind', choices=['precision', 'runtime', 'quantization'],
+                                  help='precision: 比较 float32 与 bfloat16 混合精度的吞吐量和 AUC;'
+                                       'runtime: 比较已训练模型在 eager 模式、TorchScript 和 ONNX Runtime 中的推理延迟;'
+                                       'quantization: 比较已训练模型 int8 动态量化前后的准确率、AUC、大小和推理延迟')
+    add_dataset_arguments(benchmark_parser)
+    benchmark_parser.add_argument('--models', nargs='+', choices=[model_key(name) for name in TSC_MODEL_NAMES],
+                                  default=None, help='要测试的模型(默认全部)')
+    benchmark_parser.add_argument('--epochs', type=int, default=5, help='precision: 每种精度训练的轮数(默认: 5)')
+    benchmark_parser.set_defaults(func=benchmark_command)
+
+    export_parser = subparsers.add_parser('export', help='把时序分类模型导出为 TorchScript / ONNX')
+    add_dataset_arguments(export_parser)
+    export_parser.add_argument('--models', nargs='+', choices=[model_key(name) for name in TSC_MODEL_NAMES],
+                               default=None, help='要导出的模型(默认全部已训练的模型)')
+    export_parser.add_argument('--version', type=int, default=None, help='模型注册表中的版本号(默认: 最新版本)')
+    export_parser.add_argument('--format', nargs='+', choices=['torchscript', 'onnx'], default=['torchscript', 'onnx'],
+                               help='导出格式,onnx 需要安装 onnx(默认: 两种都导出)')
+    export_parser.set_defaults(func=export_command)
+
+    early_parser = subparsers.add_parser('early', help='在不断增长的前缀上评估时序分类模型的提前判定')
+    add_dataset_arguments(early_parser)
+    early_parser.add_argument('--models', nargs='+', choices=[model_key(name) for name in TSC_MODEL_NAMES],
+                              default=None, help='要评估的模型(默认全部已训练的模型)')
+    early_parser.add_argument('--step', type=int, default=5, help='每隔 N 个采样间隔评估一次前缀(默认: 5)')
+    early_parser.add_argument('--thresholds', nargs='+', type=float, default=[0.6, 0.7, 0.8, 0.9, 0.95, 0.99],
+                              help='停止规则的置信度阈值,max(p, 1-p) 达到阈值时判定(默认: 0.6 ~ 0.99)')
+    early_parser.add_argument('--no-plots', action='store_true', help='只保存结果,不绘制 early_classification.png')
+    early_parser.set_defaults(func=early_command)
+
+    serve_parser = subparsers.add_parser('serve', help='实时分类运行中容器的 perf stat -I 输出')
+    serve_parser.add_argument('--watch', nargs='+', required=True,
+                              help='存放各容器 perf stat -I -o 输出文件(<容器ID>.txt)的目录')
+    serve_parser.add_argument('--duration', choices=DURATIONS, required=True, help='训练数据的采样周期')
+    serve_parser.add_argument('--mode', choices=list(MODES), default='TDM', help='训练数据的采样方式(默认: TDM)')
+    serve_parser.add_argument('--granularity', choices=SEQUENCE_GRANULARITIES, default='coarse',
+                              help='训练数据的粒度(默认: coarse)')
+    serve_parser.add_argument('--model', required=True, choices=[model_key(name) for name in TSC_MODEL_NAMES],
+                              help='时序分类模型')
+    serve_parser.add_argument('--version', type=int, default=None, help='模型注册表中的版本号(默认: 最新版本)')
+    serve_parser.add_argument('--root', default=PROJECT_ROOT, help='项目根目录,其下包含 Models 目录')
+    serve_parser.add_argument('--window', type=int, default=None,
+                              help='每个容器保留的最近采样间隔数,即模型输入序列的长度(默认: 训练序列长度)')
+    serve_parser.add_argument('--threshold', type=float, default=0.5, help='判定为恶意的概率阈值(默认: 0.5)')
+    serve_parser.add_argument('--max-batch', type=int, default=256, help='一次前向计算最多包含的容器数(默认: 256)')
+    serve_parser.add_argument('--max-delay', type=float, default=0.01,
+                              help='凑成批次的最长等待时间,单位秒(默认: 0.01)')
+    serve_parser.add_argument('--poll-interval', type=float, default=0.05,
+                              help='轮询输出文件的间隔,单位秒(默认: 0.05)')
+    serve_parser.add_argument('--stateful', action='store_true',
+                              help='携带 LSTM 状态增量推理,每个新间隔的计算量为 O(1),'
+                                   '双向模型的反向方向只使用最近 --window 个间隔')
+    serve_parser.add_argument('--quantize', action='store_true',
+                              help='把模型的 LSTM 和全连接层动态量化为 int8,减少内存并加快CPU上的推理,'
+                                   '可先用 benchmark quantization 检查精度损失')
+    serve_parser.set_defaults(func=serve_command)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行主函数
+
+    Args:
+        argv: 命令行参数列表,None 表示使用 sys.argv
+    """
+    args = build_parser().parse_args(argv)
+    args.func(args)
@@ -0,0 +1,100 @@
+"""数据集配置:采样周期、采样方式、数据粒度与各类文件路径
+
+每个采样周期(10s/20s/30s)在两种采样方式(时分复用/非时分复用)下各有四种粒度的数据集,
+以 10s 为例:
+- short: 2s 短时间采样重复5次的汇总计数,数据集名称为 2s
+- full: 完整时长持续采样的汇总计数,数据集名称为 10s
+- coarse: 100ms 间隔采样的时序数据,数据集名称为 10s_100ms
+- fine: 10ms 间隔采样的时序数据,数据集名称为 10s_10ms
+
+short/full 数据集用于传统机器学习分类,coarse/fine 数据集用于深度学习时序分类。
+"""
+import os  # 用于构建文件路径
+
+
+# 项目根目录,即 hpc_classification 包所在的目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 采样周期
+DURATIONS = ('10s', '20s', '30s')
+
+# 采样方式 -> (原始数据与预处理数据的子目录, 结果目录名, 中文名称)
+MODES = {
+    'TDM': ('20_per_1_time', 'Time-division Multiplexing', '时分复用'),
+    'Non-TDM': ('4_per_5_times', 'Non Time-division Multiplexing', '非时分复用'),
+}
+
+# 数据粒度
+COUNT_GRANULARITIES = ('short', 'full')  # 汇总计数数据,用于传统机器学习分类
+SEQUENCE_GRANULARITIES = ('coarse', 'fine')  # 间隔采样时序数据,用于深度学习时序分类
+GRANULARITIES = COUNT_GRANULARITIES + SEQUENCE_GRANULARITIES
+
+# 深度学习时序分类和传统机器学习分类的模型名称
+TSC_MODEL_NAMES = ('LSTM', 'Bi-LSTM', 'Bi-LSTM + Attention')
+NON_TSC_MODEL_NAMES = ('Logistic Regression', 'SVM', 'KNN', 'Random Forest', 'Decision Tree', 'Naive Bayes')
+
+# 汇总计数数据和非时分复用间隔数据使用的20个HPC事件
+HPC_EVENTS = [
+    'branch-instructions', 'branch-misses', 'bus-cycles',
+    'cache-misses', 'cache-references', 'cpu-cycles',
+    'instructions', 'ref-cycles', 'L1-dcache-load-misses',
+    'L1-dcache-loads', 'L1-dcache-stores', 'L1-icache-load-misses',
+    'LLC-loads', 'LLC-stores', 'branch-load-misses',
+    'dTLB-load-misses', 'dTLB-loads', 'dTLB-store-misses',
+    'dTLB-stores', 'iTLB-load-misses'
+]
+
+# 时分复用间隔数据使用的20个HPC事件
+TDM_INTERVAL_EVENTS = [
+    'branch-instructions', 'branch-misses', 'cache-misses',
+    'cache-references', 'cpu-cycles', 'instructions',
+    'ref-cycles', 'L1-dcache-load-misses', 'L1-dcache-loads',
+    'L1-dcache-stores', 'L1-icache-load-misses', 'LLC-load-misses',
+    'LLC-loads', 'LLC-store-misses', 'LLC-stores',
+    'branch-load-misses', 'dTLB-load-misses', 'dTLB-loads',
+    'iTLB-load-misses', 'iTLB-loads'
+]
+
+
+def dataset_name(duration, granularity):
+    """返回采样周期和粒度对应的数据集名称,例如 ('10s', 'fine') -> '10s_10ms'"""
+    seconds = int(duration.rstrip('s'))
+    names = {
+        'short': f'{seconds // 5}s',
+        'full': duration,
+        'coarse': f'{duration}_{seconds * 10}ms',
+        'fine': f'{duration}_{seconds}ms',
+    }
+    return names[granularity]
+
+
+def interval_seconds(duration, granularity):
+    """间隔采样时序数据每个时间点的秒数,例如 ('10s', 'coarse') -> 0.1"""
+    seconds = int(duration.rstrip('s'))
+    return {'coarse': seconds / 100, 'fine': seconds / 1000}[granularity]
+
+
+def original_path(duration, mode, granularity, root=PROJECT_ROOT):
+    """原始数据目录,short 粒度下包含 <名称>_1 ~ <名称>_5 五个子目录"""
+    return os.path.join(root, 'Datasets', 'Original', duration, MODES[mode][0], dataset_name(duration, granularity))
+
+
+def processed_path(duration, mode, granularity, root=PROJECT_ROOT):
+    """预处理输出的CSV文件路径"""
+    return os.path.join(root, 'Datasets', 'Processed', duration, MODES[mode][0],
+                        dataset_name(duration, granularity) + '.csv')
+
+
+def result_path(duration, mode, granularity, root=PROJECT_ROOT):
+    """分类结果的保存目录"""
+    return os.path.join(root, 'Results', duration, MODES[mode][1], dataset_name(duration, granularity))
+
+
+def model_path(duration, mode, granularity, root=PROJECT_ROOT):
+    """训练好的模型的注册表目录,结构与结果目录相同"""
+    return os.path.join(root, 'Models', duration, MODES[mode][1], dataset_name(duration, granularity))
+
+
+def describe(duration, mode, granularity):
+    """数据集的中文描述,例如 '时分复用 10s_10ms'"""
+    return f"{MODES[mode][2]} {dataset_name(duration, granularity)}"
@@ -0,0 +1,298 @@
+"""预处理结果的数据集表示
+
+间隔模式的预处理脚本把每个样本整理为 (时间点, 事件) 计数矩阵,全部样本按排序后的
+顺序写入一个预先分配的 (样本数, 时间点数, 事件数) int64 张量,再由张量直接生成长格式
+的 CSV 表格,不再为每个 (样本, 时间点) 构造一个字典。
+
+预处理脚本还可以在 CSV 文件旁边输出同名的二进制数据集,供分类脚本直接加载:
+- <名称>.npy: 计数值,间隔数据为 (样本数, 时间点数, 事件数),汇总数据为 (行数, 特征数),
+  可以用内存映射方式打开而无需解析文本
+- <名称>.npz: 与计数值第一维一一对应的 labels 和 sample_ids,以及列名 columns;
+  间隔数据还有每个样本的真实时间点数 lengths
+
+间隔数据的各样本长度不同(进程提前结束、采样文件较短),CSV 只输出每个样本真实长度内的行,
+张量中超出长度的部分为0,由 lengths 标明,训练时不参与计算。
+
+SequenceNormalizer 是时序模型输入的逐事件归一化(log1p + 标准化),只在训练集上拟合。
+"""
+import csv  # 用于写入汇总计数CSV文件
+import os  # 用于文件路径处理
+import numpy as np  # 用于张量运算
+import pandas as pd  # 用于生成长格式表格
+from sklearn.preprocessing import StandardScaler  # 用于逐事件标准化
+
+
+def sample_label(sample_id):
+    """由样本ID得到分类标记,M 开头的恶意样本为1,B 开头的良性样本为0"""
+    return 1 if sample_id.split('_')[0] == 'M' else 0
+
+
+def interval_tensor_to_frame(sample_ids, tensor, events, lengths=None):
+    """将间隔数据张量展开为长格式表格
+
+    Args:
+        sample_ids: 与张量第一维一一对应的样本ID,已按输出顺序排列
+        tensor: 形状为 (n_samples, n_timesteps, n_events) 的计数张量
+        events: 事件名列表,与张量最后一维一一对应
+        lengths: 每个样本的真实时间点数,None 表示全部为 n_timesteps
+
+    Returns:
+        pd.DataFrame: 列依次为 sample_id, timestamp_id(从1开始), label 和各事件,
+            每个样本按时间点顺序占 lengths[i] 行
+    """
+    n_samples, n_timesteps, n_events = tensor.shape
+    flat = tensor.reshape(n_samples * n_timesteps, n_events)
+    columns = {
+        'sample_id': np.repeat(np.array(sample_ids, dtype=object), n_timesteps),
+        'timestamp_id': np.tile(np.arange(1, n_timesteps + 1, dtype=np.int64), n_samples),
+        'label': np.repeat(np.array([sample_label(s) for s in sample_ids], dtype=np.int64), n_timesteps),
+    }
+    columns.update((event, flat[:, i]) for i, event in enumerate(events))
+    if lengths is not None and np.any(np.asarray(lengths) < n_timesteps):
+        # 只保留每个样本真实长度内的行
+        keep = (np.arange(n_timesteps) < np.asarray(lengths)[:, None]).ravel()
+        columns = {name: column[keep] for name, column in columns.items()}
+    return pd.DataFrame(columns)
+
+
+def group_sequences(sample_ids, timestamp_ids, labels, features):
+    """将长格式数据按样本ID重排为 (样本数, 时间点数, 特征数) 张量
+
+    只按 (样本ID, 时间点编号) 做一次排序,由相邻ID的变化位置得到各样本的行范围,再一次性
+    写入张量,而不是对每个样本扫描整列。样本按ID排序(与 np.unique 的顺序相同),同一样本内
+    按时间点编号排列。每个样本的时间点编号必须恰好是 1..行数;行数少于最长样本的样本在末尾
+    补0,真实长度由 lengths 给出。
+
+    Args:
+        sample_ids: 每行的样本ID
+        timestamp_ids: 每行的时间点编号(从1开始),其最大值即张量的时间点数
+        labels: 每行的分类标记
+        features: 形状为 (行数, 特征数) 的特征矩阵
+
+    Returns:
+        unique_ids: 排序后的样本ID
+        sequences: 形状为 (样本数, 时间点数, 特征数) 的特征张量
+        sequence_labels: 每个样本的分类标记(取该样本第一行的标记)
+        lengths: 每个样本的真实时间点数
+
+    Raises:
+        ValueError: 存在时间点编号不是 1..行数 的样本(时间点重复或缺失)
+    """
+    sample_ids = np.asarray(sample_ids)
+    timestamp_ids = np.asarray(timestamp_ids)
+    order = np.lexsort((timestamp_ids, sample_ids))
+    sorted_ids = sample_ids[order]
+    sorted_timestamps = timestamp_ids[order]
+
+    # 相邻样本ID发生变化的位置即为各样本的起始行
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_ids)])
+    sample_index = np.repeat(np.arange(len(starts)), counts)
+    positions = np.arange(len(sorted_ids)) - starts[sample_index]  # 每行在所属样本内的位置
+
+    # 排序后第 k 行的时间点编号必须为 k+1,否则该样本有重复或缺失的时间点
+    mismatched = sorted_timestamps != positions + 1
+    if mismatched.any():
+        invalid = np.unique(sample_index[mismatched])
+        details = ', '.join(f'{sorted_ids[starts[i]]}({counts[i]}行)' for i in invalid[:5])
+        raise ValueError(f"{len(invalid)} 个样本的时间点编号不是从1开始的连续编号(重复或缺失): {details}")
+
+    n_timesteps = int(counts.max()) if len(counts) else 0
+    features = np.asarray(features)[order]
+    if np.all(counts == n_timesteps):  # 全部样本等长时直接 reshape
+        sequences = features.reshape(len(starts), n_timesteps, -1)
+    else:
+        sequences = np.zeros((len(starts), n_timesteps, features.shape[1]), dtype=features.dtype)
+        sequences[sample_index, positions] = features
+    sequence_labels = np.asarray(labels)[order][starts]
+    return sorted_ids[starts], sequences, sequence_labels, counts
+
+
+def binary_dataset_paths(csv_path):
+    """返回与 CSV 文件同名的二进制数据集路径
+
+    Args:
+        csv_path: 预处理输出的 CSV 文件路径
+
+    Returns:
+        values_path: 计数值 .npy 文件路径
+        index_path: 标签、样本ID和列名 .npz 文件路径
+    """
+    stem = os.path.splitext(csv_path)[0]
+    return stem + '.npy', stem + '.npz'
+
+
+def save_binary_dataset(csv_path, values, labels, sample_ids, columns, lengths=None):
+    """在 CSV 文件旁边保存二进制数据集
+
+    Args:
+        csv_path: 对应的 CSV 文件路径
+        values: 计数值数组,第一维为样本(或行)
+        labels: 与 values 第一维对应的分类标记
+        sample_ids: 与 values 第一维对应的样本ID
+        columns: 与 values 最后一维对应的事件名(特征名)
+        lengths: 间隔数据每个样本的真实时间点数
+    """
+    values_path, index_path = binary_dataset_paths(csv_path)
+    np.save(values_path, np.ascontiguousarray(values, dtype=np.int64))
+    extra = {} if lengths is None else {'lengths': np.asarray(lengths, dtype=np.int64)}
+    np.savez(index_path,
+             labels=np.asarray(labels, dtype=np.int64),
+             sample_ids=np.array(sample_ids, dtype=str),
+             columns=np.array(columns, dtype=str),
+             **extra)
+
+
+def load_binary_dataset(csv_path, mmap_mode='r'):
+    """加载 CSV 文件对应的二进制数据集
+
+    二进制文件不存在,或比 CSV 文件旧(预处理重新生成了 CSV 而没有生成二进制文件)时
+    返回 None,由调用方回退到读取 CSV。
+
+    Args:
+        csv_path: 对应的 CSV 文件路径
+        mmap_mode: 计数值数组的内存映射模式,None 表示一次性读入内存
+
+    Returns:
+        (values, labels, sample_ids, columns, lengths) 或 None,lengths 只有间隔数据才有,
+        汇总数据以及旧版本预处理生成的文件为 None
+    """
+    values_path, index_path = binary_dataset_paths(csv_path)
+    if not (os.path.exists(values_path) and os.path.exists(index_path)):
+        return None
+    if os.path.exists(csv_path):
+        csv_mtime = os.path.getmtime(csv_path)
+        if min(os.path.getmtime(values_path), os.path.getmtime(index_path)) < csv_mtime:
+            return None
+
+    values = np.load(values_path, mmap_mode=mmap_mode)
+    with np.load(index_path) as index:
+        labels, sample_ids, columns = index['labels'], index['sample_ids'], index['columns']
+        lengths = index['lengths'] if 'lengths' in index else None
+    return values, labels, sample_ids, columns.tolist(), lengths
+
+
+def save_count_dataset(output_file, rows, labels, sample_ids, features, binary=False):
+    """保存汇总计数数据集:CSV 文件每行为样本ID、各特征的计数值和分类标记
+
+    短时间采样重复5次的数据集每个样本有5行,分类时按样本ID分组划分训练集和测试集。
+
+    Args:
+        output_file: 输出的 CSV 文件路径
+        rows: 每行按 features 顺序排列的计数值
+        labels: 每行的分类标记
+        sample_ids: 每行对应的样本ID
+        features: 特征名列表
+        binary: 是否同时保存二进制数据集
+    """
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['sample_id'] + features + ['label'])  # 写入表头
+        writer.writerows([sample_id] + row + [label] for sample_id, row, label in zip(sample_ids, rows, labels))
+
+    if binary:  # 同时保存可内存映射的二进制数据集
+        values = np.array(rows, dtype=np.int64).reshape(len(rows), len(features))
+        save_binary_dataset(output_file, values, labels, sample_ids, features)
+
+
+def save_interval_dataset(output_file, sample_ids, tensor, events, binary=False, lengths=None):
+    """保存间隔数据集:长格式 CSV 文件,以及可选的二进制数据集
+
+    Args:
+        output_file: 输出的 CSV 文件路径
+        sample_ids: 与张量第一维一一对应的样本ID,已按输出顺序排列
+        tensor: 形状为 (n_samples, n_timesteps, n_events) 的计数张量,超出真实长度的部分为0
+        events: 事件名列表
+        binary: 是否同时保存二进制数据集
+        lengths: 每个样本的真实时间点数,None 表示全部为 n_timesteps
+
+    Returns:
+        pd.DataFrame: 写入 CSV 文件的长格式表格
+    """
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    frame = interval_tensor_to_frame(sample_ids, tensor, events, lengths)
+    frame.to_csv(output_file, index=False)
+
+    if binary:  # 同时保存可内存映射的二进制数据集
+        save_binary_dataset(output_file, tensor, [sample_label(s) for s in sample_ids], sample_ids, events, lengths)
+    return frame
+
+
+class SequenceNormalizer:
+    """时序模型输入的逐事件归一化:先取 log1p,再按训练集的均值和标准差标准化
+
+    原始计数值跨越多个数量级(instructions、cpu-cycles 可达 10^9),直接输入 LSTM 会使训练
+    收敛缓慢。均值和方差用 StandardScaler.partial_fit 按块累积,拟合和转换都只需要一块
+    数据的内存,可以直接处理内存映射的大数据集,也可以逐个采样间隔用于实时分类。
+
+    Args:
+        chunk_size (int): 拟合和转换时每块的样本数(第一维)
+    """
+    def __init__(self, chunk_size=256):
+        self.chunk_size = chunk_size
+        self.scaler = StandardScaler()
+
+    @staticmethod
+    def log1p(values, out=None):
+        """负值(计数器未计数等异常值)按0处理后取 log1p"""
+        out = np.maximum(values, 0, out=out, dtype=np.float32 if out is None else out.dtype)
+        return np.log1p(out, out=out)
+
+    def partial_fit(self, values, lengths=None):
+        """用一块数据更新各事件的均值和方差
+
+        Args:
+            values: 最后一维为事件的计数值数组
+            lengths: values 为 (样本数, 时间点数, 事件数) 时各样本的真实时间点数,
+                超出长度的补0部分不参与拟合
+        """
+        values = np.asarray(values)
+        if lengths is not None:
+            values = values[np.arange(values.shape[1]) < np.asarray(lengths)[:, None]]
+        self.scaler.partial_fit(self.log1p(values.reshape(-1, values.shape[-1])))
+        return self
+
+    def fit(self, values, lengths=None):
+        """按块拟合全部数据,values 可以是内存映射数组"""
+        for start in range(0, len(values), self.chunk_size):
+            self.partial_fit(values[start:start + self.chunk_size],
+                             None if lengths is None else lengths[start:start + self.chunk_size])
+        return self
+
+    def transform(self, values, out=None):
+        """按块归一化
+
+        Args:
+            values: 最后一维为事件的计数值数组
+            out: 输出数组,可以与 values 相同以原地转换,None 表示新建 float32 数组
+
+        Returns:
+            np.ndarray: 与 values 形状相同的归一化结果
+        """
+        values = np.asarray(values)
+        if out is None:
+            out = np.empty(values.shape, dtype=np.float32)
+        mean = self.scaler.mean_.astype(out.dtype)
+        scale = self.scaler.scale_.astype(out.dtype)
+        for start in range(0, max(len(values), 1), self.chunk_size):
+            chunk = out[start:start + self.chunk_size]
+            self.log1p(values[start:start + self.chunk_size], out=chunk)
+            chunk -= mean
+            chunk /= scale
+        return out
+
+    def transform_sequences(self, values, lengths, out=None):
+        """归一化 (样本数, 时间点数, 事件数) 的补0序列,超出真实长度的补0部分保持为0,与训练时相同
+
+        Args:
+            values: 原始计数值
+            lengths: 各样本的真实时间点数
+            out: 输出数组,见 transform
+
+        Returns:
+            np.ndarray: 归一化后的序列
+        """
+        out = self.transform(values, out=out)
+        out[np.arange(out.shape[1]) >= np.asarray(lengths)[:, None]] = 0
+        return out
@@ -0,0 +1,165 @@
+"""时序分类模型的提前判定
+
+训练好的模型只在看完整个 10s/20s/30s 序列后分类。本模块在测试集上每隔 step 个采样间隔截取
+一次前缀(前缀超过样本真实长度时取整个样本),用模型注册表中的模型对各长度的前缀分类,得到:
+
+- 前缀曲线:各模型在每个前缀长度上的准确率、F1 和 AUC
+- 置信度阈值停止规则:每个样本在恶意概率 p 满足 max(p, 1-p) >= 阈值的第一个前缀处判定,
+  到完整序列仍未达到阈值时以完整序列的结果判定;对每个阈值统计准确率、恶意样本的召回率、
+  平均判定时间和恶意样本被检出的时间,即准确率与检测时间的权衡
+
+结果保存为结果目录下的 early_prefix_curve.csv 和 early_classification.csv,并绘制
+early_classification.png(report 模块也会在重新绘图时绘制):
+
+    python -m hpc_classification early --duration 10s --granularity coarse --step 5
+
+各前缀使用的是在完整序列上训练的同一个模型,没有针对短前缀重新训练。双向模型在每个前缀上
+重新计算,与实时服务 --stateful 的有界窗口近似不同,结果是精确的。
+"""
+import os  # 用于构建结果文件路径
+
+import numpy as np  # 用于计算停止规则
+import pandas as pd  # 用于整理和保存结果
+import torch  # 用于截取前缀
+from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score  # 用于计算评估指标
+
+from .config import TSC_MODEL_NAMES
+from .registry import load_model, model_versions
+from .results import EARLY_DECISION_FILE, EARLY_PREFIX_FILE
+from .tsc import TensorBatches, load_sequences, normalize_test_split, predict, select_test_split
+
+DEFAULT_THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+
+def prefix_lengths(seq_len, step):
+    """每隔 step 个间隔的前缀长度,最后一个为完整序列"""
+    prefixes = list(range(step, seq_len, step))
+    return np.array(prefixes + [seq_len])
+
+
+def prefix_probabilities(model, X, lengths, prefixes, batch_size=256):
+    """模型在各长度前缀上的恶意概率
+
+    Args:
+        model: 已训练的时序分类模型
+        X: (样本数, 时间点数, 事件数) 的已归一化特征
+        lengths: 每个样本的真实时间点数
+        prefixes: 前缀长度数组
+        batch_size: 推理的批次大小
+
+    Returns:
+        np.ndarray: (前缀数, 样本数) 的恶意概率
+    """
+    labels = torch.zeros(len(X))  # predict 需要标签,这里不使用
+    return np.stack([
+        predict(model, TensorBatches((X[:, :p], lengths.clamp(max=int(p)), labels), batch_size),
+                device=torch.device('cpu'))['y_prob']
+        for p in prefixes
+    ])
+
+
+def early_decisions(probs, threshold):
+    """置信度阈值停止规则
+
+    Args:
+        probs: (前缀数, 样本数) 的恶意概率,最后一个前缀为完整序列
+        threshold: 判定所需的置信度 max(p, 1-p)
+
+    Returns:
+        y_pred: 各样本的判定结果
+        decided_at: 各样本判定时的前缀下标
+    """
+    confident = np.maximum(probs, 1 - probs) >= threshold
+    confident[-1] = True  # 到完整序列仍未达到阈值时以完整序列的结果判定
+    decided_at = confident.argmax(axis=0)
+    decided_probs = probs[decided_at, np.arange(probs.shape[1])]
+    return (decided_probs > 0.5).astype(int), decided_at
+
+
+def evaluate_early(file_path, model_dir, interval, model_names=None, step=5, thresholds=DEFAULT_THRESHOLDS):
+    """在测试集上评估各模型的提前判定
+
+    Args:
+        file_path: 数据集文件的路径,使用各模型元数据中记录的训练时的测试集样本
+        model_dir: 数据集的模型注册表目录,使用各模型的最新版本及与其一起保存的输入归一化
+        interval: 每个采样间隔的秒数,用于把前缀长度换算为时间
+        model_names: 要评估的模型名称,None 表示全部已训练的模型
+        step: 前缀长度的间隔数
+        thresholds: 停止规则的置信度阈值
+
+    Returns:
+        prefix_curve: 每个 (模型, 前缀长度) 一行的 pd.DataFrame
+        decisions: 每个 (模型, 阈值) 一行的 pd.DataFrame
+    """
+    data = load_sequences(file_path)
+    prefixes = prefix_lengths(data[1].shape[1], step)
+
+    curve_rows, decision_rows = [], []
+    for model_name in TSC_MODEL_NAMES:
+        if model_names is not None and model_name not in model_names:
+            continue
+        if not model_versions(model_dir, model_name):
+            print(f"模型注册表中没有 {model_name},跳过")
+            continue
+        model, metadata, normalizer = load_model(model_dir, model_name)
+        # 使用训练时记录的测试集样本,避免数据集加入新样本后重新划分的测试集与训练集重叠
+        X_raw, len_test, y_test = select_test_split(data, metadata.get('test_sample_ids'))
+        y_true = y_test.numpy().astype(int)
+        sample_lengths = len_test.numpy()
+        both_classes = len(np.unique(y_true)) > 1
+        X_test = normalize_test_split(X_raw, len_test, normalizer)  # 与 serve 命令相同的输入
+        probs = prefix_probabilities(model, X_test, len_test, prefixes)
+
+        for p, prefix_probs in zip(prefixes, probs):
+            y_pred = (prefix_probs > 0.5).astype(int)
+            curve_rows.append({
+                'Model': model_name,
+                'Intervals': int(p),
+                'Seconds': p * interval,
+                'Accuracy': accuracy_score(y_true, y_pred),
+                'F1-Score': f1_score(y_true, y_pred, zero_division=0),
+                'AUC': roc_auc_score(y_true, prefix_probs) if both_classes else np.nan,
+            })
+
+        for threshold in thresholds:
+            y_pred, decided_at = early_decisions(probs, threshold)
+            # 样本在前缀达到判定长度之前已经结束时,判定时间为样本结束的时间
+            decision_seconds = np.minimum(prefixes[decided_at], sample_lengths) * interval
+            detected = (y_true == 1) & (y_pred == 1)
+            decision_rows.append({
+                'Model': model_name,
+                'Threshold': threshold,
+                'Accuracy': accuracy_score(y_true, y_pred),
+                'Recall': recall_score(y_true, y_pred, zero_division=0),
+                'F1-Score': f1_score(y_true, y_pred, zero_division=0),
+                'Mean decision s': decision_seconds.mean(),
+                'Median detection s': np.median(decision_seconds[detected]) if detected.any() else np.nan,
+                'Decided early': (decided_at < len(prefixes) - 1).mean(),
+            })
+    return pd.DataFrame(curve_rows), pd.DataFrame(decision_rows)
+
+
+def run_early_classification(file_path, result_dir, model_dir, interval, model_names=None, step=5,
+                             thresholds=DEFAULT_THRESHOLDS, plots=True):
+    """对单个数据集运行提前判定评估,打印并保存结果
+
+    Args:
+        file_path, model_dir, interval, model_names, step, thresholds: 见 evaluate_early
+        result_dir: 结果保存的目录路径
+        plots: 是否绘制 early_classification.png
+
+    Returns:
+        与 evaluate_early 相同
+    """
+    prefix_curve, decisions = evaluate_early(file_path, model_dir, interval, model_names, step, thresholds)
+    if decisions.empty:
+        return prefix_curve, decisions
+    print("\nEarly Classification:")
+    print(decisions.to_string(index=False))
+    os.makedirs(result_dir, exist_ok=True)
+    prefix_curve.to_csv(os.path.join(result_dir, EARLY_PREFIX_FILE), index=False)
+    decisions.to_csv(os.path.join(result_dir, EARLY_DECISION_FILE), index=False)
+    if plots:
+        from .report import plot_early_classification  # 只在需要时导入 matplotlib
+        plot_early_classification(prefix_curve, decisions, result_dir)
+    return prefix_curve, decisions
@@ -0,0 +1,167 @@
+"""时序分类模型的 TorchScript / ONNX 导出
+
+训练时的三种模型用 pack_padded_sequence 只计算每个样本真实长度内的时间点,PackedSequence
+无法导出为 ONNX,TorchScript 跟踪时也会把批次划分固定下来。ExportableClassifier 用等价的
+张量运算改写前向计算:
+
+- 前向方向直接在补0的批次上计算,取每个样本最后一个真实时间点的输出(补0部分在它之后,不影响结果)
+- 反向方向先在每个样本的真实长度内把序列翻转,再用单向 LSTM 计算,输出按同样的下标翻转回来
+- 注意力只在真实长度内计算,与 BiLSTMAttentionClassifier 的 mask 相同
+
+改写后的结果与原模型完全相同,批次大小和序列长度都是动态维度。导出的文件保存在模型注册表
+对应版本的目录中,同时保存输入归一化的均值和标准差(normalizer.npz),推理主机用 runtime
+模块加载,只需要 numpy 和 onnxruntime(或 torch),不需要训练代码和 sklearn:
+
+    python -m hpc_classification export --duration 10s --mode TDM --granularity coarse --models lstm
+"""
+import inspect  # 用于检查 torch.onnx.export 支持的参数
+import os  # 用于构建文件路径
+
+import numpy as np  # 用于保存归一化参数
+import torch  # 用于导出模型
+import torch.nn as nn  # 用于定义导出用的模型
+
+from .registry import NORMALIZER_FILE, ONNX_FILE, TORCHSCRIPT_FILE, load_model, version_path
+from .tsc import lstm_directions
+
+EXPORT_FORMATS = ('torchscript', 'onnx')
+ONNX_OPSET = 13
+
+
+class ExportableClassifier(nn.Module):
+    """不使用 PackedSequence 的等价模型,与原模型共享参数
+
+    Args:
+        model: LSTMClassifier、BiLSTMClassifier 或 BiLSTMAttentionClassifier
+
+    forward(x, lengths) 的输入为 (batch, 时间点数, 事件数) 的特征和每个样本的真实时间点数,
+    输出为 (batch,) 的恶意概率(带注意力的模型不输出注意力权重)。
+    """
+    def __init__(self, model):
+        super(ExportableClassifier, self).__init__()
+        self.hidden_size = model.lstm.hidden_size
+        self.bidirectional = model.lstm.bidirectional
+        if self.bidirectional:
+            self.forward_lstm, self.backward_lstm = lstm_directions(model.lstm)
+        else:
+            self.forward_lstm = model.lstm
+        self.attention = getattr(model, 'attention', None)
+        self.fc = model.fc
+
+    def gather_steps(self, values, index):
+        """按 (batch, k) 的时间点下标取出 values 中每个样本的 k 个时间点"""
+        return values.gather(1, index.unsqueeze(2).expand(-1, -1, values.shape[2]))
+
+    def forward(self, x, lengths):
+        last = (lengths - 1).unsqueeze(1)  # 每个样本最后一个真实时间点的下标
+        forward_out, _ = self.forward_lstm(x)
+        forward_last = self.gather_steps(forward_out, last).squeeze(1)
+        if not self.bidirectional:
+            return torch.sigmoid(self.fc(forward_last)).squeeze(1)
+
+        # 在真实长度内翻转:翻转后第 t 步为原序列的第 lengths-1-t 步,超出长度的部分不影响结果
+        steps = torch.arange(x.shape[1], device=x.device).unsqueeze(0)
+        reverse = (last - steps).clamp(min=0)
+        backward_out, _ = self.backward_lstm(self.gather_steps(x, reverse))
+        if self.attention is None:
+            backward_last = self.gather_steps(backward_out, last).squeeze(1)  # 反向方向读完整个序列的输出
+            return torch.sigmoid(self.fc(torch.cat((forward_last, backward_last), dim=1))).squeeze(1)
+
+        lstm_out = torch.cat((forward_out, self.gather_steps(backward_out, reverse)), dim=2)
+        context, _ = self.attention(lstm_out, steps < lengths.unsqueeze(1))
+        return torch.sigmoid(self.fc(context)).squeeze(1)
+
+
+def example_inputs(input_size, batch_size=1, seq_len=8):
+    """导出时跟踪计算图使用的示例输入,各样本长度不同"""
+    x = torch.randn(batch_size, seq_len, input_size)
+    lengths = torch.arange(seq_len, seq_len - batch_size, -1).clamp(min=1)
+    return x, lengths
+
+
+def export_torchscript(model, path, input_size):
+    """把模型跟踪为 TorchScript,冻结参数并做推理优化后保存
+
+    Args:
+        model: 已训练的时序分类模型
+        path: 保存的文件路径
+        input_size: 每个时间点的事件数
+    """
+    module = ExportableClassifier(model).eval()
+    with torch.no_grad():
+        scripted = torch.jit.trace(module, example_inputs(input_size, batch_size=2))
+        scripted = torch.jit.optimize_for_inference(torch.jit.freeze(scripted))
+    scripted.save(path)
+
+
+def export_onnx(model, path, input_size):
+    """把模型导出为 ONNX,批次大小和序列长度为动态维度
+
+    Args:
+        model: 已训练的时序分类模型
+        path: 保存的文件路径
+        input_size: 每个时间点的事件数
+    """
+    options = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        options['dynamo'] = False  # 新版本 torch 默认使用 torch.export 导出,这里使用与旧版本相同的跟踪导出
+    module = ExportableClassifier(model).eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            module, example_inputs(input_size), path,
+            input_names=['x', 'lengths'],
+            output_names=['probs'],
+            dynamic_axes={'x': {0: 'batch', 1: 'time'}, 'lengths': {0: 'batch'}, 'probs': {0: 'batch'}},
+            opset_version=ONNX_OPSET,
+            **options
+        )
+
+
+EXPORTERS = {
+    'torchscript': (export_torchscript, TORCHSCRIPT_FILE),
+    'onnx': (export_onnx, ONNX_FILE),
+}
+
+
+def replace_file(path, write):
+    """先写临时文件再替换,加载方不会读到写了一半的文件"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_model(model_dir, model_name, version=None, formats=EXPORT_FORMATS):
+    """导出注册表中的时序分类模型,保存在该版本的目录中
+
+    Args:
+        model_dir: 数据集的模型注册表目录
+        model_name: 模型名称
+        version: 版本号,None 表示最新版本
+        formats: 导出格式,'torchscript' 和/或 'onnx'
+
+    Returns:
+        dict: 导出格式 -> 文件路径
+    """
+    model, metadata, normalizer = load_model(model_dir, model_name, version)
+    if metadata['kind'] != 'torch':
+        raise ValueError(f"{model_name} 不是时序分类模型,无法导出")
+    path = version_path(model_dir, model_name, metadata['version'])
+
+    exported = {}
+    for export_format in formats:
+        export, file_name = EXPORTERS[export_format]
+        exported[export_format] = os.path.join(path, file_name)
+        replace_file(exported[export_format],
+                     lambda tmp_path: export(model, tmp_path, metadata['input_size']))
+
+    # 推理主机不需要 sklearn,只保存 SequenceNormalizer 的均值和标准差
+    if normalizer is not None:
+        def save_normalizer(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, mean=normalizer.scaler.mean_, scale=normalizer.scaler.scale_)
+        replace_file(os.path.join(path, NORMALIZER_FILE), save_normalizer)
+    return exported
@@ -0,0 +1,392 @@
+"""传统机器学习分类
+
+使用逻辑回归、SVM、KNN、随机森林、决策树和朴素贝叶斯对汇总计数数据进行分类,
+通过网格搜索(或逐次减半、Optuna 贝叶斯搜索)选择超参数,并输出评估指标和预测结果,图表由 report 模块在训练之后绘制。
+"""
+# 导入必要的库
+import pandas as pd  # 用于数据处理和分析
+import numpy as np  # 用于数值计算
+from sklearn.base import clone  # 用于以最佳参数重新训练模型
+from sklearn.preprocessing import StandardScaler  # 用于特征标准化
+from sklearn.linear_model import LogisticRegression  # 逻辑回归模型
+from sklearn.svm import SVC  # 支持向量机模型
+from sklearn.neighbors import KNeighborsClassifier  # K近邻分类器
+from sklearn.ensemble import RandomForestClassifier  # 随机森林分类器
+from sklearn.tree import DecisionTreeClassifier  # 决策树分类器
+from sklearn.naive_bayes import GaussianNB  # 高斯朴素贝叶斯分类器
+from sklearn.metrics import (  # 各种评估指标
+    classification_report,  # 分类报告
+    auc,  # AUC值计算
+    accuracy_score,  # 准确率
+    precision_score,  # 精确率
+    recall_score,  # 召回率
+    f1_score,  # F1分数
+    roc_auc_score  # ROC曲线下面积
+)
+import os  # 用于文件和目录操作
+import time  # 用于控制超参数搜索的时间预算
+import warnings  # 用于提示超参数搜索没有成功的参数组合
+from .config import NON_TSC_MODEL_NAMES  # 模型名称
+from .dataset import load_binary_dataset  # 预处理输出的二进制数据集
+from .registry import save_model  # 模型注册表
+from .search import (  # 按样本分组的数据集划分和共用交叉验证折的超参数搜索
+    FoldCache, grid_search, group_train_test_split, halving_search
+)
+from .results import class_counts, save_manifest, save_predictions  # 结构化评估结果
+
+
+def load_and_preprocess_data(data_path):
+    """加载并预处理数据
+    
+    该函数完成以下任务:
+    1. 检查数据文件是否存在
+    2. 加载CSV数据文件(存在同名的 .npy/.npz 二进制数据集时直接以内存映射方式加载)
+    3. 分离样本ID、特征和标签
+    4. 按样本ID分组划分训练集和测试集,同一样本重复采样的各行不会同时出现在训练集和测试集中
+    5. 对特征进行标准化处理
+    
+    Args:
+        data_path: 数据集文件路径
+        
+    Returns:
+        X_train: 训练集特征
+        X_test: 测试集特征  
+        y_train: 训练集标签
+        y_test: 测试集标签
+        scaler: 在训练集上拟合的标准化器,feature_names_in_ 为特征顺序
+        groups_train: 训练集每行的样本ID,用于分组交叉验证
+
+    Raises:
+        ValueError: 数据集没有样本ID列(旧版本预处理生成的 CSV 文件),无法按样本分组划分
+    """
+    binary = load_binary_dataset(data_path)
+    if binary is not None:
+        # 二进制数据集的行顺序与CSV相同
+        values, labels, sample_ids, columns, _ = binary
+        X = pd.DataFrame(np.asarray(values), columns=columns)  # 特征
+        y = pd.Series(labels, name='label')  # 标签
+        groups = pd.Series(sample_ids, name='sample_id')  # 样本ID
+    else:
+        # 检查数据文件是否存在
+        if not os.path.exists(data_path):
+            raise FileNotFoundError(f"数据文件不存在: {data_path}")
+            
+        # 加载数据
+        data = pd.read_csv(data_path)
+        if 'sample_id' not in data.columns:
+            # 按行划分时同一样本的重复采样会同时出现在训练集和测试集中,评估指标偏高
+            raise ValueError(f"{data_path} 没有 sample_id 列,无法按样本分组划分训练集和测试集,"
+                             f"请用 python -m hpc_classification preprocess 重新生成该数据集")
+        groups = data.pop('sample_id')  # 第1列:样本ID
+        X = data.iloc[:, :-1]  # 取除最后一列外的所有列作为特征
+        y = data.iloc[:, -1]  # 取最后一列作为标签
+    
+    # 划分训练集和测试集,测试集占20%;按样本ID分组,在样本这一级保持标签分布一致
+    train_index, test_index = group_train_test_split(y.values, groups.values, test_size=0.2, random_state=42)
+    X_train, X_test = X.iloc[train_index], X.iloc[test_index]
+    y_train, y_test = y.iloc[train_index], y.iloc[test_index]
+    groups_train = groups.values[train_index]
+    
+    # 标准化特征
+    scaler = StandardScaler()  # 创建标准化对象
+    X_train = scaler.fit_transform(X_train)  # 对训练集拟合和转换
+    X_test = scaler.transform(X_test)  # 对测试集仅做转换
+    
+    return X_train, X_test, y_train, y_test, scaler, groups_train
+
+
+def evaluate_model(model, X_test, y_test, model_name, result_dir):
+    """评估模型性能并保存评估结果
+    
+    该函数完成以下任务:
+    1. 获取模型预测结果,保存为 predictions_test_<模型名称>.npz 供绘制混淆矩阵
+    2. 计算各项评估指标
+    3. 保存评估结果到文本文件
+    4. 将结果保存到CSV文件
+    
+    Args:
+        model: 训练好的模型
+        X_test: 测试集特征
+        y_test: 测试集标签
+        model_name: 模型名称
+        result_dir: 结果保存目录
+        
+    Returns:
+        accuracy, precision, recall, f1, auc: 各项评估指标
+    """
+    # 确保结果目录存在
+    os.makedirs(result_dir, exist_ok=True)
+    
+    # 获取预测结果
+    y_pred = model.predict(X_test)  # 预测类别
+    y_prob = model.predict_proba(X_test)[:, 1]  # 预测概率
+    save_predictions(result_dir, model_name, {
+        'y_true': np.asarray(y_test, dtype=int),
+        'y_pred': np.asarray(y_pred, dtype=int),
+        'y_prob': y_prob,
+    })
+    
+    # 计算评估指标
+    accuracy = accuracy_score(y_test, y_pred)  # 准确率
+    precision = precision_score(y_test, y_pred)  # 精确率
+    recall = recall_score(y_test, y_pred)  # 召回率
+    f1 = f1_score(y_test, y_pred)  # F1分数
+    auc_score = roc_auc_score(y_test, y_prob)  # AUC值
+    
+    # 保存结果到文本文件
+    results_file = os.path.join(result_dir, "model_results.txt")
+    with open(results_file, 'a', encoding='utf-8') as f:
+        f.write(f"\n{model_name} 评估结果:\n")
+        f.write(f"Accuracy: {accuracy:.4f}\n")
+        f.write(f"Precision: {precision:.4f}\n")
+        f.write(f"Recall: {recall:.4f}\n")
+        f.write(f"F1-Score: {f1:.4f}\n")
+        f.write(f"AUC: {auc_score:.4f}\n")
+    
+    # 保存结果到CSV
+    results_df = pd.DataFrame({
+        "Model": [model_name],
+        "Accuracy": [accuracy],
+        "Precision": [precision],
+        "Recall": [recall],
+        "F1-Score": [f1],
+        "AUC": [auc_score]
+    })
+    
+    csv_file = os.path.join(result_dir, "model_evaluation_results.csv")
+    # 如果CSV文件已存在且非空，则不写入表头
+    header = not (os.path.exists(csv_file) and os.path.getsize(csv_file) > 0)
+    results_df.to_csv(csv_file, mode='a', header=header, index=False)
+    
+    return accuracy, precision, recall, f1, auc_score
+
+
+# 可训练的模型名称
+MODEL_NAMES = NON_TSC_MODEL_NAMES
+
+# 超参数搜索方式
+SEARCH_METHODS = ('grid', 'halving', 'optuna')
+
+# Optuna 的搜索空间:模型名称 -> 由 trial 生成一组参数的函数,范围覆盖并扩展网格搜索的取值
+OPTUNA_SPACES = {
+    'Logistic Regression': lambda trial: {'C': trial.suggest_float('C', 1e-3, 1e2, log=True)},
+    'SVM': lambda trial: {
+        'C': trial.suggest_float('C', 1e-2, 1e2, log=True),
+        'kernel': trial.suggest_categorical('kernel', ['linear', 'rbf']),
+    },
+    'KNN': lambda trial: {'n_neighbors': trial.suggest_int('n_neighbors', 1, 31, step=2)},
+    'Random Forest': lambda trial: {'n_estimators': trial.suggest_int('n_estimators', 10, 200)},
+    'Decision Tree': lambda trial: {'max_depth': trial.suggest_categorical('max_depth', [None, 5, 10, 20, 40])},
+    'Naive Bayes': lambda trial: {'var_smoothing': trial.suggest_float('var_smoothing', 1e-12, 1e-6, log=True)},
+}
+
+
+def search_hyperparameters(model_name, model, params, folds, search='grid', time_limit=None, n_trials=30):
+    """在数据集共用的5折交叉验证上(准确率)选择超参数
+
+    Args:
+        model_name: 模型名称,optuna 方式按名称选择 OPTUNA_SPACES 中的搜索空间
+        model: 未训练的模型
+        params: 网格搜索的参数网格
+        folds: 数据集的 FoldCache
+        search: 'grid' 为穷举网格搜索;'halving' 为逐次减半网格搜索,先用少量样本淘汰大部分参数组合;
+            'optuna' 为 Optuna TPE 贝叶斯搜索
+        time_limit: 搜索的时间上限(秒),None 表示不限制;grid/halving 方式分批评估参数组合,
+            超时后在已评估的参数组合中选择
+        n_trials: optuna 方式最多尝试的参数组合数
+
+    Returns:
+        best_params: 最佳参数;optuna 方式全部尝试都失败(得分为 nan)时为模型的默认参数 {}
+        n_candidates: 评估过的参数组合数
+    """
+    if search == 'optuna':
+        import optuna  # 只在需要时导入
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+        def objective(trial):
+            return folds.evaluate(model, [OPTUNA_SPACES[model_name](trial)])[0]
+
+        study = optuna.create_study(direction='maximize', sampler=optuna.samplers.TPESampler(seed=42))
+        study.optimize(objective, n_trials=n_trials, timeout=time_limit)
+        try:
+            return study.best_params, len(study.trials)
+        except ValueError:  # 目标函数返回 nan 的尝试记为失败,没有成功的尝试时 best_params 抛出异常
+            warnings.warn(f"{model_name} 的 {len(study.trials)} 次 optuna 尝试全部失败,使用模型的默认参数")
+            return {}, len(study.trials)
+    if search == 'halving':
+        return halving_search(model, params, folds, time_limit=time_limit)
+    return grid_search(model, params, folds, time_limit)
+
+
+def train_and_evaluate_models(X_train, X_test, y_train, y_test, result_dir, model_names=None,
+                              model_dir=None, scaler=None, search='grid', time_budget=None, groups_train=None):
+    """训练和评估多个机器学习模型
+    
+    该函数完成以下任务:
+    1. 定义多个模型及其超参数搜索空间
+    2. 对每个模型进行超参数搜索找最优参数
+    3. 使用最优参数训练模型(SVM 的概率校准只在最终模型上做一次)
+    4. 评估模型性能并保存评估结果
+
+    全部模型共用同一组交叉验证折(见 search 模块),各折数组只计算一次;给出 groups_train 时
+    同一样本的各行划分到同一折。
+    指定 time_budget 时,全部模型共享这一时间预算:每个模型的搜索时间上限为剩余预算平均分给尚未搜索的
+    模型(grid/halving 方式在搜索中按批检查,超时后在已评估的参数组合中选择);预算用完后,其余模型不再搜索,
+    直接以参数网格中的第一组参数训练。
+    
+    Args:
+        X_train: 训练集特征
+        X_test: 测试集特征
+        y_train: 训练集标签
+        y_test: 测试集标签
+        result_dir: 结果保存目录
+        model_names: 要训练的模型名称,None 表示 MODEL_NAMES 中的全部模型
+        model_dir: 模型注册表目录,None 表示不保存模型
+        scaler: 与模型一同保存的标准化器
+        search: 超参数搜索方式,见 search_hyperparameters
+        time_budget: 全部模型超参数搜索的总时间预算(秒),None 表示不限制
+        groups_train: 训练集每行的样本ID,None 表示按行划分交叉验证折
+        
+    Returns:
+        metrics: 包含所有模型评估指标的列表
+    """
+    # 定义模型及其超参数网格
+    models = {
+        'Logistic Regression': (
+            LogisticRegression(max_iter=500),
+            {'C': [0.1, 1, 10]}  # 正则化参数
+        ),
+        'SVM': (
+            # 搜索时不做概率校准(准确率只依赖 predict),选出最佳参数后再校准一次
+            SVC(),
+            {
+                'C': [0.1, 1, 10],  # 正则化参数
+                'kernel': ['linear', 'rbf']  # 核函数类型
+            }
+        ),
+        'KNN': (
+            KNeighborsClassifier(),
+            {'n_neighbors': [3, 5, 7]}  # 近邻数
+        ),
+        'Random Forest': (
+            RandomForestClassifier(),
+            {'n_estimators': [10, 50, 100]}  # 树的数量
+        ),
+        'Decision Tree': (
+            DecisionTreeClassifier(),
+            {'max_depth': [None, 10, 20]}  # 树的最大深度
+        ),
+        'Naive Bayes': (
+            GaussianNB(),
+            {}  # 朴素贝叶斯没有主要超参数需要调整
+        )
+    }
+    
+    models = {name: value for name, value in models.items() if model_names is None or name in model_names}
+    metrics = []
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    
+    with FoldCache(X_train, y_train, groups_train) as folds:
+        # 对每个模型进行训练和评估
+        for index, (model_name, (model, params)) in enumerate(models.items()):
+            print(f"\n训练 {model_name}...")
+            start = time.perf_counter()
+        
+            # 搜索最优参数,时间预算用完时直接使用参数网格中的第一组参数
+            remaining = None if deadline is None else deadline - start
+            if remaining is not None and remaining <= 0:
+                best_params = {key: values[0] for key, values in params.items()}
+                n_candidates = 0
+                print(f"超参数搜索的时间预算已用完,{model_name} 使用参数 {best_params}")
+            else:
+                time_limit = None if remaining is None else remaining / (len(models) - index)
+                best_params, n_candidates = search_hyperparameters(model_name, model, params, folds, search, time_limit)
+        
+            # 以最佳参数在整个训练集上训练,SVM 此时做唯一一次 Platt 概率校准,供 predict_proba 使用
+            best_model = clone(model).set_params(**best_params)
+            if isinstance(best_model, SVC):
+                best_model.set_params(probability=True)
+            best_model.fit(X_train, y_train)
+            search_time = time.perf_counter() - start
+            print(f"最佳参数: {best_params}, 评估参数组合数: {n_candidates}, 用时: {search_time:.1f}s")
+        
+            # 使用最佳参数的模型进行评估
+            acc, prec, rec, f1, auc = evaluate_model(
+                best_model, 
+                X_test, 
+                y_test, 
+                model_name, 
+                result_dir
+            )
+        
+            metrics.append({
+                "Model": model_name,
+                "Accuracy": acc,
+                "Precision": prec,
+                "Recall": rec,
+                "F1-Score": f1,
+                "AUC": auc
+            })
+
+            # 把最佳模型连同标准化器和特征顺序保存到模型注册表,推理时无需重新做网格搜索
+            if model_dir is not None:
+                save_model(model_dir, model_name, best_model, {
+                    'features': list(scaler.feature_names_in_),
+                    'params': best_params,
+                    'search': {'method': search, 'candidates': n_candidates, 'seconds': search_time},
+                    'metrics': {key: float(value) for key, value in metrics[-1].items() if key != 'Model'},
+                }, scaler)
+    
+    return metrics
+
+
+def process_dataset(data_path, result_dir, model_names=None, model_dir=None, search='grid', time_budget=None):
+    """处理单个数据集的完整流程
+    
+    该函数完成以下任务:
+    1. 检查数据文件和目录权限
+    2. 加载和预处理数据
+    3. 训练和评估模型
+    4. 保存结果清单(类别分布和评估指标),图表由 report 模块绘制
+    
+    Args:
+        data_path: 数据集文件路径
+        result_dir: 结果保存目录
+        model_names: 要训练的模型名称,None 表示全部模型
+        model_dir: 数据集的模型注册表目录,None 表示不保存模型
+        search: 超参数搜索方式,'grid'、'halving' 或 'optuna'
+        time_budget: 全部模型超参数搜索的总时间预算(秒),None 表示不限制
+    """
+    try:
+        # 检查数据文件是否存在
+        if not os.path.exists(data_path):
+            raise FileNotFoundError(f"数据文件不存在: {data_path}")
+            
+        # 创建结果目录
+        os.makedirs(result_dir, exist_ok=True)
+        
+        # 检查是否有写入权限
+        test_file = os.path.join(result_dir, "test_write.tmp")
+        try:
+            with open(test_file, 'w') as f:
+                f.write("test")
+            os.remove(test_file)
+        except Exception as e:
+            raise PermissionError(f"无法写入结果目录 {result_dir}: {str(e)}")
+        
+        # 加载和预处理数据
+        X_train, X_test, y_train, y_test, scaler, groups_train = load_and_preprocess_data(data_path)
+        
+        # 训练和评估模型
+        metrics = train_and_evaluate_models(X_train, X_test, y_train, y_test, result_dir, model_names,
+                                            model_dir, scaler, search, time_budget, groups_train)
+        
+        # 保存结果清单
+        save_manifest(result_dir, 'non_tsc', {
+            'train': class_counts(y_train),
+            'test': class_counts(y_test),
+        }, metrics)
+        
+    except Exception as e:
+        print(f"处理数据集时出错: {str(e)}")
+        raise
@@ -0,0 +1,72 @@
+"""预处理脚本的多进程执行工具
+
+各预处理脚本把同一个样本ID的全部文件作为一个工作单元,交给进程池并行解析。结果按
+提交顺序返回,因此只要提交前按 B/M 和样本编号排好序,输出文件的行顺序就与串行执行
+完全一致。
+"""
+import os  # 用于获取CPU核心数
+from concurrent.futures import ProcessPoolExecutor  # 进程池
+
+from tqdm import tqdm  # 用于显示进度条
+
+
+def default_workers():
+    """默认的工作进程数,即本机的CPU核心数"""
+    return os.cpu_count() or 1
+
+
+def add_workers_argument(parser):
+    """为命令行解析器添加 --workers 参数
+
+    Args:
+        parser: argparse.ArgumentParser 实例
+
+    Returns:
+        argparse.ArgumentParser: 添加参数后的解析器
+    """
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='并行解析文件的进程数,1 表示在当前进程中串行执行(默认: CPU核心数)')
+    return parser
+
+
+def parallel_imap(func, tasks, workers=None, desc=None):
+    """在进程池中对每个工作单元调用 func,按提交顺序逐个产出结果
+
+    func 必须是模块顶层定义的函数(或其 functools.partial),以便传递给子进程。调用方可以
+    边接收边把结果写入预先分配的数组,不必先把全部结果收集到列表中。
+
+    Args:
+        func: 处理单个工作单元的函数
+        tasks: 工作单元列表,例如每个样本ID对应的文件路径列表
+        workers: 进程数,None 表示使用全部CPU核心,小于等于1时在当前进程中串行执行
+        desc: 进度条说明
+
+    Yields:
+        与 tasks 顺序一致的各工作单元结果
+    """
+    tasks = list(tasks)
+    workers = min(workers or default_workers(), len(tasks))
+    if workers <= 1:
+        for task in tqdm(tasks, desc=desc):
+            yield func(task)
+        return
+
+    # 每个子进程一次领取若干个工作单元,减少进程间通信次数
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from tqdm(executor.map(func, tasks, chunksize=chunksize), total=len(tasks), desc=desc)
+
+
+def parallel_map(func, tasks, workers=None, desc=None):
+    """与 parallel_imap 相同,但以列表形式一次返回全部结果
+
+    Args:
+        func: 处理单个工作单元的函数
+        tasks: 工作单元列表
+        workers: 进程数,None 表示使用全部CPU核心,小于等于1时在当前进程中串行执行
+        desc: 进度条说明
+
+    Returns:
+        list: 与 tasks 一一对应的结果列表
+    """
+    return list(parallel_imap(func, tasks, workers, desc))
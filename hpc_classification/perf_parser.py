@@ -0,0 +1,298 @@
+"""perf stat 输出文件的批量解析引擎
+
+各预处理脚本原先逐行执行 strip/split 和正则匹配来解析 perf stat -o 的输出文件,
+并对每一行做 20 次事件名子串查找。这里改为一次性读入整个文件,在 NumPy 字节数组上
+一次完成全部行的分词、数值转换和事件编号映射,得到类型化的 (time, event_id, value)
+记录数组,整个过程没有逐行的 Python 循环。
+
+支持两种文件格式:
+- 间隔模式(perf stat -I): "<时间> <计数值> <事件名> ..."
+- 汇总模式(无 -I 参数): "<计数值> <事件名> ..."
+"""
+import numpy as np  # 用于批量分词、类型转换和向量化运算
+
+
+# 解析结果的记录类型:时间戳(汇总模式下为NaN)、事件编号(不在事件表中为-1)、计数值
+PERF_RECORD_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('event_id', np.int16),
+    ('value', np.int64),
+])
+
+# 10 的整数次幂,用于由数字位直接计算数值
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+# 数值字段最多按 18 位数字解析,超出部分会溢出 int64
+_MAX_DIGITS = 18
+
+# 词元最多取前 64 个字节,足以容纳所有事件名和数值
+_MAX_TOKEN_WIDTH = 64
+
+
+def _gather_tokens(windows, starts, lengths):
+    """把若干个词元的字节收集为按最长词元补零对齐的二维矩阵
+
+    Args:
+        windows: 文件内容上的滑动窗口视图,第 i 行为从位置 i 开始的若干字节
+        starts: 各词元的起始位置
+        lengths: 各词元的长度
+
+    Returns:
+        np.ndarray: 形状为 (n_tokens, width) 的 uint8 矩阵,词元之后的位置为0
+    """
+    width = min(max(int(lengths.max()) if len(lengths) else 0, 1), windows.shape[1])
+    tokens = windows[starts, :width]
+    tokens *= np.arange(width) < lengths[:, None]
+    return tokens
+
+
+def _parse_numbers(tokens, allow_dot):
+    """解析词元开头由数字(以及小数点)组成的部分
+
+    直接由各数字位乘以对应的 10 的幂求和得到数值,避免逐个字符串转换。
+
+    Args:
+        tokens: _gather_tokens 返回的词元矩阵(已去除千位分隔符)
+        allow_dot: 是否允许一个小数点(时间戳字段)
+
+    Returns:
+        mantissa: 去掉小数点后的整数,形状为 (n_tokens,)
+        frac_digits: 小数点之后的数字位数
+        run_length: 开头数字部分的长度,等于词元长度说明整个词元都是数字
+    """
+    cols = np.arange(tokens.shape[1])
+    is_digit = (tokens >= ord('0')) & (tokens <= ord('9'))
+    is_dot = tokens == ord('.')
+
+    # 开头数字部分的长度:第一个非数字字符所在的位置(时间戳允许其中有一个小数点)
+    padded = np.zeros((len(tokens), tokens.shape[1] + 1), dtype=bool)
+    padded[:, :-1] = is_digit
+    # 没有小数点的词元记为-1,此时所有数字位都不在小数点之前
+    dot_position = np.full(len(tokens), -1)
+    if allow_dot:
+        dot_position = np.argmin(padded, axis=1)
+        has_dot = is_dot[np.arange(len(tokens)), np.minimum(dot_position, tokens.shape[1] - 1)]
+        has_dot &= dot_position < tokens.shape[1]
+        padded[has_dot, dot_position[has_dot]] = True
+        dot_position[~has_dot] = -1
+    run_length = np.argmin(padded, axis=1)
+
+    # 每个数字位之后还有几位数字,即该位对应的 10 的幂(小数点之前的数字位要再减去小数点本身)
+    exponent = run_length[:, None] - 1 - cols
+    exponent -= cols < dot_position[:, None]
+    valid = is_digit & (exponent >= 0)
+    np.minimum(exponent, _MAX_DIGITS, out=exponent)
+    weights = np.where(valid, _POW10[exponent * valid], 0)
+    mantissa = ((tokens - ord('0')) * weights).sum(axis=1)
+    frac_digits = np.where(dot_position >= 0, run_length - 1 - dot_position, 0)
+    return mantissa, frac_digits, run_length
+
+
+def _map_event_ids(tokens, events):
+    """将事件名词元矩阵映射为事件编号数组
+
+    每个事件名按 8 字节一组折叠成一个 uint64 哈希值,对哈希值去重后只对少量不同的事件名
+    做字典查找,再用逆索引展开;随后逐字节核对每个词元与其代表事件名完全一致,若出现
+    哈希冲突则退回到按字符串去重。
+
+    Args:
+        tokens: _gather_tokens 返回的事件名词元矩阵
+        events: 事件表,事件在表中的位置即事件编号
+
+    Returns:
+        np.ndarray: int16 事件编号数组,不在事件表中的事件为-1
+    """
+    if len(tokens) == 0:
+        return np.empty(0, dtype=np.int16)
+    width = -(-tokens.shape[1] // 8) * 8
+    words = np.zeros((len(tokens), width), dtype=np.uint8)
+    words[:, :tokens.shape[1]] = tokens
+    words = words.view(np.uint64)
+
+    hashes = words[:, 0].copy()
+    for k in range(1, words.shape[1]):
+        hashes *= np.uint64(0x100000001B3)
+        hashes ^= words[:, k]
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if not (words == words[first][inverse]).all():
+        names = np.ascontiguousarray(words).view(f'S{width}').ravel()
+        _, first, inverse = np.unique(names, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+    index = {event.encode(): i for i, event in enumerate(events)}
+    lookup = np.array([index.get(tokens[i].tobytes().rstrip(b'\0'), -1) for i in first],
+                      dtype=np.int16)
+    return lookup[inverse]
+
+
+def parse_perf_buffer(buffer, events, interval=True):
+    """解析 perf stat 输出的完整内容
+
+    只解析以数字开头的数据行,注释行、空行和汇总信息行被跳过。间隔模式下 <not counted>
+    和 <not supported> 以及无法解析为整数的计数值均记为0;汇总模式下只记录以数字开头的
+    计数值,未计数的事件不产生记录。
+
+    Args:
+        buffer: 文件的完整内容(bytes)
+        events: 事件表,决定 event_id 的编号
+        interval: 是否为 perf stat -I 的间隔模式输出
+
+    Returns:
+        np.ndarray: PERF_RECORD_DTYPE 类型的记录数组,按文件中的行顺序排列
+    """
+    # 计数值中的逗号只是千位分隔符,整体去除后数字位连续排列
+    buffer = buffer.replace(b',', b'')
+    data = np.frombuffer(buffer, dtype=np.uint8)
+
+    # 以空白字符为界切分出所有词元的起止位置
+    blank = np.ones(len(data) + 2, dtype=bool)
+    np.less_equal(data, ord(' '), out=blank[1:-1])
+    bounds = np.flatnonzero(blank[1:] != blank[:-1])
+    starts, ends = bounds[0::2], bounds[1::2]
+
+    # 文件内容上的滑动窗口视图,按词元起始位置取行即可得到各词元的字节
+    padded = np.frombuffer(buffer + bytes(_MAX_TOKEN_WIDTH), dtype=np.uint8)
+    windows = np.lib.stride_tricks.as_strided(padded, shape=(len(data), _MAX_TOKEN_WIDTH), strides=(1, 1))
+
+    n_tokens = len(starts)
+    if n_tokens == 0:
+        return np.empty(0, dtype=PERF_RECORD_DTYPE)
+
+    # 每一行的第一个词元,以及判断第 k 个词元是否仍在本行内
+    newlines = np.flatnonzero(data == ord('\n'))
+    line_ends = np.append(newlines, len(data))
+    line_starts = np.insert(newlines + 1, 0, 0)
+    first = np.searchsorted(starts, line_starts)
+
+    def token_exists(offset):
+        # first/line_ends 在筛选数据行后会被重新绑定
+        position = first + offset
+        return (position < n_tokens) & (starts[np.minimum(position, n_tokens - 1)] < line_ends)
+
+    first_char = data[starts[np.minimum(first, n_tokens - 1)]]
+    is_data = token_exists(0) & (first_char >= ord('0')) & (first_char <= ord('9'))
+
+    if interval:
+        is_data &= token_exists(2)
+        first, line_ends = first[is_data], line_ends[is_data]
+        # 计数值为 <not counted>/<not supported> 时事件名后移一个词元
+        not_counted = data[starts[first + 1]] == ord('<')
+        keep = ~not_counted | token_exists(3)
+        first, not_counted = first[keep], not_counted[keep]
+
+        # 同一采样间隔的各行时间戳相同,只解析与上一行不同的时间戳再展开
+        time_tokens = _gather_tokens(windows, starts[first], ends[first] - starts[first])
+        changed = np.ones(len(time_tokens), dtype=bool)
+        changed[1:] = (time_tokens[1:] != time_tokens[:-1]).any(axis=1)
+        mantissa, frac_digits, _ = _parse_numbers(time_tokens[changed], allow_dot=True)
+        times = (mantissa / _POW10[np.minimum(frac_digits, _MAX_DIGITS)])[np.cumsum(changed) - 1]
+
+        value_index = first + 1
+        value_tokens = _gather_tokens(windows, starts[value_index], ends[value_index] - starts[value_index])
+        values, _, run_length = _parse_numbers(value_tokens, allow_dot=False)
+        # 整个计数值都是数字时才有效,否则(包括<not counted>)记为0
+        values[(run_length != ends[value_index] - starts[value_index]) | not_counted] = 0
+        event_index = first + 2 + not_counted
+    else:
+        is_data &= token_exists(1)
+        first = first[is_data]
+        value_tokens = _gather_tokens(windows, starts[first], ends[first] - starts[first])
+        values, _, _ = _parse_numbers(value_tokens, allow_dot=False)
+        times = np.nan
+        event_index = first + 1
+
+    name_tokens = _gather_tokens(windows, starts[event_index], ends[event_index] - starts[event_index])
+    records = np.empty(len(event_index), dtype=PERF_RECORD_DTYPE)
+    records['time'] = times
+    records['event_id'] = _map_event_ids(name_tokens, events)
+    records['value'] = values
+    return records
+
+
+def read_perf_file(file_path, events, interval=True):
+    """一次性读入并解析单个 perf stat 输出文件
+
+    Args:
+        file_path: 文件路径
+        events: 事件表
+        interval: 是否为 perf stat -I 的间隔模式输出
+
+    Returns:
+        np.ndarray: PERF_RECORD_DTYPE 类型的记录数组
+    """
+    with open(file_path, 'rb') as f:
+        return parse_perf_buffer(f.read(), events, interval)
+
+
+def _last_occurrence(keys):
+    """返回每个不同取值最后一次出现的位置,用于实现"后出现的值覆盖先出现的值" """
+    _, reversed_index = np.unique(keys[::-1], return_index=True)
+    return len(keys) - 1 - reversed_index
+
+
+def records_to_counts(records, n_events):
+    """将汇总模式的记录整理为按事件编号排列的计数向量
+
+    同一事件出现多次时以最后一次为准。
+
+    Args:
+        records: parse_perf_buffer 返回的记录数组
+        n_events: 事件表长度
+
+    Returns:
+        values: 形状为 (n_events,) 的 int64 计数向量,缺失的事件为0
+        present: 形状为 (n_events,) 的布尔向量,标记文件中出现过的事件
+    """
+    records = records[records['event_id'] >= 0]
+    values = np.zeros(n_events, dtype=np.int64)
+    present = np.zeros(n_events, dtype=bool)
+    if len(records):
+        last = records[_last_occurrence(records['event_id'])]
+        values[last['event_id']] = last['value']
+        present[last['event_id']] = True
+    return values, present
+
+
+def records_to_intervals(records, n_events):
+    """将间隔模式的记录整理为 (时间点, 事件) 矩阵
+
+    相邻记录的时间戳发生变化即视为进入新的采样间隔;同一间隔内同一事件出现多次时
+    以最后一次为准。
+
+    Args:
+        records: parse_perf_buffer 返回的记录数组
+        n_events: 事件表长度
+
+    Returns:
+        times: 形状为 (n_intervals,) 的各采样间隔时间戳
+        values: 形状为 (n_intervals, n_events) 的 int64 计数矩阵,缺失的事件为0
+        present: 形状为 (n_intervals, n_events) 的布尔矩阵,标记出现过的事件
+    """
+    if len(records) == 0:
+        return (np.empty(0, dtype=np.float64),
+                np.zeros((0, n_events), dtype=np.int64),
+                np.zeros((0, n_events), dtype=bool))
+
+    # 时间戳变化处开始新的间隔(不在事件表中的记录同样参与划分,与逐行解析保持一致)
+    new_interval = np.empty(len(records), dtype=bool)
+    new_interval[0] = True
+    np.not_equal(records['time'][1:], records['time'][:-1], out=new_interval[1:])
+    interval_ids = np.cumsum(new_interval) - 1
+    times = records['time'][new_interval]
+
+    known = records['event_id'] >= 0
+    interval_ids = interval_ids[known]
+    event_ids = records['event_id'][known].astype(np.int64)
+    counts = records['value'][known]
+
+    values = np.zeros((len(times), n_events), dtype=np.int64)
+    present = np.zeros((len(times), n_events), dtype=bool)
+    # NumPy 不保证重复位置的写入顺序,同一(间隔, 事件)出现多次时先筛出最后一次出现的记录
+    cells = interval_ids * n_events + event_ids
+    if len(cells) and np.bincount(cells).max() > 1:
+        last = _last_occurrence(cells)
+        interval_ids, event_ids, counts = interval_ids[last], event_ids[last], counts[last]
+    values[interval_ids, event_ids] = counts
+    present[interval_ids, event_ids] = True
+    return times, values, present
@@ -0,0 +1,36 @@
+"""原始 perf stat 输出文件的预处理
+
+按采样周期、采样方式和数据粒度选择对应的处理函数,把 Datasets/Original 下的原始文件
+整理为 Datasets/Processed 下的 CSV 文件(以及可选的二进制数据集)。默认只解析新增或内容有变化的
+样本,其余样本使用上次预处理缓存的结果(见 cache 模块)。
+"""
+from ..config import PROJECT_ROOT, original_path, processed_path
+from . import non_tdm, tdm
+
+# 采样方式 -> {数据粒度: 处理函数}
+PREPROCESSORS = {
+    'TDM': tdm.PREPROCESSORS,
+    'Non-TDM': non_tdm.PREPROCESSORS,
+}
+
+
+def run_preprocess(duration, mode, granularity, workers=None, binary=False, root=PROJECT_ROOT, cache=True):
+    """预处理单个数据集
+
+    Args:
+        duration: 采样周期,例如 '10s'
+        mode: 采样方式,'TDM' 或 'Non-TDM'
+        granularity: 数据粒度,'short'、'full'、'coarse' 或 'fine'
+        workers: 并行解析文件的进程数
+        binary: 是否同时输出二进制数据集
+        root: 项目根目录
+        cache: 是否使用增量预处理缓存,False 时重新解析全部原始文件
+
+    Returns:
+        output_file: 输出的 CSV 文件路径
+        stats: 缓存命中情况,见 cache.cached_imap
+    """
+    output_file = processed_path(duration, mode, granularity, root)
+    stats = PREPROCESSORS[mode][granularity](original_path(duration, mode, granularity, root), output_file, workers,
+                                             binary, cache)
+    return output_file, stats
@@ -0,0 +1,187 @@
+"""增量预处理的结果缓存
+
+每个输出文件旁边有一个缓存目录 <名称>.cache,其中:
+- index.pkl: 各原始文件的 (修改时间, 大小, 内容哈希),修改时间和大小都没有变化的文件不再重新计算哈希;
+  以及上次预处理的工作单元顺序
+- 每个工作单元(一个样本的全部文件)一个压缩的解析结果文件,文件名为该工作单元全部文件内容哈希的摘要
+
+再次预处理时只解析新增或内容有变化的样本,其余样本逐个从缓存读入,内存中不会同时保存全部样本的
+解析结果。输出按与完整预处理相同的顺序写出,因此与完整预处理完全一致;全部样本和顺序都没有变化、
+输出文件已存在时不再重写输出。文件被移动或重命名但内容不变时也会命中缓存;删除的样本从缓存中移除。
+缓存文件损坏或被截断时按未命中处理,重新解析对应的样本。
+
+解析代码有改动时缓存不会自动失效,需要用 --no-cache 完整预处理一次(或提高 CACHE_VERSION)。
+"""
+import hashlib  # 用于计算原始文件的内容哈希
+import os  # 用于获取文件状态和替换缓存文件
+import pickle  # 用于保存缓存
+import zlib  # 用于压缩解析结果(补0的计数矩阵压缩率很高)
+
+from ..dataset import binary_dataset_paths
+from ..parallel import parallel_imap
+
+CACHE_VERSION = 2  # 解析结果的格式或解析逻辑改变时加1,使旧缓存失效
+INDEX_FILE = 'index.pkl'
+UNIT_SUFFIX = '.pkl.z'
+CACHE_ERRORS = (OSError, EOFError, pickle.UnpicklingError, zlib.error, ValueError, KeyError)  # 缓存文件损坏
+
+
+def cache_path(output_file):
+    """输出文件对应的缓存目录路径"""
+    return os.path.splitext(output_file)[0] + '.cache'
+
+
+def func_identity(func):
+    """工作进程函数的标识,包括 functools.partial 固定的参数,函数或参数不同时不使用缓存"""
+    keywords = getattr(func, 'keywords', {})
+    func = getattr(func, 'func', func)
+    return CACHE_VERSION, f"{func.__module__}.{func.__qualname__}", repr(sorted(keywords.items()))
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """原始文件内容的 BLAKE2b 哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def replace_file(path, data):
+    """先写临时文件再替换,中断时不会留下写了一半的缓存文件"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def outputs_exist(output_file, binary=False):
+    """输出的 CSV 文件(以及需要时的二进制数据集)是否都已存在"""
+    paths = [output_file] + (list(binary_dataset_paths(output_file)) if binary else [])
+    return all(os.path.exists(path) for path in paths)
+
+
+class PreprocessCache:
+    """一个输出文件的预处理缓存
+
+    Args:
+        output_file: 输出的 CSV 文件路径
+        func: 处理单个工作单元的函数,与缓存中记录的函数不同时不使用旧的解析结果
+    """
+
+    def __init__(self, output_file, func):
+        self.path = cache_path(output_file)
+        self.identity = func_identity(func)
+        if os.path.isfile(self.path):  # 旧版本的单文件缓存
+            os.remove(self.path)
+        self.files = {}  # 原始文件路径 -> (修改时间, 大小, 内容哈希)
+        self.units = []  # 上次预处理各工作单元的结果文件名,按工作单元顺序
+        try:
+            with open(os.path.join(self.path, INDEX_FILE), 'rb') as f:
+                index = pickle.load(f)
+            self.files, self.units = index['files'], index['units']
+        except CACHE_ERRORS:  # 没有索引或索引损坏时重新计算各文件的哈希,已有的解析结果仍然可用
+            pass
+        self.seen = {}  # 本次用到的原始文件,保存时只保留这些文件的记录
+
+    def file_key(self, path):
+        """原始文件的内容哈希,修改时间和大小与记录相同时直接使用记录的哈希"""
+        stat = os.stat(path)
+        record = self.files.get(path)
+        if record is None or tuple(record[:2]) != (stat.st_mtime_ns, stat.st_size):
+            record = (stat.st_mtime_ns, stat.st_size, file_hash(path))
+        self.seen[path] = record
+        return record[2]
+
+    def task_key(self, task):
+        """工作单元的键:与工作单元结构相同(文件路径或嵌套的路径列表)的内容哈希元组"""
+        if isinstance(task, str):
+            return self.file_key(task)
+        return tuple(self.task_key(item) for item in task)
+
+    def unit_name(self, task):
+        """工作单元的结果文件名,由处理函数的标识和全部文件的内容哈希得到"""
+        digest = hashlib.blake2b(repr((self.identity, self.task_key(task))).encode(), digest_size=16)
+        return digest.hexdigest() + UNIT_SUFFIX
+
+    def unit_path(self, name):
+        """缓存目录中文件的路径"""
+        return os.path.join(self.path, name)
+
+    def has_result(self, name):
+        """是否有该工作单元的解析结果"""
+        return os.path.exists(self.unit_path(name))
+
+    def load_result(self, name):
+        """读入一个工作单元的解析结果,文件损坏时抛出 CACHE_ERRORS 中的异常"""
+        with open(self.unit_path(name), 'rb') as f:
+            return pickle.loads(zlib.decompress(f.read()))
+
+    def store_result(self, name, result):
+        """压缩保存一个工作单元的解析结果"""
+        os.makedirs(self.path, exist_ok=True)
+        replace_file(self.unit_path(name), zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), 1))
+
+    def save(self, units):
+        """保存本次用到的原始文件记录和工作单元顺序,并删除不再使用的解析结果"""
+        os.makedirs(self.path, exist_ok=True)
+        keep = set(units) | {INDEX_FILE}
+        for name in os.listdir(self.path):
+            if name not in keep:
+                os.remove(self.unit_path(name))
+        replace_file(os.path.join(self.path, INDEX_FILE),
+                     pickle.dumps({'files': self.seen, 'units': units}, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def cached_imap(func, tasks, output_file, workers=None, desc=None, cache=True, binary=False):
+    """与 parallel_imap 相同,但只解析内容有变化的工作单元,其余逐个从缓存读入
+
+    Args:
+        func: 处理单个工作单元的函数
+        tasks: 工作单元列表,每个工作单元为文件路径或(嵌套的)文件路径列表
+        output_file: 输出的 CSV 文件路径,缓存保存在它旁边
+        workers: 进程数,None 表示使用全部CPU核心
+        desc: 进度条说明
+        cache: 是否使用缓存,False 时解析全部工作单元并重建缓存
+        binary: 输出是否包括二进制数据集,用于判断已有的输出是否完整
+
+    Returns:
+        stats: {'samples': 工作单元数, 'cached': 使用缓存结果的工作单元数,
+            'unchanged': 工作单元及其顺序与上次预处理相同、全部命中缓存且输出已存在,不需要重写输出}
+        results: 与 tasks 顺序一致的各工作单元结果的迭代器
+    """
+    tasks = list(tasks)
+    preprocess_cache = PreprocessCache(output_file, func)
+    units = [preprocess_cache.unit_name(task) for task in tasks]
+
+    # 缺少结果的工作单元(内容相同的只解析一次)按首次出现的顺序交给进程池
+    pending = {}
+    for name, task in zip(units, tasks):
+        if not (cache and preprocess_cache.has_result(name)):
+            pending.setdefault(name, task)
+    stats = {
+        'samples': len(tasks),
+        'cached': sum(name not in pending for name in units),
+        'unchanged': not pending and units == preprocess_cache.units and outputs_exist(output_file, binary),
+    }
+    if not pending:  # 输出不需要重写时结果不会被读取,先保存文件记录
+        preprocess_cache.save(units)
+
+    def results():
+        computed = parallel_imap(func, list(pending.values()), workers, desc)
+        for name, task in zip(units, tasks):
+            if name in pending:
+                result = next(computed)
+                preprocess_cache.store_result(name, result)
+                del pending[name]  # 内容相同的后续工作单元从缓存读入
+            else:
+                try:
+                    result = preprocess_cache.load_result(name)
+                except CACHE_ERRORS:  # 缓存文件损坏,在当前进程中重新解析
+                    result = func(task)
+                    preprocess_cache.store_result(name, result)
+                    stats['cached'] -= 1
+            yield result
+        preprocess_cache.save(units)
+
+    return stats, results()
@@ -0,0 +1,258 @@
+"""非时分复用采样数据的预处理
+
+非时分复用方式每次只采集4个HPC事件,分5组采集,文件名为 <B|M>_<样本编号>_<组号>.txt,
+同一样本的各组文件合并后得到全部20个事件。各粒度的处理方式:
+- short: 5个子目录中各有一组文件,每个子目录合并为一行汇总计数
+- full: 同一样本的全部文件合并为一行汇总计数
+- coarse/fine: 同一样本的全部间隔采样文件合并为 100/900 个时间点
+"""
+import os  # 用于文件和目录操作
+from functools import partial  # 用于固定工作进程函数的事件列表参数
+
+import numpy as np  # 用于数值计算
+
+from ..config import HPC_EVENTS
+from ..dataset import save_count_dataset, save_interval_dataset
+from ..perf_parser import read_perf_file, records_to_counts, records_to_intervals
+from .cache import cached_imap
+
+
+def process_files(file_paths, features):
+    """合并多个汇总计数文件
+
+    Args:
+        file_paths: 性能计数器数据文件路径列表
+        features: 要提取的性能计数器名称列表
+
+    Returns:
+        list: 按features顺序排列的计数器值,后处理的文件覆盖先处理的文件,缺失的计数器为0
+    """
+    counters = np.zeros(len(features), dtype=np.int64)
+    for file_path in file_paths:
+        records = read_perf_file(file_path, features, interval=False)  # 一次性读入并解析整个文件
+        values, present = records_to_counts(records, len(features))  # 整理为按特征顺序排列的计数向量
+        np.copyto(counters, values, where=present)  # 用文件中出现过的计数器更新计数器向量
+    return counters.tolist()
+
+
+def process_counts_sample(file_groups, features):
+    """处理同一个样本在各个目录中的文件,在工作进程中执行
+
+    Args:
+        file_groups: 每个目录中该样本已排序的文件路径列表
+        features: 要提取的性能计数器名称列表
+
+    Returns:
+        list: 每个目录对应一行数据
+    """
+    return [process_files(file_paths, features) for file_paths in file_groups]
+
+
+def get_file_order(filename):
+    """从文件名中提取 (样本编号, 组号) 用于排序"""
+    parts = filename.split('_')
+    return (int(parts[1]), int(parts[2].split('.')[0]))
+
+
+def get_group_number(file_path):
+    """从文件路径中提取组号"""
+    return int(file_path.split('_')[-1].split('.')[0])
+
+
+def sort_sample_names(sample_names):
+    """按样本类型(B/M)和样本编号排序"""
+    return sorted(sample_names, key=lambda x: (x[0], int(x.split('_')[1])))
+
+
+def process_short(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理短时间采样重复5次的汇总计数数据,每个样本输出5行
+
+    Args:
+        input_dir: 原始数据目录,包含 <名称>_1 ~ <名称>_5 五个子目录
+        output_file: 输出的 CSV 文件路径
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    name = os.path.basename(input_dir)
+    input_dirs = [os.path.join(input_dir, f'{name}_{i}') for i in range(1, 6)]
+
+    # 获取所有样本在各个目录中的文件
+    sample_files = {}
+    for dir_num, sub_dir in enumerate(input_dirs, start=1):
+        for filename in sorted(os.listdir(sub_dir), key=get_file_order):
+            if filename.endswith('.txt'):
+                parts = filename.split('_')
+                sample_name = f"{parts[0]}_{parts[1]}"
+                if sample_name not in sample_files:
+                    sample_files[sample_name] = {i: [] for i in range(1, 6)}
+                sample_files[sample_name][dir_num].append(os.path.join(sub_dir, filename))
+
+    # 按样本编号排序,每个样本在5个目录中的文件作为一个工作单元交给进程池
+    sample_names = sort_sample_names(sample_files.keys())
+    tasks = [[sorted(sample_files[sample_name][dir_num], key=get_group_number) for dir_num in range(1, 6)]
+             for sample_name in sample_names]
+    stats, results = cached_imap(partial(process_counts_sample, features=HPC_EVENTS), tasks, output_file, workers,
+                                 "处理样本", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+    results = list(results)
+
+    rows, labels, sample_ids = [], [], []
+    for sample_name, sample_rows in zip(sample_names, results):
+        for row in sample_rows:  # 每个目录中该样本的文件合并为一行
+            rows.append(row)
+            labels.append(1 if sample_name.startswith('M_') else 0)
+            sample_ids.append(sample_name)
+    save_count_dataset(output_file, rows, labels, sample_ids, HPC_EVENTS, binary)
+    return stats
+
+
+def process_full(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理完整时长持续采样的汇总计数数据,每个样本输出1行
+
+    Args:
+        input_dir: 原始数据目录
+        output_file: 输出的 CSV 文件路径
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    # 将文件按样本分组
+    sample_files = {}
+    for filename in sorted(os.listdir(input_dir), key=get_file_order):
+        if filename.endswith('.txt'):
+            parts = filename.split('_')
+            sample_name = f"{parts[0]}_{parts[1]}"
+            sample_files.setdefault(sample_name, []).append(os.path.join(input_dir, filename))
+
+    # 按样本顺序排列,每个样本的所有文件作为一个工作单元交给进程池
+    sample_names = sort_sample_names(sample_files.keys())
+    tasks = [sorted(sample_files[sample_name], key=get_group_number) for sample_name in sample_names]
+    stats, results = cached_imap(partial(process_files, features=HPC_EVENTS), tasks, output_file, workers,
+                                 "处理样本", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+    rows = list(results)
+
+    labels = [1 if sample_name.startswith('M_') else 0 for sample_name in sample_names]
+    save_count_dataset(output_file, rows, labels, sample_names, HPC_EVENTS, binary)
+    return stats
+
+
+def parse_hpc_file(file_path, hpc_events):
+    """解析单个间隔采样文件
+
+    Args:
+        file_path: 文件路径
+        hpc_events: 事件列表
+
+    Returns:
+        x, y, z: 样本类型、样本编号和组号
+        times: 各采样间隔的时间戳
+        values: 形状为 (采样间隔数, 事件数) 的计数矩阵
+        present: 标记各采样间隔中出现过的事件
+    """
+    filename = os.path.basename(file_path)
+    x, y, z = filename.split('_')  # 将文件名按'_'分割为x, y, z
+    z = z.split('.')[0]  # 去掉文件扩展名
+
+    # 一次性读入整个文件并解析为 (时间, 事件编号, 计数值) 记录
+    records = read_perf_file(file_path, hpc_events)
+    # 按时间戳划分采样间隔,得到每个间隔的时间、计数矩阵和事件出现标记
+    times, values, present = records_to_intervals(records, len(hpc_events))
+    return x, y, z, times, values, present
+
+
+def extract_number(id_str):
+    """从样本ID中提取样本编号"""
+    return int(id_str.split('_')[1])
+
+
+def process_interval_sample(file_paths, hpc_events, n_timesteps):
+    """按顺序合并同一个样本ID的全部间隔采样文件,在工作进程中执行
+
+    Returns:
+        time_series: (n_timesteps, 事件数) 的计数矩阵
+        length: 真实时间点数,即最后一个文件的采样间隔数(超出部分已被清零)
+    """
+    time_series = np.zeros((n_timesteps, len(hpc_events)), dtype=np.int64)
+    n_steps = 0
+
+    # 按照原始文件夹中的文件排列的顺序处理文件
+    for file_path in file_paths:
+        _, _, _, times, values, present = parse_hpc_file(file_path, hpc_events)
+
+        n_steps = min(len(times), n_timesteps)  # 数据范围内的时间点数
+        # 用文件中出现过的事件更新数据范围内的时间点
+        np.copyto(time_series[:n_steps], values[:n_steps], where=present[:n_steps])
+        time_series[n_steps:] = 0  # 超出数据范围的时间点为0,不计入真实长度
+
+    return time_series, n_steps
+
+
+def process_intervals(input_dir, output_file, n_timesteps, workers=None, binary=False, cache=True):
+    """处理间隔采样数据,每个样本最多输出 n_timesteps 行
+
+    Args:
+        input_dir: 原始数据目录
+        output_file: 输出的 CSV 文件路径
+        n_timesteps: 每个样本最多的时间点数
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    # 获取所有.txt文件并按照自然序排列,再按样本ID分组
+    files = sorted([file for file in os.listdir(input_dir) if file.endswith('.txt')],
+                   key=lambda f: (f.split('_')[0], int(f.split('_')[1])))
+    files_by_id = {}
+    for file in files:
+        x, y = file.split('_')[:2]
+        z = file.split('_')[2].split('.')[0]
+        files_by_id.setdefault(f"{x}_{y}", {})[z] = file
+
+    # 按B/M和样本编号对ID键排序,每个分组作为一个工作单元交给进程池,结果按提交顺序返回
+    id_keys = sorted(files_by_id, key=lambda x: (x.startswith('M'), extract_number(x)))
+    tasks = [[os.path.join(input_dir, file) for file in files_by_id[id_key].values()] for id_key in id_keys]
+
+    func = partial(process_interval_sample, hpc_events=HPC_EVENTS, n_timesteps=n_timesteps)
+    stats, results = cached_imap(func, tasks, output_file, workers, "处理样本", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+
+    # 预先分配 (样本数, 时间点数, 事件数) 的计数张量,按排序后的样本顺序逐个写入
+    data = np.zeros((len(id_keys), n_timesteps, len(HPC_EVENTS)), dtype=np.int64)
+    lengths = np.zeros(len(id_keys), dtype=np.int64)
+    for i, (time_series, length) in enumerate(results):
+        data[i], lengths[i] = time_series, length
+
+    save_interval_dataset(output_file, id_keys, data, HPC_EVENTS, binary, lengths)
+    return stats
+
+
+def process_coarse(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理 100ms 级间隔采样数据,每个样本最多100个时间点"""
+    return process_intervals(input_dir, output_file, 100, workers, binary, cache)
+
+
+def process_fine(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理 10ms 级间隔采样数据,每个样本最多900个时间点"""
+    return process_intervals(input_dir, output_file, 900, workers, binary, cache)
+
+
+# 各粒度对应的处理函数
+PREPROCESSORS = {
+    'short': process_short,
+    'full': process_full,
+    'coarse': process_coarse,
+    'fine': process_fine,
+}
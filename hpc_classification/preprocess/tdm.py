@@ -0,0 +1,255 @@
+"""时分复用采样数据的预处理
+
+时分复用方式每次同时采集20个HPC事件,文件名为 <B|M>_<样本编号>.txt,各粒度的处理方式:
+- short: 5个子目录中各有一个同名文件,每个文件对应一行汇总计数
+- full: 每个文件对应一行汇总计数
+- coarse: 间隔采样文件取前100个采样间隔
+- fine: 间隔采样文件按时间戳对齐到 10ms 时间点,共1000个时间点,缺失的时间点为0
+"""
+import os  # 用于文件和目录操作
+import re  # 用于从样本ID中提取编号
+from functools import partial  # 用于固定工作进程函数的事件列表参数
+
+import numpy as np  # 用于数值计算
+
+from ..config import HPC_EVENTS, TDM_INTERVAL_EVENTS
+from ..dataset import save_count_dataset, save_interval_dataset
+from ..perf_parser import read_perf_file, records_to_counts, records_to_intervals
+from .cache import cached_imap
+
+
+def process_file(file_path, features):
+    """处理单个汇总计数文件
+
+    Args:
+        file_path: 要处理的文件路径
+        features: 要提取的性能计数器名称列表
+
+    Returns:
+        list: 按features顺序排列的计数器值,缺失的计数器为0
+    """
+    records = read_perf_file(file_path, features, interval=False)  # 一次性读入并解析整个文件
+    values, _ = records_to_counts(records, len(features))  # 整理为按特征顺序排列的计数向量
+    return values.tolist()
+
+
+def process_counts_sample(file_paths, features):
+    """处理同一个样本在各个时间段的文件,在工作进程中执行,每个文件对应一行数据"""
+    return [process_file(file_path, features) for file_path in file_paths]
+
+
+def get_sample_order(filename):
+    """从文件名中提取样本类型和编号用于排序,例如 'B_1.txt' 返回 ('B', 1)"""
+    parts = filename.split('_')  # 按下划线分割文件名
+    sample_type = parts[0]  # 获取样本类型(B或M)
+    sample_num = int(parts[1].split('.')[0])  # 获取样本编号
+    return (sample_type, sample_num)
+
+
+def process_short(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理短时间采样重复5次的汇总计数数据,每个样本输出5行
+
+    Args:
+        input_dir: 原始数据目录,包含 <名称>_1 ~ <名称>_5 五个子目录
+        output_file: 输出的 CSV 文件路径
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    name = os.path.basename(input_dir)
+    input_dirs = [os.path.join(input_dir, f'{name}_{i}') for i in range(1, 6)]
+
+    # 获取第一个目录中的所有文件并按照样本编号排序,用作基准顺序
+    base_files = sorted(
+        [f for f in os.listdir(input_dirs[0]) if f.endswith('.txt')],
+        key=get_sample_order
+    )
+
+    # 每个样本在所有时间段的文件作为一个工作单元,交给进程池并按基准顺序返回结果
+    tasks = [[os.path.join(d, filename) for d in input_dirs] for filename in base_files]
+    stats, results = cached_imap(partial(process_counts_sample, features=HPC_EVENTS), tasks, output_file, workers,
+                                 "处理样本文件", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+    results = list(results)
+
+    rows, labels, sample_ids = [], [], []
+    for filename, sample_rows in zip(base_files, results):
+        for row in sample_rows:
+            rows.append(row)
+            labels.append(1 if filename.startswith('M_') else 0)
+            sample_ids.append(filename.split('.')[0])
+    save_count_dataset(output_file, rows, labels, sample_ids, HPC_EVENTS, binary)
+    return stats
+
+
+def process_full(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理完整时长持续采样的汇总计数数据,每个样本输出1行
+
+    Args:
+        input_dir: 原始数据目录
+        output_file: 输出的 CSV 文件路径
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    # 获取所有txt文件并按样本类型和编号排序
+    all_files = sorted(
+        [f for f in os.listdir(input_dir) if f.endswith('.txt')],
+        key=get_sample_order
+    )
+
+    # 每个文件作为一个工作单元交给进程池,结果按文件排序后的顺序返回
+    file_paths = [os.path.join(input_dir, filename) for filename in all_files]
+    stats, results = cached_imap(partial(process_file, features=HPC_EVENTS), file_paths, output_file, workers,
+                                 "处理样本文件", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+    rows = list(results)
+
+    labels = [1 if filename.startswith('M_') else 0 for filename in all_files]
+    sample_ids = [filename.split('.')[0] for filename in all_files]
+    save_count_dataset(output_file, rows, labels, sample_ids, HPC_EVENTS, binary)
+    return stats
+
+
+def parse_hpc_file(file_path, hpc_events):
+    """解析单个间隔采样文件
+
+    Args:
+        file_path: 文件路径
+        hpc_events: 事件列表
+
+    Returns:
+        x, y: 文件名按 '_' 分割后的前两部分,样本ID即 f"{x}_{y}"
+        times: 各采样间隔的时间戳
+        values: 形状为 (采样间隔数, 事件数) 的计数矩阵
+        present: 标记各采样间隔中出现过的事件
+    """
+    filename = os.path.basename(file_path)
+    x, y = filename.split('_')[:2]  # 从文件名中提取x和y的值
+
+    # 一次性读入整个文件并解析为 (时间, 事件编号, 计数值) 记录
+    records = read_perf_file(file_path, hpc_events)
+    # 按时间戳划分采样间隔,得到每个间隔的时间、计数矩阵和事件出现标记
+    times, values, present = records_to_intervals(records, len(hpc_events))
+    return x, y, times, values, present
+
+
+def extract_number(id_str):
+    """提取样本ID中的第一个数字,用于排序"""
+    match = re.search(r'(\d+)', id_str)
+    return int(match.group(1)) if match else 0
+
+
+def process_coarse_sample(file_paths, hpc_events):
+    """按前100个采样间隔合并同一个样本ID的全部文件,在工作进程中执行
+
+    Returns:
+        time_series: (100, 事件数) 的计数矩阵
+        length: 真实时间点数,即各文件中最长的采样间隔数
+    """
+    time_series = np.zeros((100, len(hpc_events)), dtype=np.int64)  # 100个时间点的计数矩阵
+    length = 0
+
+    for file_path in file_paths:  # 按文件夹中的顺序处理该样本的每个文件
+        _, _, times, values, present = parse_hpc_file(file_path, hpc_events)
+
+        n_steps = min(len(times), 100)  # 限制最大时间点
+        # 用文件中出现过的事件更新对应时间点的值
+        np.copyto(time_series[:n_steps], values[:n_steps], where=present[:n_steps])
+        length = max(length, n_steps)
+
+    return time_series, length
+
+
+def process_fine_sample(file_paths, hpc_events):
+    """按 10ms 时间点合并同一个样本ID的全部文件,在工作进程中执行
+
+    Returns:
+        time_series: (1000, 事件数) 的计数矩阵
+        length: 真实时间点数,即最后一个有数据的时间点之后的位置;中间缺失的时间点仍为0
+    """
+    time_series = np.zeros((1000, len(hpc_events)), dtype=np.int64)  # 1000个时间点的计数矩阵,缺失的时间点为0
+    length = 0
+
+    for file_path in file_paths:  # 按文件夹中的顺序处理该样本的每个文件
+        _, _, times, values, present = parse_hpc_file(file_path, hpc_events)
+
+        # 将时间转换为最接近的10ms时间点
+        time_points = np.round(times * 100).astype(np.int64)
+        valid = np.flatnonzero((time_points >= 0) & (time_points < 1000))  # 确保时间点在0-999范围内
+        # 同一时间点出现多次时以最后一次为准
+        _, last = np.unique(time_points[valid][::-1], return_index=True)
+        valid = valid[len(valid) - 1 - last]
+        time_series[time_points[valid]] = values[valid]  # 将值存储在对应的时间点
+        if len(valid):
+            length = max(length, int(time_points[valid].max()) + 1)
+
+    return time_series, length
+
+
+def process_intervals(input_dir, output_file, sample_func, n_timesteps, workers=None, binary=False, cache=True):
+    """处理间隔采样数据,每个样本最多输出 n_timesteps 行
+
+    Args:
+        input_dir: 原始数据目录
+        output_file: 输出的 CSV 文件路径
+        sample_func: 合并单个样本全部文件的函数,返回 (n_timesteps, 事件数) 的计数矩阵和真实时间点数
+        n_timesteps: 每个样本最多的时间点数
+        workers: 并行进程数
+        binary: 是否同时输出二进制数据集
+        cache: 是否只解析新增或内容有变化的样本,其余使用上次预处理缓存的结果
+
+    Returns:
+        dict: 缓存命中情况,见 cache.cached_imap
+    """
+    # 按样本ID对文件分组,每个样本ID作为一个工作单元
+    files_by_id = {}
+    for file in os.listdir(input_dir):
+        if file.endswith('.txt'):
+            x, y = file.split('_')[:2]
+            files_by_id.setdefault(f"{x}_{y}", []).append(os.path.join(input_dir, file))
+
+    # 按B/M和样本编号排序后交给进程池,结果按提交顺序返回
+    id_keys = sorted(files_by_id, key=lambda x: (x.startswith('M'), extract_number(x)))
+    tasks = [files_by_id[id_key] for id_key in id_keys]
+
+    func = partial(sample_func, hpc_events=TDM_INTERVAL_EVENTS)
+    stats, results = cached_imap(func, tasks, output_file, workers, "处理样本", cache, binary)
+    if stats['unchanged']:  # 与上次预处理相同,不重写输出
+        return stats
+
+    # 预先分配 (样本数, 时间点数, 事件数) 的计数张量,按排序后的样本顺序逐个写入
+    data = np.zeros((len(id_keys), n_timesteps, len(TDM_INTERVAL_EVENTS)), dtype=np.int64)
+    lengths = np.zeros(len(id_keys), dtype=np.int64)
+    for i, (time_series, length) in enumerate(results):
+        data[i], lengths[i] = time_series, length
+
+    save_interval_dataset(output_file, id_keys, data, TDM_INTERVAL_EVENTS, binary, lengths)
+    return stats
+
+
+def process_coarse(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理 100ms 级间隔采样数据,每个样本最多100个时间点"""
+    return process_intervals(input_dir, output_file, process_coarse_sample, 100, workers, binary, cache)
+
+
+def process_fine(input_dir, output_file, workers=None, binary=False, cache=True):
+    """处理 10ms 级间隔采样数据,每个样本最多1000个时间点"""
+    return process_intervals(input_dir, output_file, process_fine_sample, 1000, workers, binary, cache)
+
+
+# 各粒度对应的处理函数
+PREPROCESSORS = {
+    'short': process_short,
+    'full': process_full,
+    'coarse': process_coarse,
+    'fine': process_fine,
+}
@@ -0,0 +1,131 @@
+"""训练好的模型的版本化注册表
+
+每个数据集的模型保存在 Models 目录下与 Results 相同结构的子目录中,每次训练生成一个新版本:
+
+    Models/<采样周期>/<采样方式>/<数据集名称>/<模型名称>/v<版本号>/
+        metadata.json   模型类型、特征顺序、序列长度、超参数和评估指标等元数据
+        model.pt        深度学习模型的参数(torch.save 保存的 state_dict)
+        model.joblib    传统机器学习模型(网格搜索得到的 best_estimator_)
+        scaler.joblib   特征标准化器(传统机器学习模型的 StandardScaler 或时序模型的 SequenceNormalizer)
+        model.torchscript.pt / model.onnx / normalizer.npz
+                        export 模块导出的时序模型推理文件(可选),由 runtime 模块加载
+
+版本目录先写入临时目录再整体重命名,加载方不会读到写了一半的版本。推理进程通过
+load_model 直接加载,无需重新训练或重新做网格搜索。
+"""
+import json  # 用于保存元数据
+import os  # 用于文件和目录操作
+import re  # 用于解析版本目录名
+import shutil  # 用于清理写入失败的临时目录
+import time  # 用于记录创建时间
+
+import joblib  # 用于保存和加载 sklearn 对象
+
+METADATA_FILE = 'metadata.json'
+TORCH_FILE = 'model.pt'
+SKLEARN_FILE = 'model.joblib'
+SCALER_FILE = 'scaler.joblib'
+TORCHSCRIPT_FILE = 'model.torchscript.pt'
+ONNX_FILE = 'model.onnx'
+NORMALIZER_FILE = 'normalizer.npz'
+
+
+def model_versions(model_dir, model_name):
+    """返回某个模型已保存的全部版本号,按从小到大排列"""
+    path = os.path.join(model_dir, model_name)
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(m.group(1)) for m in map(re.compile(r'v(\d+)$').match, os.listdir(path)) if m)
+
+
+def version_path(model_dir, model_name, version=None):
+    """返回某个版本的目录,version 为 None 时返回最新版本
+
+    Raises:
+        FileNotFoundError: 模型没有已保存的版本
+    """
+    if version is None:
+        versions = model_versions(model_dir, model_name)
+        if not versions:
+            raise FileNotFoundError(f"模型注册表中没有 {model_name}: {model_dir}")
+        version = versions[-1]
+    return os.path.join(model_dir, model_name, f'v{version}')
+
+
+def save_model(model_dir, model_name, model, metadata, scaler=None):
+    """把训练好的模型保存为注册表中的一个新版本
+
+    Args:
+        model_dir: 数据集的模型注册表目录
+        model_name: 模型名称
+        model: torch 模型(保存 state_dict)或 sklearn 模型(整体保存)
+        metadata: 元数据字典,例如特征顺序、序列长度和评估指标,必须可以序列化为 JSON
+        scaler: 推理前对输入做的标准化,例如 StandardScaler 或 SequenceNormalizer
+
+    Returns:
+        str: 新版本的目录
+    """
+    os.makedirs(os.path.join(model_dir, model_name), exist_ok=True)
+    while True:
+        versions = model_versions(model_dir, model_name)
+        version = versions[-1] + 1 if versions else 1
+        target = version_path(model_dir, model_name, version)
+        staging = f"{target}.tmp{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        try:
+            metadata = dict(metadata, model_name=model_name, version=version,
+                            created=time.strftime('%Y-%m-%dT%H:%M:%S'))
+            if hasattr(model, 'state_dict'):
+                import torch  # 只在保存深度学习模型时导入
+                torch.save(model.state_dict(), os.path.join(staging, TORCH_FILE))
+                metadata['kind'] = 'torch'
+            else:
+                joblib.dump(model, os.path.join(staging, SKLEARN_FILE))
+                metadata['kind'] = 'sklearn'
+            if scaler is not None:
+                joblib.dump(scaler, os.path.join(staging, SCALER_FILE))
+            with open(os.path.join(staging, METADATA_FILE), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            os.rename(staging, target)  # 同一版本号已被其他进程占用时重试下一个版本号
+            return target
+        except OSError:
+            if not os.path.exists(target):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def load_metadata(model_dir, model_name, version=None):
+    """只读取某个版本的元数据"""
+    with open(os.path.join(version_path(model_dir, model_name, version), METADATA_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_model(model_dir, model_name, version=None):
+    """加载注册表中的模型
+
+    Args:
+        model_dir: 数据集的模型注册表目录
+        model_name: 模型名称
+        version: 版本号,None 表示最新版本
+
+    Returns:
+        model: 深度学习模型(已处于评估模式)或 sklearn 模型
+        metadata: 元数据字典
+        scaler: 保存时提供的特征标准化器,没有时为 None
+    """
+    path = version_path(model_dir, model_name, version)
+    metadata = load_metadata(model_dir, model_name, version)
+
+    if metadata['kind'] == 'torch':
+        import torch  # 只在加载深度学习模型时导入
+        from .tsc import build_models
+        (model, _), = build_models(metadata['input_size'], metadata['hidden_size'], [model_name])
+        model.load_state_dict(torch.load(os.path.join(path, TORCH_FILE), map_location='cpu', weights_only=True))
+        model.eval()
+    else:
+        model = joblib.load(os.path.join(path, SKLEARN_FILE))
+
+    scaler_file = os.path.join(path, SCALER_FILE)
+    scaler = joblib.load(scaler_file) if os.path.exists(scaler_file) else None
+    return model, metadata, scaler
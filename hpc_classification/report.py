@@ -0,0 +1,315 @@
+"""评估结果的图表绘制
+
+训练进程只保存结构化结果(见 results 模块),本模块在训练之后读取结果目录绘制全部图表,
+多个结果目录可以在进程池中并行绘制:
+
+    python -m hpc_classification report --duration 10s --workers 8
+
+深度学习时序分类(tsc)的结果目录生成:
+- dataset_distribution.png: 训练集、验证集和测试集的样本数饼图
+- confusion_matrix_<模型>.png: 各模型的混淆矩阵
+- attention_weights_<模型>.png: 带注意力机制的模型在前5个测试样本上的注意力权重
+- model_performance_comparison.png: 各模型的性能对比柱状图
+- combined_roc_curves.png: 各模型的ROC曲线
+- early_classification.png: 运行过 early 命令时,各模型的前缀准确率曲线和准确率与检测时间的权衡
+
+传统机器学习分类(non_tsc)的结果目录生成:
+- class_distribution.svg: 训练集和测试集的类别分布饼图
+- confusion_matrix_<模型>.png: 各模型的混淆矩阵(dpi=300)
+- model_performance_comparison.png: 各模型的性能对比柱状图
+"""
+import multiprocessing  # 用于创建 spawn 方式启动的绘图进程
+import os  # 用于构建文件路径
+from concurrent.futures import ProcessPoolExecutor  # 用于并行绘制多个结果目录
+
+import matplotlib
+matplotlib.use('Agg')  # 只输出文件,不需要图形界面
+import matplotlib.pyplot as plt  # 用于绘制各类图表
+import pandas as pd  # 用于整理评估指标
+import seaborn as sns  # 用于绘制混淆矩阵热力图
+from sklearn.metrics import confusion_matrix, roc_auc_score, roc_curve  # 用于混淆矩阵和ROC曲线
+from tqdm import tqdm  # 用于显示进度条
+
+from .parallel import default_workers
+from .results import EARLY_DECISION_FILE, EARLY_PREFIX_FILE, load_manifest, load_predictions
+
+# 设置全局字体:优先使用 Times New Roman,没有安装时依次回退到其他衬线字体
+plt.rcParams['font.family'] = 'serif'
+plt.rcParams['font.serif'] = ['Times New Roman', 'Times', 'Liberation Serif', 'DejaVu Serif']
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+
+def plot_dataset_distribution(splits, result_dir):
+    """绘制训练集、验证集和测试集样本数的饼图,保存为 dataset_distribution.png
+
+    Args:
+        splits: 数据集划分名称 -> 各类别样本数
+        result_dir: 结果保存的目录路径
+    """
+    sizes = [sum(splits[name]) for name in ('train', 'val', 'test')]
+    labels = ['Training Set', 'Validation Set', 'Test Set']
+
+    # 创建饼图
+    plt.figure(figsize=(8, 6))  # 设置图形大小
+    plt.pie(
+        sizes,  # 各部分的大小
+        labels=[f"{label} ({size})" for label, size in zip(labels, sizes)],  # 标签显示名称和数量
+        autopct='%1.1f%%',  # 显示百分比,保留一位小数
+        startangle=90  # 起始角度为90度
+    )
+    plt.axis('equal')  # 保持饼图为圆形
+    plt.title('Dataset Sample Distribution')
+
+    # 保存图片
+    plt.savefig(os.path.join(result_dir, "dataset_distribution.png"))
+    plt.close()  # 关闭图形,释放内存
+
+
+def plot_class_distribution(splits, result_dir):
+    """绘制训练集和测试集类别分布的饼图,保存为 class_distribution.svg
+
+    Args:
+        splits: 数据集划分名称 -> 各类别样本数
+        result_dir: 结果保存的目录路径
+    """
+    plt.figure(figsize=(15, 7))
+    for position, (name, title) in enumerate((('train', 'Training'), ('test', 'Test')), start=1):
+        counts = splits[name]
+        plt.subplot(1, 2, position)
+        plt.pie(counts, labels=[f'Class {i}\n({count} samples)' for i, count in enumerate(counts)],
+                autopct='%1.1f%%', startangle=90)
+        plt.title(f'{title} Set Distribution\nTotal: {sum(counts)} samples')
+
+    # 保存图形
+    plt.savefig(os.path.join(result_dir, 'class_distribution.svg'), format='svg', bbox_inches='tight')
+    plt.close()
+
+
+def plot_confusion_matrix(predictions, model_name, result_dir, dpi=None):
+    """绘制并保存模型的混淆矩阵 confusion_matrix_<模型>.png"""
+    cm = confusion_matrix(predictions['y_true'], predictions['y_pred'], labels=[0, 1])  # 计算混淆矩阵
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(
+        cm,  # 混淆矩阵数据
+        annot=True,  # 显示数值
+        fmt='d',  # 数值格式为整数
+        cmap='Blues',  # 使用蓝色色图
+        xticklabels=["Benign", "Malware"],  # x轴标签
+        yticklabels=["Benign", "Malware"]  # y轴标签
+    )
+    plt.title(f"Confusion Matrix - {model_name}")
+    plt.xlabel("Predicted")
+    plt.ylabel("True")
+    plt.savefig(os.path.join(result_dir, f"confusion_matrix_{model_name}.png"),
+                bbox_inches='tight' if dpi else None, dpi=dpi)
+    plt.close()
+
+
+def plot_attention_weights(predictions, model_name, result_dir):
+    """绘制前5个测试样本在真实长度内的注意力权重分布 attention_weights_<模型>.png"""
+    plt.figure(figsize=(10, 6))
+    for i, (att_weights, length) in enumerate(zip(predictions['attention'][:5], predictions['lengths'][:5])):
+        plt.plot(att_weights[:length], label=f'Sample {i+1}')
+    plt.title("Attention Weights Visualization")
+    plt.xlabel("Time Step")
+    plt.ylabel("Attention Weight")
+    plt.legend()
+    plt.savefig(os.path.join(result_dir, f"attention_weights_{model_name}.png"))
+    plt.close()
+
+
+def plot_tsc_performance(metrics, result_dir):
+    """深度学习模型的性能对比柱状图(Accuracy/Precision/Recall/F1-Score),带数值标签"""
+    df = pd.DataFrame(metrics).set_index('Model')  # 将模型名称设为索引
+
+    # 创建柱状图
+    plt.figure(figsize=(14, 8))  # 设置图形大小
+    ax = df[['Accuracy', 'Precision', 'Recall', 'F1-Score']].plot(
+        kind='bar',  # 柱状图类型
+        title="Model Performance Metrics",
+        ax=plt.gca(),
+        color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']  # 设置不同指标的颜色
+    )
+
+    # 设置坐标轴标签和字体
+    plt.ylabel("Score", fontsize=14)
+    plt.xticks(rotation=0, fontsize=12)  # x轴标签不旋转
+    plt.yticks(fontsize=12)
+
+    # 在柱状图上添加数值标签
+    for p in ax.patches:
+        ax.annotate(
+            f'{p.get_height():.2f}',
+            (p.get_x() + p.get_width() / 2., p.get_height()),
+            ha='center',
+            va='bottom',
+            fontsize=12
+        )
+
+    # 设置图例和标题
+    plt.legend(
+        title="Metrics",
+        bbox_to_anchor=(1.05, 1),
+        loc='upper left',
+        fontsize=14
+    )
+    plt.title("Model Performance Metrics", fontsize=16, fontweight='bold')
+
+    # 添加网格线并调整布局
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.2)
+
+    # 保存图表
+    plt.savefig(
+        os.path.join(result_dir, "model_performance_comparison.png"),
+        bbox_inches='tight'
+    )
+    plt.close()
+
+
+def plot_non_tsc_performance(metrics, result_dir):
+    """传统机器学习模型的性能对比柱状图(含 AUC)"""
+    df = pd.DataFrame(metrics).set_index('Model')
+
+    # 创建柱状图
+    plt.figure(figsize=(14, 8))
+    ax = df[['Accuracy', 'Precision', 'Recall', 'F1-Score', 'AUC']].plot(
+        kind='bar',
+        title="Model Performance Comparison",
+        ax=plt.gca(),
+        rot=0  # 横轴标签不旋转
+    )
+
+    plt.ylabel("Score")
+    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+    # 添加数值标签
+    for container in ax.containers:
+        ax.bar_label(container, fmt='%.2f')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(result_dir, "model_performance_comparison.png"))
+    plt.close()
+
+
+def plot_combined_roc_curve(predictions, result_dir):
+    """在同一图表中绘制所有模型的ROC曲线 combined_roc_curves.png
+
+    Args:
+        predictions: 模型名称 -> 预测结果
+        result_dir: 结果保存的目录路径
+    """
+    plt.figure(figsize=(10, 6))
+
+    # 为每个模型绘制ROC曲线
+    for model_name, model_predictions in predictions.items():
+        y_true, y_prob = model_predictions['y_true'], model_predictions['y_prob']
+        fpr, tpr, _ = roc_curve(y_true, y_prob)
+        auc_score = roc_auc_score(y_true, y_prob)
+        plt.plot(fpr, tpr, label=f"{model_name} (AUC = {auc_score:.2f})")
+
+    # 设置图表样式
+    plt.title("Combined ROC Curves for Different Models", fontsize=16)
+    plt.xlabel("False Positive Rate", fontsize=14)
+    plt.ylabel("True Positive Rate", fontsize=14)
+    plt.legend(loc='lower right', fontsize=12)
+    plt.grid()
+    plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.2)
+
+    # 保存图表
+    plt.savefig(
+        os.path.join(result_dir, "combined_roc_curves.png"),
+        bbox_inches='tight'
+    )
+    plt.close()
+
+
+def plot_early_classification(prefix_curve, decisions, result_dir):
+    """提前判定的结果图 early_classification.png
+
+    左图为各模型在不同长度前缀上的准确率,右图为置信度阈值停止规则下准确率与平均判定时间的权衡,
+    每个点对应一个阈值。
+
+    Args:
+        prefix_curve: early.evaluate_early 返回的前缀曲线
+        decisions: early.evaluate_early 返回的各阈值结果
+        result_dir: 结果保存的目录路径
+    """
+    fig, (ax_prefix, ax_tradeoff) = plt.subplots(1, 2, figsize=(14, 6))
+    for model_name, rows in prefix_curve.groupby('Model', sort=False):
+        ax_prefix.plot(rows['Seconds'], rows['Accuracy'], marker='.', label=model_name)
+    ax_prefix.set_title("Accuracy vs. Prefix Length")
+    ax_prefix.set_xlabel("Observed Time (s)")
+    ax_prefix.set_ylabel("Accuracy")
+
+    for model_name, rows in decisions.groupby('Model', sort=False):
+        ax_tradeoff.plot(rows['Mean decision s'], rows['Accuracy'], marker='o', label=model_name)
+        for _, row in rows.iterrows():
+            ax_tradeoff.annotate(f"{row['Threshold']:g}", (row['Mean decision s'], row['Accuracy']),
+                                 textcoords='offset points', xytext=(4, 4), fontsize=9)
+    ax_tradeoff.set_title("Accuracy vs. Time to Decision (confidence thresholds)")
+    ax_tradeoff.set_xlabel("Mean Time to Decision (s)")
+    ax_tradeoff.set_ylabel("Accuracy")
+
+    for ax in (ax_prefix, ax_tradeoff):
+        ax.grid(linestyle='--', alpha=0.7)
+        ax.legend(loc='lower right')
+    plt.tight_layout()
+    plt.savefig(os.path.join(result_dir, "early_classification.png"), bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_report(result_dir):
+    """绘制一个结果目录的全部图表
+
+    Args:
+        result_dir: 结果目录,其中有 results.save_manifest 保存的结果清单
+
+    Returns:
+        bool: 是否绘制,结果目录中没有结果清单时返回 False
+    """
+    manifest = load_manifest(result_dir)
+    if manifest is None:
+        return False
+    metrics = manifest['metrics']
+    predictions = {row['Model']: load_predictions(result_dir, row['Model']) for row in metrics}
+
+    if manifest['kind'] == 'tsc':
+        plot_dataset_distribution(manifest['splits'], result_dir)
+        for model_name, model_predictions in predictions.items():
+            plot_confusion_matrix(model_predictions, model_name, result_dir)
+            if model_predictions['attention'] is not None:
+                plot_attention_weights(model_predictions, model_name, result_dir)
+        plot_tsc_performance(metrics, result_dir)
+        plot_combined_roc_curve(predictions, result_dir)
+        early_files = [os.path.join(result_dir, name) for name in (EARLY_PREFIX_FILE, EARLY_DECISION_FILE)]
+        if all(os.path.exists(path) for path in early_files):
+            plot_early_classification(*map(pd.read_csv, early_files), result_dir)
+    else:
+        plot_class_distribution(manifest['splits'], result_dir)
+        for model_name, model_predictions in predictions.items():
+            plot_confusion_matrix(model_predictions, model_name, result_dir, dpi=300)
+        plot_non_tsc_performance(metrics, result_dir)
+    return True
+
+
+def render_reports(result_dirs, workers=None):
+    """并行绘制多个结果目录的图表
+
+    Args:
+        result_dirs: 结果目录列表
+        workers: 进程数,None 表示使用全部CPU核心,小于等于1时在当前进程中依次绘制
+
+    Returns:
+        list: 实际绘制了图表的结果目录
+    """
+    result_dirs = list(result_dirs)
+    workers = min(workers or default_workers(), len(result_dirs))
+    if workers <= 1:
+        rendered = [render_report(result_dir) for result_dir in tqdm(result_dirs, desc="绘制图表")]
+    else:
+        # 使用 spawn 方式启动绘图进程,不继承训练进程中的 torch 线程池
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            rendered = list(tqdm(executor.map(render_report, result_dirs), total=len(result_dirs), desc="绘制图表"))
+    return [result_dir for result_dir, done in zip(result_dirs, rendered) if done]
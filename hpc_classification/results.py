@@ -0,0 +1,81 @@
+"""分类结果的结构化保存
+
+训练进程只把评估结果保存为结构化数据,图表由 report 模块在训练之后(可以并行)统一绘制:
+
+    Results/<采样周期>/<采样方式>/<数据集名称>/
+        report.json                  结果类型(tsc/non_tsc)、各数据集划分的类别数和各模型的评估指标
+        predictions_test_<模型>.npz  测试集的真实标签、预测标签、预测概率(以及注意力权重等)
+        model_evaluation_results.csv 各模型的评估指标
+        model_results.txt            各模型的评估指标(文本)
+        early_prefix_curve.csv       提前判定:各模型在不同长度前缀上的评估指标(early 模块)
+        early_classification.csv     提前判定:各置信度阈值下的准确率和判定时间(early 模块)
+
+本模块不导入 matplotlib 和 torch,训练进程和绘图进程都可以使用。
+"""
+import json  # 用于保存结果清单
+import os  # 用于构建文件路径
+
+import numpy as np  # 用于保存预测结果
+
+MANIFEST_FILE = 'report.json'
+EARLY_PREFIX_FILE = 'early_prefix_curve.csv'
+EARLY_DECISION_FILE = 'early_classification.csv'
+
+
+def predictions_path(result_dir, model_name, split='test'):
+    """预测结果文件的路径"""
+    return os.path.join(result_dir, f"predictions_{split}_{model_name}.npz")
+
+
+def save_predictions(result_dir, model_name, predictions, split='test'):
+    """把预测结果保存到结果目录,之后无需模型即可重新计算指标或重新绘图
+
+    Args:
+        result_dir: 结果保存的目录路径
+        model_name: 模型名称
+        predictions: 数组字典,至少包括 y_true、y_pred 和 y_prob,值为 None 的项不保存
+        split: 数据集划分的名称
+    """
+    arrays = {key: value for key, value in predictions.items() if value is not None}
+    np.savez_compressed(predictions_path(result_dir, model_name, split), **arrays)
+
+
+def load_predictions(result_dir, model_name, split='test'):
+    """读取 save_predictions 保存的预测结果,没有保存的可选项(例如 attention)为 None"""
+    with np.load(predictions_path(result_dir, model_name, split)) as data:
+        predictions = {key: data[key] for key in data.files}
+    predictions.setdefault('attention', None)
+    return predictions
+
+
+def class_counts(labels):
+    """各类别(0: 良性, 1: 恶意)的样本数"""
+    return np.bincount(np.asarray(labels, dtype=int), minlength=2).tolist()
+
+
+def save_manifest(result_dir, kind, splits, metrics):
+    """保存结果清单,在数据集的全部模型评估完成后调用
+
+    Args:
+        result_dir: 结果保存的目录路径
+        kind: 'tsc'(深度学习时序分类)或 'non_tsc'(传统机器学习分类),决定绘制哪些图表
+        splits: 数据集划分名称 -> 各类别样本数,例如 {'train': [70, 70], 'test': [20, 20]}
+        metrics: 各模型的评估指标字典列表,顺序即图表中的模型顺序
+    """
+    manifest = {
+        'kind': kind,
+        'splits': splits,
+        'metrics': [{key: value if key == 'Model' else float(value) for key, value in row.items()}
+                    for row in metrics],
+    }
+    with open(os.path.join(result_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(result_dir):
+    """读取结果清单,结果目录中没有清单(尚未评估完成)时返回 None"""
+    path = os.path.join(result_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,120 @@
+"""导出模型的推理运行时
+
+加载 export 模块导出的时序分类模型,在 ONNX Runtime 或 TorchScript 中推理。本模块只依赖
+numpy 以及所选后端(onnxruntime 或 torch),不导入训练代码、pandas 和 sklearn,可以部署在
+只负责打分的主机上:
+
+    classifier = load_exported(model_dir, 'LSTM', backend='onnx')
+    probs = classifier.predict_proba(counts, lengths)
+
+输入归一化(log1p + 标准化)使用导出时保存的均值和标准差,与 dataset.SequenceNormalizer 相同。
+"""
+import json  # 用于读取元数据
+import os  # 用于构建文件路径
+
+import numpy as np  # 用于输入归一化
+
+from .registry import METADATA_FILE, NORMALIZER_FILE, ONNX_FILE, TORCHSCRIPT_FILE, version_path
+
+BACKENDS = ('onnx', 'torchscript')
+
+
+def onnxruntime_available():
+    """是否安装了 onnxruntime"""
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ExportedClassifier:
+    """一个导出版本的时序分类模型
+
+    Args:
+        path: 模型注册表中的版本目录
+        backend: 'onnx' 或 'torchscript',None 表示有 ONNX 文件且安装了 onnxruntime 时使用 ONNX,
+            否则使用 TorchScript
+        num_threads: 推理使用的线程数,None 表示后端的默认值;批次大小为1时1个线程通常延迟最低
+
+    Raises:
+        FileNotFoundError: 版本目录中没有所选后端的导出文件
+    """
+    def __init__(self, path, backend=None, num_threads=None):
+        with open(os.path.join(path, METADATA_FILE), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        if backend is None:
+            has_onnx = os.path.exists(os.path.join(path, ONNX_FILE))
+            backend = 'onnx' if has_onnx and onnxruntime_available() else 'torchscript'
+        self.backend = backend
+
+        model_file = os.path.join(path, ONNX_FILE if backend == 'onnx' else TORCHSCRIPT_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"没有导出的 {backend} 模型,请先运行 export 命令: {model_file}")
+        if backend == 'onnx':
+            import onnxruntime  # 只在使用 ONNX 后端时导入
+            options = onnxruntime.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+            self.session = onnxruntime.InferenceSession(model_file, options, providers=['CPUExecutionProvider'])
+        else:
+            import torch  # 只在使用 TorchScript 后端时导入
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            self.module = torch.jit.load(model_file, map_location='cpu')
+
+        normalizer_file = os.path.join(path, NORMALIZER_FILE)
+        self.mean = self.scale = None
+        if os.path.exists(normalizer_file):
+            with np.load(normalizer_file) as data:
+                self.mean, self.scale = data['mean'].astype(np.float32), data['scale'].astype(np.float32)
+
+    @property
+    def features(self):
+        """模型输入的事件顺序"""
+        return self.metadata['features']
+
+    def normalize(self, sequences):
+        """与 SequenceNormalizer.transform 相同的 log1p + 标准化,没有保存归一化参数时原样返回"""
+        x = np.asarray(sequences, dtype=np.float32)
+        if self.mean is None:
+            return x
+        return (np.log1p(np.maximum(x, 0)) - self.mean) / self.scale
+
+    def forward(self, x, lengths):
+        """对已归一化的输入推理
+
+        Args:
+            x: (batch, 时间点数, 事件数) 的 float32 数组
+            lengths: 每个样本的真实时间点数
+
+        Returns:
+            np.ndarray: (batch,) 的恶意概率
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        lengths = np.ascontiguousarray(lengths, dtype=np.int64)
+        if self.backend == 'onnx':
+            return self.session.run(None, {'x': x, 'lengths': lengths})[0]
+        import torch
+        with torch.no_grad():
+            return self.module(torch.from_numpy(x), torch.from_numpy(lengths)).numpy()
+
+    def predict_proba(self, sequences, lengths=None):
+        """对原始计数值推理
+
+        Args:
+            sequences: (batch, 时间点数, 事件数) 的计数值,事件顺序与 features 一致,超出真实长度的部分补0
+            lengths: 每个样本的真实时间点数,None 表示全部等长
+
+        Returns:
+            np.ndarray: (batch,) 的恶意概率
+        """
+        x = self.normalize(sequences)
+        if lengths is None:
+            lengths = np.full(len(x), x.shape[1])
+        return self.forward(x, np.maximum(lengths, 1))
+
+
+def load_exported(model_dir, model_name, version=None, backend=None, num_threads=None):
+    """加载注册表中某个模型版本的导出文件,参数见 ExportedClassifier"""
+    return ExportedClassifier(version_path(model_dir, model_name, version), backend, num_threads)
@@ -0,0 +1,239 @@
+"""传统机器学习模型的交叉验证超参数搜索
+
+每个数据集只划分一次5折交叉验证,每一折的训练部分单独拟合标准化器,标准化后的各折数组
+保存为临时 .npy 文件并以内存映射方式打开。
+全部模型和全部参数组合共用这些折:joblib 工作进程按文件名打开同一份内存映射,
+不再为每次拟合把整个训练集序列化传给工作进程。
+
+短时间采样重复5次的数据集中同一个样本(同一个程序)有5行,测试集划分和交叉验证都按样本ID分组:
+同一样本的全部行只会出现在同一侧,评估指标不会因为训练时见过同一个程序而偏高。每个样本的标签
+是固定的,因此在样本(组)这一级做分层划分,即保持类别比例的分组划分。
+"""
+import math  # 用于计算逐次减半的轮数
+import os  # 用于构建临时文件路径
+import tempfile  # 用于存放各折数组的临时目录
+import time  # 用于控制搜索的时间上限
+import warnings  # 用于提示拟合失败的参数组合
+
+import numpy as np  # 用于数组运算
+from joblib import Parallel, delayed, effective_n_jobs  # 用于在多个进程中并行拟合
+from sklearn.base import clone  # 用于复制未训练的模型
+from sklearn.metrics import accuracy_score  # 交叉验证的评分
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler  # 用于各折的特征标准化
+
+
+def group_split_indices(y, groups, split):
+    """在样本(组)这一级做分层划分,再展开为行索引
+
+    Args:
+        y: 每行的标签,同一组内相同
+        groups: 每行的样本ID
+        split: 以 (组, 组标签) 为输入、产出 (训练组下标, 测试组下标) 的划分函数
+
+    Yields:
+        (train_index, test_index): 按原行顺序排列的行索引
+    """
+    unique_groups, group_index = np.unique(np.asarray(groups), return_inverse=True)
+    group_y = np.zeros(len(unique_groups), dtype=np.asarray(y).dtype)
+    group_y[group_index] = y
+    for train_groups, test_groups in split(unique_groups, group_y):
+        test_mask = np.isin(group_index, test_groups)
+        yield np.flatnonzero(~test_mask), np.flatnonzero(test_mask)
+
+
+def group_train_test_split(y, groups, test_size=0.2, random_state=42):
+    """按样本ID分组、保持类别比例地划分训练集和测试集
+
+    Returns:
+        (train_index, test_index): 按原行顺序排列的行索引
+    """
+    def split(unique_groups, group_y):
+        yield train_test_split(np.arange(len(unique_groups)), test_size=test_size,
+                               random_state=random_state, stratify=group_y)
+
+    return next(group_split_indices(y, groups, split))
+
+
+def fit_and_score(estimator, params, X_train, y_train, X_val, y_val, n_samples=None, random_state=42):
+    """以给定参数在一折的训练部分上拟合模型,返回验证部分的准确率
+
+    Args:
+        estimator: 未训练的模型
+        params: 模型参数
+        X_train, y_train: 该折的训练部分(内存映射数组)
+        X_val, y_val: 该折的验证部分(内存映射数组)
+        n_samples: 只使用训练部分中分层抽样的 n_samples 个样本,None 表示全部
+        random_state: 分层抽样的随机种子
+
+    Returns:
+        float: 验证部分的准确率,拟合失败(例如 n_neighbors 大于训练样本数)时为 nan,
+            与 GridSearchCV 的 error_score=np.nan 相同
+    """
+    if n_samples is not None and n_samples < len(y_train):
+        index, _ = train_test_split(np.arange(len(y_train)), train_size=n_samples,
+                                    stratify=y_train, random_state=random_state)
+        X_train, y_train = X_train[np.sort(index)], y_train[np.sort(index)]
+    try:
+        model = clone(estimator).set_params(**params).fit(X_train, y_train)
+        return accuracy_score(y_val, model.predict(X_val))
+    except ValueError as e:
+        warnings.warn(f"参数 {params} 拟合失败,该折的得分记为 nan: {e}")
+        return np.nan
+
+
+def best_index(scores):
+    """平均准确率最高的参数下标,nan 视为最低,并列时取靠前的一组(与 GridSearchCV 相同)"""
+    return int(np.argmax(np.nan_to_num(scores, nan=-np.inf)))
+
+
+class FoldCache:
+    """一个数据集的交叉验证折,在 with 语句中使用,退出时删除临时文件
+
+    Args:
+        X: 训练集特征
+        y: 训练集标签
+        groups: 每行的样本ID,同一样本的行划分到同一折;None 表示按行分层划分
+            (与 GridSearchCV(cv=5) 相同的 StratifiedKFold)
+        n_splits: 折数
+        n_jobs: 并行拟合的进程数,-1 表示使用所有CPU核心
+    """
+
+    def __init__(self, X, y, groups=None, n_splits=5, n_jobs=-1):
+        self.X = np.asarray(X)
+        self.y = np.asarray(y)
+        self.groups = None if groups is None else np.asarray(groups)
+        self.n_splits = n_splits
+        if self.groups is not None:
+            # 每一折的验证部分每类至少要有一个样本,样本数很少时减少折数
+            unique_groups, first_rows = np.unique(self.groups, return_index=True)
+            min_class = np.bincount(self.y[first_rows].astype(int)).min()
+            if min_class < n_splits:
+                self.n_splits = max(int(min_class), 2)
+                print(f"警告: 训练集中样本数最少的类别只有 {min_class} 个样本,交叉验证改为 {self.n_splits} 折")
+        self.n_jobs = n_jobs
+        self.folds = []  # 每一折为 (X_train, y_train, X_val, y_val) 内存映射数组
+
+    def __enter__(self):
+        self.tmp_dir = tempfile.TemporaryDirectory(prefix='hpc_cv_')
+        self.parallel = Parallel(n_jobs=self.n_jobs)
+        self.parallel.__enter__()  # 全部模型共用同一组工作进程
+
+        for i, (train_index, val_index) in enumerate(self.split()):
+            scaler = StandardScaler().fit(self.X[train_index])  # 只在该折的训练部分上拟合
+            arrays = (scaler.transform(self.X[train_index]), self.y[train_index],
+                      scaler.transform(self.X[val_index]), self.y[val_index])
+            fold = []
+            for name, array in zip(('X_train', 'y_train', 'X_val', 'y_val'), arrays):
+                path = os.path.join(self.tmp_dir.name, f'fold{i}_{name}.npy')
+                np.save(path, array)
+                fold.append(np.load(path, mmap_mode='r'))
+            self.folds.append(tuple(fold))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.parallel.__exit__(exc_type, exc, tb)
+        self.folds = []  # 先释放内存映射,再删除文件
+        self.tmp_dir.cleanup()
+
+    def split(self):
+        """各折的 (训练部分行索引, 验证部分行索引)"""
+        if self.groups is None:
+            return StratifiedKFold(self.n_splits).split(self.X, self.y)
+
+        def split(unique_groups, group_y):
+            return StratifiedKFold(self.n_splits).split(unique_groups, group_y)
+
+        return group_split_indices(self.y, self.groups, split)
+
+    def evaluate(self, estimator, candidates, n_samples=None, deadline=None):
+        """在全部折上评估每组参数
+
+        Args:
+            estimator: 未训练的模型
+            candidates: 参数字典列表
+            n_samples: 每折只使用训练部分中的 n_samples 个样本,None 表示全部
+            deadline: time.perf_counter() 的截止时间,None 表示不限制;给出时参数组合分批评估,每批的拟合数
+                刚好占满全部工作进程,超过截止时间后不再评估剩余的参数组合(第一批总会评估)
+
+        Returns:
+            np.ndarray: 已评估的前若干组参数在各折上的平均准确率,不限制时间时与 candidates 等长
+        """
+        step = len(candidates)
+        if deadline is not None:  # 每批的拟合数刚好能占满全部工作进程
+            step = max(math.ceil(effective_n_jobs(self.n_jobs) / self.n_splits), 1)
+        scores = []
+        for start in range(0, len(candidates), step):
+            if scores and time.perf_counter() >= deadline:
+                break
+            scores.extend(self.parallel(
+                delayed(fit_and_score)(estimator, params, *fold, n_samples)
+                for params in candidates[start:start + step] for fold in self.folds
+            ))
+        return np.asarray(scores).reshape(-1, self.n_splits).mean(axis=1)
+
+    @property
+    def n_train(self):
+        """每一折训练部分的最少样本数"""
+        return min(len(fold[1]) for fold in self.folds)
+
+
+def search_deadline(time_limit):
+    """搜索的截止时间,None 表示不限制"""
+    return None if time_limit is None else time.perf_counter() + time_limit
+
+
+def grid_search(estimator, param_grid, folds, time_limit=None):
+    """穷举网格搜索
+
+    Args:
+        estimator: 未训练的模型
+        param_grid: 参数网格
+        folds: FoldCache 实例
+        time_limit: 搜索的时间上限(秒),超时后只在已评估的参数组合中选择,None 表示不限制
+
+    Returns:
+        best_params: 平均准确率最高的参数,并列时取网格中靠前的一组(与 GridSearchCV 相同)
+        n_candidates: 评估的参数组合数
+    """
+    candidates = list(ParameterGrid(param_grid))
+    scores = folds.evaluate(estimator, candidates, deadline=search_deadline(time_limit))
+    return candidates[best_index(scores)], len(scores)
+
+
+def halving_search(estimator, param_grid, folds, factor=3, time_limit=None):
+    """逐次减半网格搜索
+
+    第一轮每组参数只用少量样本训练,每轮保留准确率最高的 1/factor 组参数并把样本数乘以 factor,
+    最后一轮使用各折全部训练样本。
+
+    Args:
+        estimator: 未训练的模型
+        param_grid: 参数网格
+        folds: FoldCache 实例
+        factor: 每轮淘汰的比例和样本数增长的倍数
+        time_limit: 搜索的时间上限(秒),超时后不再进入下一轮,在当前一轮已评估的参数组合中选择,
+            None 表示不限制
+
+    Returns:
+        best_params: 最后一轮准确率最高的参数
+        n_candidates: 第一轮评估的参数组合数
+    """
+    deadline = search_deadline(time_limit)
+    candidates = list(ParameterGrid(param_grid))
+    n_iterations = math.ceil(math.log(len(candidates), factor)) if len(candidates) > 1 else 0
+    n_classes = len(np.unique(folds.y))
+    n_candidates = None
+    for i in range(n_iterations + 1):
+        n_samples = None
+        if i < n_iterations:  # 每类至少保留2个样本
+            n_samples = max(folds.n_train // factor ** (n_iterations - i), 2 * n_classes)
+        scores = folds.evaluate(estimator, candidates, n_samples, deadline)
+        n_candidates = len(scores) if n_candidates is None else n_candidates
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        if i < n_iterations:
+            keep = math.ceil(len(candidates) / factor)
+            order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind='stable')[:keep]  # 并列时保留靠前的参数
+            candidates = [candidates[j] for j in sorted(order)]
+    return candidates[best_index(scores)], n_candidates
@@ -0,0 +1,361 @@
+"""运行中容器的实时分类
+
+跟踪各容器 perf stat -I <ms> -o <文件> 的输出文件(格式与预处理使用的间隔采样文件相同),
+增量解析新写入的行,在每个容器的环形缓冲区中保留最近 N 个采样间隔,并把有新间隔的
+容器合并为批次,用模型注册表中训练好的 Bi-LSTM / Bi-LSTM + Attention 模型一次前向计算
+得到判定结果(tsc.score_batch,刚开始采样、窗口尚未填满的容器按真实长度打包,与其他容器
+在同一次前向计算中完成)。事件列顺序和窗口长度取自模型的元数据。
+
+stateful 模式下不再每次重新计算整个窗口,而是用模型的 forward_step 只输入新到达的间隔,
+在调用之间携带各容器的 LSTM 状态,每个新间隔的计算量为 O(1)(双向模型的反向方向在最近
+window 个间隔上近似计算,见 tsc.bidirectional_step)。
+
+整个服务运行在一个 asyncio 事件循环中:
+- 轮询任务定期发现新的输出文件,并读取所有文件新增的内容;目录扫描和文件读取、解析在单独的
+  线程中执行,事件循环中只更新缓冲区和推理队列,容器很多时也不会阻塞推理任务
+- 推理任务从队列中取出有新数据的容器,最多等待 max_delay 秒凑成批次,在单独的线程中
+  执行前向计算,避免阻塞文件轮询
+
+同一容器在等待推理期间又产生的新间隔会合并到同一次推理中,因此每个间隔的判定延迟不超过
+轮询间隔 + max_delay + 一次批量前向计算的时间。
+"""
+import asyncio  # 用于并发跟踪大量容器的输出文件
+import json  # 用于输出判定结果
+import os  # 用于文件和目录操作
+import sys  # 用于输出判定结果
+import time  # 用于计算判定延迟
+from concurrent.futures import ThreadPoolExecutor  # 用于在事件循环之外执行前向计算
+
+import numpy as np  # 用于数值计算
+import torch  # 用于模型推理
+
+from .perf_parser import PERF_RECORD_DTYPE, parse_perf_buffer, records_to_intervals
+from .tsc import LSTMClassifier, score_batch
+
+
+def state_length(state):
+    """状态中保存的最近间隔数,用于把状态形状相同的容器分为一组,None 表示序列的开始"""
+    if state is None:
+        return -1
+    return state[2].shape[1] if len(state) > 2 else 0
+
+
+def merge_states(states):
+    """把各容器的增量推理状态沿批次维拼接,(h, c) 的批次维为1,其余张量的批次维为0"""
+    if states[0] is None:
+        return None
+    return tuple(torch.cat(parts, dim=1 if i < 2 else 0) for i, parts in enumerate(zip(*states)))
+
+
+def split_state(state, n):
+    """merge_states 的逆操作,把批量的状态拆分为各容器的状态"""
+    return [tuple(t.narrow(1 if i < 2 else 0, k, 1) for i, t in enumerate(state)) for k in range(n)]
+
+
+class RingBuffer:
+    """保存最近 capacity 个采样间隔的环形缓冲区
+
+    Args:
+        capacity (int): 最多保留的采样间隔数,即模型输入序列的最大长度
+        n_events (int): 每个采样间隔的事件数
+    """
+    def __init__(self, capacity, n_events):
+        self.data = np.zeros((capacity, n_events), dtype=np.float32)
+        self.capacity = capacity
+        self.size = 0  # 已保存的间隔数
+        self.head = 0  # 下一个间隔的写入位置
+
+    def extend(self, rows):
+        """追加若干个采样间隔,超出容量时覆盖最早的间隔"""
+        rows = rows[-self.capacity:]
+        index = (self.head + np.arange(len(rows))) % self.capacity
+        self.data[index] = rows
+        self.head = (self.head + len(rows)) % self.capacity
+        self.size = min(self.size + len(rows), self.capacity)
+
+    def window(self):
+        """按时间顺序返回已保存的采样间隔,形状为 (size, n_events)"""
+        if self.size < self.capacity:
+            return self.data[:self.size]
+        return np.concatenate((self.data[self.head:], self.data[:self.head]))
+
+
+class IntervalTailer:
+    """增量解析单个 perf stat -I 输出文件
+
+    每次只解析新写入的完整行。最后一个时间戳对应的间隔在行数达到此前完整间隔的行数或出现
+    下一个时间戳之前视为尚未写完,暂不输出。文件被截断(容器重启后重新写入)时从头开始解析。
+
+    Args:
+        path (str): perf stat 输出文件路径
+        events (list): 事件表,决定输出矩阵的列顺序
+    """
+    def __init__(self, path, events):
+        self.path = path
+        self.events = events
+        self.offset = 0  # 已读取的字节数
+        self.partial = b''  # 尚未写完的最后一行
+        self.pending = np.empty(0, dtype=PERF_RECORD_DTYPE)  # 最后一个尚未写完的间隔的记录
+        self.interval_size = 0  # 每个完整间隔的行数,由已完成的间隔得到
+
+    def poll(self):
+        """读取文件新增的内容
+
+        Returns:
+            times: 新完成的各采样间隔的时间戳
+            values: 形状为 (新完成的间隔数, 事件数) 的计数矩阵
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < self.offset:  # 文件被截断
+                self.offset, self.partial = 0, b''
+                self.pending = self.pending[:0]
+            f.seek(self.offset)
+            chunk = f.read()
+        self.offset += len(chunk)
+
+        data = self.partial + chunk
+        cut = data.rfind(b'\n') + 1
+        self.partial = data[cut:]
+        records = parse_perf_buffer(data[:cut], self.events)
+        if len(records) == 0:
+            return np.empty(0), np.zeros((0, len(self.events)), dtype=np.int64)
+        records = np.concatenate((self.pending, records))
+
+        # 最后一个时间戳的记录构成的间隔可能尚未写完
+        changes = np.flatnonzero(records['time'][1:] != records['time'][:-1]) + 1
+        start = changes[-1] if len(changes) else 0
+        if len(changes):  # 记录已完成间隔的行数,即每个间隔应有的行数
+            self.interval_size = start - (changes[-2] if len(changes) > 1 else 0)
+        if self.interval_size and len(records) - start >= self.interval_size:
+            start = len(records)  # 最后一个间隔的行数已达到完整间隔的行数
+        self.pending = records[start:]
+
+        times, values, _ = records_to_intervals(records[:start], len(self.events))
+        return times, values
+
+
+class StreamingClassifier:
+    """跟踪多个容器的 perf stat 输出并批量实时分类
+
+    Args:
+        model: 处于评估模式的时序分类模型
+        events (list): 事件表,与模型训练数据的特征列顺序一致
+        window (int): 每个容器保留的最近采样间隔数,即模型输入序列的最大长度
+        threshold (float): 判定为恶意的概率阈值
+        max_batch (int): 一次前向计算最多包含的容器数
+        max_delay (float): 凑成批次的最长等待时间(秒)
+        poll_interval (float): 轮询输出文件的间隔(秒)
+        output: 判定结果的输出流,每个判定为一行 JSON
+        stateful (bool): 是否携带 LSTM 状态增量推理,而不是每次重新计算整个窗口
+        normalizer: 模型训练时使用的输入归一化(SequenceNormalizer),None 表示直接使用原始计数值
+    """
+    def __init__(self, model, events, window=100, threshold=0.5, max_batch=256,
+                 max_delay=0.01, poll_interval=0.05, output=sys.stdout, stateful=False, normalizer=None):
+        self.model = model
+        self.events = events
+        self.window = window
+        self.threshold = threshold
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.output = output
+        self.stateful = stateful
+        self.normalizer = normalizer
+
+        self.tailers = {}  # 容器ID -> IntervalTailer
+        self.buffers = {}  # 容器ID -> RingBuffer
+        self.latest = {}  # 容器ID -> (最新间隔的时间戳, 读到该间隔的时刻)
+        self.seen = {}  # 容器ID -> 已读到的间隔总数
+        self.fresh = {}  # 容器ID -> 尚未输入模型的新间隔(stateful 模式)
+        self.states = {}  # 容器ID -> 增量推理状态(stateful 模式)
+        self.queued = set()  # 已在推理队列中的容器ID
+        self.queue = None  # 推理队列,在事件循环中创建
+        # 前向计算在单独的线程中依次执行,torch 计算期间释放 GIL,不会阻塞文件轮询
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # 文件读取和解析使用另一个线程,不必等待前向计算完成
+        self.io_executor = ThreadPoolExecutor(max_workers=1)
+
+    def add(self, container_id, path):
+        """跟踪一个容器的 perf stat 输出文件"""
+        if container_id not in self.tailers:
+            self.tailers[container_id] = IntervalTailer(path, self.events)
+            self.buffers[container_id] = RingBuffer(self.window, len(self.events))
+
+    @staticmethod
+    def scan(directories):
+        """列出目录中的输出文件,文件名(不含扩展名)作为容器ID;只访问文件系统,可以在线程中执行
+
+        Returns:
+            list: (容器ID, 文件路径) 列表
+        """
+        found = []
+        for directory in directories:
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith('.txt'):
+                    found.append((os.path.splitext(entry.name)[0], entry.path))
+        return found
+
+    def discover(self, directories):
+        """把目录中新出现的输出文件加入跟踪"""
+        for container_id, path in self.scan(directories):
+            self.add(container_id, path)
+
+    def read(self, tailers):
+        """读取并解析若干个输出文件的新内容
+
+        只访问各容器的 IntervalTailer 和 normalizer,不修改缓冲区和推理队列,可以在线程中执行。
+
+        Args:
+            tailers: (容器ID, IntervalTailer) 列表
+
+        Returns:
+            list: (容器ID, times, values) 列表,输出文件已被删除的容器 times 和 values 为 None
+        """
+        results = []
+        for container_id, tailer in tailers:
+            try:
+                times, values = tailer.poll()
+            except FileNotFoundError:  # 容器结束后输出文件被删除
+                results.append((container_id, None, None))
+                continue
+            if len(times) and self.normalizer is not None:  # 归一化逐间隔独立进行,读入时转换一次即可
+                values = self.normalizer.transform(values)
+            results.append((container_id, times, values))
+        return results
+
+    def update(self, results):
+        """把 read 读到的新间隔写入各容器的缓冲区,把有新间隔的容器放入推理队列(在事件循环中执行)"""
+        for container_id, times, values in results:
+            if times is None:
+                del self.tailers[container_id], self.buffers[container_id]
+                for table in (self.latest, self.seen, self.fresh, self.states):
+                    table.pop(container_id, None)
+                continue
+            if len(times) == 0:
+                continue
+            self.buffers[container_id].extend(values)
+            self.seen[container_id] = self.seen.get(container_id, 0) + len(values)
+            if self.stateful:
+                self.fresh.setdefault(container_id, []).append(values.astype(np.float32))
+            self.latest[container_id] = (float(times[-1]), time.perf_counter())
+            if container_id not in self.queued:
+                self.queued.add(container_id)
+                self.queue.put_nowait(container_id)
+
+    def poll(self):
+        """读取所有输出文件的新内容,把有新间隔的容器放入推理队列"""
+        self.update(self.read(list(self.tailers.items())))
+
+    async def poll_loop(self, directories):
+        """定期发现新文件并读取新内容,文件操作在 io_executor 中执行,不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            for container_id, path in await loop.run_in_executor(self.io_executor, self.scan, directories):
+                self.add(container_id, path)
+            # tailers 只在本任务中修改,读取期间不会变化
+            results = await loop.run_in_executor(self.io_executor, self.read, list(self.tailers.items()))
+            self.update(results)
+            await asyncio.sleep(self.poll_interval)
+
+    def predict(self, windows):
+        """对若干个窗口(长度可以不同)做一次前向计算,返回恶意概率"""
+        scores = score_batch(self.model, windows)  # 读入时已经归一化
+        return [score['probability'] for score in scores.values()]
+
+    def predict_stateful(self, inputs, states):
+        """对新间隔数和状态形状相同的若干个容器做一次增量前向计算
+
+        Returns:
+            probs: 各容器的恶意概率
+            states: 各容器的新状态
+        """
+        x = torch.from_numpy(np.stack(inputs))
+        with torch.no_grad():
+            if isinstance(self.model, LSTMClassifier):
+                outputs = self.model.forward_step(x, merge_states(states))
+            else:
+                outputs = self.model.forward_step(x, merge_states(states), self.window)
+        return outputs[0].reshape(-1).numpy(), split_state(outputs[-1], len(inputs))
+
+    async def next_batch(self):
+        """等待有新数据的容器,最多等待 max_delay 秒凑成一个批次"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0 and self.queue.empty():
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), max(timeout, 0)))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def infer_loop(self):
+        """批量推理并输出判定结果"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.next_batch()
+            self.queued.difference_update(batch)
+
+            # 取出各容器的模型输入:窗口模式下为当前窗口(刚开始采样的容器尚未填满窗口),全部容器
+            # 打包为一组;stateful 模式下为尚未输入模型的新间隔及其状态,按形状分组
+            groups = {}
+            for container_id in batch:
+                # 输出文件被删除后重新创建的容器在读到新间隔之前没有待推理的数据
+                if container_id not in self.buffers or container_id not in self.seen:
+                    continue
+                if self.stateful:
+                    pending = self.fresh.pop(container_id, None)
+                    if not pending:
+                        continue
+                    rows = np.concatenate(pending)
+                    state = self.states.get(container_id)
+                    key = (len(rows), state_length(state))
+                else:
+                    rows, state = self.buffers[container_id].window(), None
+                    key = None
+                groups.setdefault(key, []).append((container_id, rows, state, self.seen[container_id]))
+
+            for items in groups.values():
+                inputs = [rows for _, rows, _, _ in items]
+                if self.stateful:
+                    probs, states = await loop.run_in_executor(
+                        self.executor, self.predict_stateful, inputs, [state for _, _, state, _ in items])
+                    self.states.update((item[0], state) for item, state in zip(items, states)
+                                       if item[0] in self.buffers)
+                else:
+                    probs = await loop.run_in_executor(self.executor, self.predict, inputs)
+                now = time.perf_counter()
+                for (container_id, rows, _, seen), prob in zip(items, probs):
+                    if container_id not in self.latest:  # 推理期间输出文件已被删除
+                        continue
+                    interval_time, seen_at = self.latest[container_id]
+                    self.emit({
+                        "container": container_id,
+                        "time": interval_time,
+                        "intervals": seen if self.stateful else len(rows),
+                        "probability": round(float(prob), 6),
+                        "malicious": bool(prob > self.threshold),
+                        "latency_ms": round((now - seen_at) * 1000, 3),
+                    })
+
+    def emit(self, verdict):
+        """输出一条判定结果"""
+        self.output.write(json.dumps(verdict, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+    async def run(self, directories):
+        """运行服务,直到被取消
+
+        Args:
+            directories: 存放各容器 perf stat 输出文件的目录列表
+        """
+        self.queue = asyncio.Queue()
+        try:
+            await asyncio.gather(self.poll_loop(directories), self.infer_loop())
+        finally:
+            self.executor.shutdown(wait=False)
+            self.io_executor.shutdown(wait=False)
@@ -0,0 +1,1200 @@
+"""深度学习时序分类
+
+使用 LSTM、Bi-LSTM 和 Bi-LSTM + Attention 三种模型对间隔采样的 HPC 时序数据进行分类,
+并输出评估指标和预测结果,图表由 report 模块在训练之后绘制。
+"""
+# 导入必要的库
+import pandas as pd  # 用于数据处理和分析,提供DataFrame等数据结构
+import numpy as np  # 用于数值计算,提供多维数组支持
+import torch  # PyTorch深度学习框架,用于构建和训练神经网络
+import torch.nn as nn  # PyTorch神经网络模块,包含各类神经网络层
+import torch.optim as optim  # PyTorch优化器,用于模型参数优化
+from torch.utils.data import Sampler, TensorDataset  # 用于批次采样和保存数据集张量
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence  # 用于变长序列的打包计算
+from sklearn.model_selection import train_test_split  # 用于将数据集划分为训练集和测试集
+from sklearn.metrics import (  # 用于计算各种模型评估指标
+    accuracy_score,  # 准确率:正确预测的样本比例
+    precision_score,  # 精确率:正确预测为正例的比例
+    recall_score,  # 召回率:正确识别出的正例比例
+    f1_score,  # F1分数:精确率和召回率的调和平均
+    roc_auc_score  # ROC曲线下面积,用于评估分类器性能
+)
+import os  # 用于处理文件和目录路径
+import copy  # 用于复制待量化的模型
+import math  # 用于检查损失是否为有限值
+import itertools  # 用于把批次分组累加梯度
+import multiprocessing  # 用于创建 spawn 方式启动的工作进程
+from concurrent.futures import ProcessPoolExecutor  # 用于并行训练多个模型
+from functools import lru_cache  # 用于在工作进程中缓存已加载的数据集
+from .config import TSC_MODEL_NAMES  # 模型名称
+from .dataset import SequenceNormalizer, group_sequences, load_binary_dataset  # 时序数据分组、二进制数据集加载与归一化
+from .registry import save_model  # 模型注册表
+from .results import class_counts, save_manifest, save_predictions  # 结构化评估结果
+
+
+def load_sequences(file_path):
+    """加载 HPC 时序数据集,按样本ID排序组织为补0的序列张量(原始计数值)
+
+    存在同名的 .npy/.npz 二进制数据集时直接以内存映射方式加载,否则读取CSV文件并按样本ID分组。
+
+    Args:
+        file_path (str): 数据文件的完整路径,包含HPC特征数据的CSV文件
+
+    Returns:
+        sample_ids: 排序后的样本ID
+        sequences: (样本数, 时间点数, 特征数) 的 float32 特征张量
+        sequence_labels: 每个样本的 float32 标签
+        lengths: 每个样本的真实时间点数,没有数据的样本按一个全0时间点处理
+    """
+    binary = load_binary_dataset(file_path)
+    if binary is not None:
+        # 二进制数据集已是 (样本数, 时间点数, 特征数) 的张量,按样本ID排序以保持与CSV分组相同的样本顺序
+        values, labels, sample_ids, _, lengths = binary
+        order = np.argsort(sample_ids, kind='stable')
+        unique_ids = sample_ids[order]
+        sequences = values[order].astype(np.float32)  # 转换特征序列为float32类型
+        sequence_labels = labels[order].astype(np.float32)  # 转换标签为float32类型
+        # 旧版本预处理生成的文件没有长度信息,视为全部等长
+        lengths = np.full(len(order), values.shape[1]) if lengths is None else lengths[order]
+    else:
+        # 加载 CSV 文件数据
+        data = pd.read_csv(file_path)
+        
+        # 提取各个字段
+        sample_ids = data.iloc[:, 0].values  # 第1列:样本ID,用于区分不同的样本
+        time_intervals = data.iloc[:, 1].values  # 第2列:时间间隔编号,表示采样时间点
+        labels = data.iloc[:, 2].values  # 第3列:标签(0表示良性,1表示恶意)
+        features = data.iloc[:, 3:].values  # 第4列及之后:HPC特征,包含多个性能计数器的值
+        
+        # 按样本ID排序一次后整体重排为 (样本数, 时间点数, 特征数),并检查每个样本的时间点数
+        unique_ids, sequences, sequence_labels, lengths = group_sequences(sample_ids, time_intervals, labels, features)
+
+        # 转换为float32类型便于后续处理
+        sequences = sequences.astype(np.float32)  # 转换特征序列为float32类型
+        sequence_labels = sequence_labels.astype(np.float32)  # 转换标签为float32类型
+
+    lengths = np.maximum(lengths, 1)  # 没有数据的样本按一个全0时间点处理
+    return np.asarray(unique_ids).astype(str), sequences, sequence_labels, lengths
+
+
+def load_and_preprocess_data(file_path, normalize=True, batch_size=32):
+    """加载并预处理 HPC 时序数据
+    
+    该函数完成以下任务:
+    1. 用 load_sequences 加载按样本ID组织的时序数据(记录每个样本的真实时间点数)
+    2. 划分训练集(70%)、验证集(10%)和测试集(20%)
+    3. 在训练集上拟合逐事件的 log1p + 标准化(不含补0部分),并原地归一化三个数据集
+    4. 转换为PyTorch张量格式
+    5. 创建 TensorBatches 直接从整体张量中切分批次,训练集按序列长度分桶组成批次
+    
+    Args:
+        file_path (str): 数据文件的完整路径,包含HPC特征数据的CSV文件
+        normalize (bool): 是否归一化输入,False 时直接使用原始计数值
+        batch_size (int): 批次大小
+        
+    Returns:
+        train_loader: 训练数据的 TensorBatches,每轮打乱,每个批次为 (特征, 长度, 标签)
+        val_loader: 验证数据的 TensorBatches,不打乱顺序
+        test_loader: 测试数据的 TensorBatches,不打乱顺序,sample_ids 属性为测试集的样本ID
+        y_test: 测试集的标签数组
+        input_size: 输入特征的维度,即每个时间步的特征数量
+        normalizer: 在训练集上拟合的 SequenceNormalizer,推理时对输入做相同的归一化;
+            normalize 为 False 时为 None
+    """
+    sample_ids, sequences, sequence_labels, lengths = load_sequences(file_path)
+
+    # 划分数据集:训练集70%,验证集10%,测试集20%
+    # 第一次划分:分出训练集(70%)和临时集(30%)
+    X_train, X_temp, y_train, y_temp, len_train, len_temp, _, ids_temp = train_test_split(
+        sequences, 
+        sequence_labels, 
+        lengths,
+        sample_ids,  # 样本ID不影响划分结果,只用于记录测试集
+        test_size=0.3,  # 30%用于临时集
+        random_state=42  # 设置随机种子,确保结果可复现
+    )
+    # 第二次划分:将临时集划分为验证集(10%)和测试集(20%)
+    X_val, X_test, y_val, y_test, len_val, len_test, _, ids_test = train_test_split(
+        X_temp, 
+        y_temp, 
+        len_temp,
+        ids_temp,
+        test_size=0.6667,  # 临时集中的2/3作为测试集
+        random_state=42  # 保持相同的随机种子
+    )
+
+    # 逐事件 log1p + 标准化,只在训练集的真实长度内拟合,避免验证集和测试集的信息泄漏
+    normalizer = None
+    if normalize:
+        normalizer = SequenceNormalizer().fit(X_train, len_train)
+        for X, L in ((X_train, len_train), (X_val, len_val), (X_test, len_test)):
+            normalizer.transform_sequences(X, L, out=X)  # 补0部分保持为0
+
+    # 将NumPy数组转换为PyTorch张量
+    X_train = torch.tensor(X_train, dtype=torch.float32)  # 训练特征
+    y_train = torch.tensor(y_train, dtype=torch.float32)  # 训练标签
+    X_val = torch.tensor(X_val, dtype=torch.float32)  # 验证特征
+    y_val = torch.tensor(y_val, dtype=torch.float32)  # 验证标签
+    X_test = torch.tensor(X_test, dtype=torch.float32)  # 测试特征
+    y_test = torch.tensor(y_test, dtype=torch.float32)  # 测试标签
+
+    len_train, len_val, len_test = (torch.as_tensor(L, dtype=torch.int64) for L in (len_train, len_val, len_test))
+
+    # 创建批次迭代器,批次直接从整体张量中切分,不逐个样本拼接
+    train_loader = TensorBatches(
+        (X_train, len_train, y_train),  # 特征、真实长度和标签
+        batch_size,
+        sampler=LengthBucketSampler(len_train, batch_size)  # 每批为长度相近的样本,随机打乱
+    )
+    val_loader = TensorBatches((X_val, len_val, y_val), batch_size)  # 验证集不需要打乱
+    test_loader = TensorBatches((X_test, len_test, y_test), batch_size, sample_ids=ids_test)  # 测试集不需要打乱
+
+    # 获取输入特征维度
+    input_size = X_train.shape[2]  # shape[2]表示每个时间步的特征数量
+    return train_loader, val_loader, test_loader, y_test, input_size, normalizer
+
+
+def select_test_split(data, sample_ids):
+    """从 load_sequences 加载的数据中选出训练时记录的测试集样本(未归一化的原始计数值)
+
+    评估注册表中的模型时使用模型元数据中的 test_sample_ids,而不是在当前数据集上重新划分:
+    增量预处理加入新样本后重新划分的测试集会包含模型训练时见过的样本。输入应使用模型保存时的
+    归一化(registry.load_model 返回的 scaler),见 normalize_test_split。
+
+    Args:
+        data: load_sequences 的返回值
+        sample_ids: 训练时测试集的样本ID,按测试集顺序排列
+
+    Returns:
+        X_test: (样本数, 时间点数, 事件数) 的原始计数值张量
+        len_test: 各样本的真实时间点数
+        y_test: 测试集标签
+
+    Raises:
+        ValueError: 没有记录测试集样本ID(旧版本保存的模型),或其中有样本不在数据集中
+    """
+    if sample_ids is None:
+        raise ValueError("模型元数据中没有 test_sample_ids,请重新训练模型后再评估")
+    all_ids, sequences, labels, lengths = data
+    sample_ids = np.asarray(sample_ids, dtype=str)
+    index = np.searchsorted(all_ids, sample_ids)  # all_ids 已按样本ID排序
+    found = index < len(all_ids)
+    found[found] = all_ids[index[found]] == sample_ids[found]
+    missing = sample_ids[~found]
+    if len(missing):
+        raise ValueError(f"数据集中缺少 {len(missing)} 个训练时的测试集样本: {', '.join(missing[:5])}")
+    return (torch.from_numpy(sequences[index]),
+            torch.as_tensor(lengths[index], dtype=torch.int64),
+            torch.from_numpy(labels[index]))
+
+
+def normalize_test_split(X_test, len_test, normalizer):
+    """用模型保存时的归一化转换 select_test_split 的原始计数值,normalizer 为 None 时原样返回"""
+    if normalizer is None:
+        return X_test
+    return torch.from_numpy(normalizer.transform_sequences(X_test.numpy(), len_test.numpy()))
+
+
+class LengthBucketSampler(Sampler):
+    """按序列长度分桶的批采样器
+
+    每轮先随机打乱样本,再在每 bucket_batches 个批次大小的块内按长度排序后切分为批次,
+    最后打乱批次顺序。同一批次内的样本长度相近,打包计算时浪费在短序列上的步数更少,
+    同时保留了批次组成和顺序的随机性。
+
+    Args:
+        lengths: 每个样本的真实时间点数
+        batch_size (int): 批次大小
+        bucket_batches (int): 每个分桶包含的批次数
+    """
+    def __init__(self, lengths, batch_size, bucket_batches=50):
+        self.lengths = torch.as_tensor(lengths)
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_batches
+
+    def batches(self):
+        """本轮的全部批次,每个批次为样本下标张量"""
+        perm = torch.randperm(len(self.lengths))
+        batches = []
+        for start in range(0, len(perm), self.bucket_size):
+            bucket = perm[start:start + self.bucket_size]
+            bucket = bucket[torch.argsort(self.lengths[bucket], stable=True)]
+            batches.extend(bucket.split(self.batch_size))
+        return [batches[i] for i in torch.randperm(len(batches)).tolist()]
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield batch.tolist()
+
+    def __len__(self):
+        n = len(self.lengths)
+        full, rest = divmod(n, self.bucket_size)
+        return full * -(-self.bucket_size // self.batch_size) + -(-rest // self.batch_size)
+
+
+class TensorBatches:
+    """内存中张量数据集的批次迭代器,代替 DataLoader(TensorDataset(...))
+
+    DataLoader 每个批次要在 Python 中取出 batch_size 个样本再逐个拼接,对100个时间点的
+    序列,这部分开销在CPU上与 LSTM 本身的计算相当。这里每轮只按 sampler 给出的顺序把整个
+    数据集重排一次(写入预先分配的缓冲区),之后每个批次都是缓冲区上连续的切片,不再复制;
+    不打乱顺序时直接切分原张量。有 GPU 时张量放在锁页内存中,可以异步复制到显存。
+
+    Args:
+        tensors: 第一维为样本的张量元组,例如 (特征, 长度, 标签)
+        batch_size (int): 批次大小
+        sampler: 每轮给出批次划分的采样器(例如 LengthBucketSampler),None 表示按原顺序切分
+        sample_ids: 与张量第一维对应的样本ID,None 表示不记录
+    """
+    def __init__(self, tensors, batch_size, sampler=None, sample_ids=None):
+        pin_memory = torch.cuda.is_available()
+        self.dataset = TensorDataset(*(t.pin_memory() if pin_memory else t for t in tensors))
+        self.sample_ids = sample_ids
+        self.batch_size = batch_size
+        self.sampler = sampler
+        self.buffers = None  # 每轮重排后的张量,只在需要打乱时分配
+        if sampler is not None:
+            self.buffers = [torch.empty_like(t, pin_memory=pin_memory) for t in self.dataset.tensors]
+
+    def __iter__(self):
+        if self.sampler is None:
+            yield from zip(*(t.split(self.batch_size) for t in self.dataset.tensors))
+            return
+        batches = self.sampler.batches()
+        order = torch.cat(batches)
+        for tensor, buffer in zip(self.dataset.tensors, self.buffers):
+            torch.index_select(tensor, 0, order, out=buffer)
+        sizes = [len(batch) for batch in batches]
+        yield from zip(*(buffer.split(sizes) for buffer in self.buffers))
+
+    def __len__(self):
+        if self.sampler is None:
+            return -(-len(self.dataset) // self.batch_size)
+        return len(self.sampler)
+
+
+def pack(x, lengths):
+    """把补0的批次按真实长度打包,LSTM 只计算每个样本真实长度内的时间点;lengths 为 None 时原样返回"""
+    if lengths is None:
+        return x
+    return pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+
+
+def dataset_features(file_path):
+    """返回数据集的特征列名(事件名),顺序与模型输入的特征维一致"""
+    binary = load_binary_dataset(file_path)
+    if binary is not None:
+        return binary[3]
+    return pd.read_csv(file_path, nrows=0).columns[3:].tolist()  # 只读取表头
+
+
+class LSTMClassifier(nn.Module):
+    """单向LSTM分类器模型
+    
+    该模型包含:
+    1. LSTM层:处理时序特征,捕捉时间序列中的长期依赖关系
+    2. 全连接层:将LSTM输出映射到分类空间
+    3. Sigmoid激活:将输出压缩到0-1之间,表示二分类概率
+    
+    Args:
+        input_size (int): 输入特征的维度,即每个时间步的特征数量
+        hidden_size (int): LSTM隐藏层的维度,决定模型的容量
+        num_classes (int): 分类类别数(二分类为1)
+        
+    Returns:
+        模型输出的预测概率(0-1之间)
+    """
+    def __init__(self, input_size, hidden_size, num_classes):
+        super(LSTMClassifier, self).__init__()
+        # LSTM层配置
+        self.lstm = nn.LSTM(
+            input_size,  # 输入特征维度
+            hidden_size,  # 隐藏层维度
+            batch_first=True  # 批次维度在前,即(batch, seq_len, feature)
+        )
+        # 全连接层,将hidden_size维的特征映射到num_classes维
+        self.fc = nn.Linear(hidden_size, num_classes)
+        # Sigmoid激活函数,用于二分类
+        self.sigmoid = nn.Sigmoid()
+
+    def forward(self, x, lengths=None):
+        # 通过LSTM层,只使用最后一个时间步的隐藏状态;给出 lengths 时为各样本最后一个真实时间点
+        _, (hn, _) = self.lstm(pack(x, lengths))  # hn形状为(num_layers, batch, hidden_size)
+        out = self.fc(hn[-1])  # 取最后一层的隐藏状态通过全连接层
+        return self.sigmoid(out)  # 输出二分类概率
+
+    def forward_step(self, x, state=None):
+        """有状态的增量推理,在多次调用之间携带 LSTM 的 (h, c)
+
+        每次只输入新到达的采样间隔,每个新间隔的计算量为 O(1)。依次输入一条序列的各段
+        得到的结果与对已到达的整个前缀调用 forward 完全相同。
+
+        Args:
+            x: 形状为 (batch, 新间隔数, input_size) 的新输入
+            state: 上一次调用返回的状态,None 表示序列的开始
+
+        Returns:
+            probs: 形状为 (batch, num_classes) 的预测概率
+            state: 新的状态 (h, c),传给下一次调用
+        """
+        _, (hn, cn) = self.lstm(x, state)
+        return self.sigmoid(self.fc(hn[-1])), (hn, cn)
+
+
+def lstm_directions(lstm):
+    """返回与单层双向 nn.LSTM 共享参数的前向、反向两个单向 LSTM,用于分别计算两个方向
+
+    两个单向 LSTM 直接引用原模型的参数对象,原模型继续训练或移动设备后仍然保持一致。
+    """
+    directions = []
+    for suffix in ('', '_reverse'):
+        single = nn.LSTM(lstm.input_size, lstm.hidden_size, batch_first=True)
+        for name in ('weight_ih_l0', 'weight_hh_l0', 'bias_ih_l0', 'bias_hh_l0'):
+            setattr(single, name, getattr(lstm, name + suffix))
+        directions.append(single)
+    return tuple(directions)
+
+
+def bidirectional_step(model, x, state, window):
+    """双向 LSTM 的增量计算,供 Bi-LSTM 系列模型的 forward_step 使用
+
+    前向方向携带 (h, c),每个新间隔的计算量为 O(1),结果与完整前缀的前向计算完全相同。
+    反向方向需要未来的数据,无法增量计算,这里只在最近 window 个间隔上从后向前重新计算
+    (有界窗口近似):每次调用的计算量为 O(window),与流的总长度无关。已到达的前缀不超过
+    window 个间隔时结果与 forward 完全相同,更长时相当于反向方向只看到最近 window 个间隔。
+
+    Args:
+        model: BiLSTMClassifier 或 BiLSTMAttentionClassifier
+        x: 形状为 (batch, 新间隔数, input_size) 的新输入
+        state: 上一次调用返回的状态,None 表示序列的开始
+        window: 反向方向重新计算的间隔数
+
+    Returns:
+        forward_out: 最近 window 个间隔的前向输出,形状为 (batch, <=window, hidden_size)
+        backward_out: 最近 window 个间隔的反向输出,与 forward_out 形状相同
+        state: 新的状态 (h, c, 最近的输入, 最近的前向输出)
+    """
+    if '_directions' not in model.__dict__:  # 不注册为子模块,避免参数在 state_dict 中重复
+        model.__dict__['_directions'] = lstm_directions(model.lstm)
+    forward_lstm, backward_lstm = model.__dict__['_directions']
+
+    if state is None:
+        state = (None, None, x[:, :0], x.new_zeros(x.shape[0], 0, model.lstm.hidden_size))
+    h, c, recent_x, recent_out = state
+    out, (h, c) = forward_lstm(x, None if h is None else (h, c))
+    recent_x = torch.cat((recent_x, x), dim=1)[:, -window:]
+    recent_out = torch.cat((recent_out, out), dim=1)[:, -window:]
+
+    backward_out, _ = backward_lstm(recent_x.flip(1))
+    return recent_out, backward_out.flip(1), (h, c, recent_x, recent_out)
+
+
+class BiLSTMClassifier(nn.Module):
+    """双向LSTM分类器模型
+    
+    该模型包含:
+    1. 双向LSTM层:同时从前向后和从后向前处理序列,可以捕捉双向的时序依赖
+    2. 全连接层:将双向LSTM的输出映射到分类空间
+    3. Sigmoid激活:输出二分类概率
+    
+    Args:
+        input_size (int): 输入特征的维度,即每个时间步的特征数量
+        hidden_size (int): LSTM隐藏层的维度,决定模型的容量
+        num_classes (int): 分类类别数(二分类为1)
+        
+    Returns:
+        模型输出的预测概率(0-1之间)
+    """
+    def __init__(self, input_size, hidden_size, num_classes):
+        super(BiLSTMClassifier, self).__init__()
+        # 双向LSTM层配置
+        self.lstm = nn.LSTM(
+            input_size,  # 输入特征维度
+            hidden_size,  # 隐藏层维度
+            batch_first=True,  # 批次维度在前
+            bidirectional=True  # 设置为双向LSTM
+        )
+        # 全连接层,因为是双向所以输入维度是hidden_size*2
+        self.fc = nn.Linear(hidden_size * 2, num_classes)
+        # Sigmoid激活函数
+        self.sigmoid = nn.Sigmoid()
+
+    def forward(self, x, lengths=None):
+        # 通过双向LSTM层,给出 lengths 时两个方向都只处理真实长度内的时间点
+        _, (hn, _) = self.lstm(pack(x, lengths))
+        # 连接前向和后向的最后隐藏状态
+        # hn[-2]是前向LSTM的最后状态,hn[-1]是后向LSTM的最后状态
+        hn = torch.cat((hn[-2], hn[-1]), dim=1)
+        out = self.fc(hn)
+        return self.sigmoid(out)
+
+    def forward_step(self, x, state=None, window=100):
+        """有状态的增量推理,前向方向携带 (h, c),反向方向使用最近 window 个间隔近似
+
+        Args:
+            x: 形状为 (batch, 新间隔数, input_size) 的新输入
+            state: 上一次调用返回的状态,None 表示序列的开始
+            window: 反向方向重新计算的间隔数,见 bidirectional_step
+
+        Returns:
+            probs: 形状为 (batch, num_classes) 的预测概率
+            state: 新的状态,传给下一次调用
+        """
+        forward_out, backward_out, state = bidirectional_step(self, x, state, window)
+        # 前向方向取最新间隔的输出,反向方向取窗口内最早间隔的输出,与 forward 中的 hn[-2]、hn[-1] 对应
+        hn = torch.cat((forward_out[:, -1], backward_out[:, 0]), dim=1)
+        return self.sigmoid(self.fc(hn)), state
+
+
+class Attention(nn.Module):
+    """注意力机制模块
+    
+    实现了基于加法注意力的机制,用于对序列中不同时间步赋予不同的重要性权重。
+    通过学习权重来确定哪些时间步的信息更重要。
+    
+    Args:
+        hidden_size (int): 隐藏层的维度,因为是双向LSTM,所以实际使用的是hidden_size*2
+        
+    Returns:
+        context: 注意力加权后的上下文向量
+        attention_weights: 各时间步的注意力权重,用于可视化分析
+    """
+    def __init__(self, hidden_size):
+        super(Attention, self).__init__()
+        # 注意力层,将hidden_size*2维的输入映射到1维,用于计算权重
+        self.attention = nn.Linear(hidden_size * 2, 1)
+
+    def forward(self, lstm_output, mask=None):
+        # 计算注意力权重并通过softmax归一化
+        # lstm_output的形状为(batch, seq_len, hidden_size*2)
+        scores = self.attention(lstm_output)  # 计算每个时间步的权重分数
+        if mask is not None:
+            # mask 形状为 (batch, seq_len),补0的时间点权重为0
+            scores = scores.masked_fill(~mask.unsqueeze(-1), float('-inf'))
+        attention_weights = torch.softmax(
+            scores,
+            dim=1  # 在序列长度维度上进行softmax
+        )
+        
+        # 使用注意力权重对LSTM输出进行加权
+        weighted_output = lstm_output * attention_weights
+        # 在序列长度维度上求和,得到上下文向量
+        context = weighted_output.sum(dim=1)
+        return context, attention_weights
+
+
+class BiLSTMAttentionClassifier(nn.Module):
+    """带注意力机制的双向LSTM分类器模型
+    
+    该模型结合了双向LSTM和注意力机制的优点:
+    1. 双向LSTM捕获序列的双向依赖关系
+    2. 注意力机制关注重要的时间步
+    3. 全连接层进行最终分类
+    
+    Args:
+        input_size (int): 输入特征的维度,即每个时间步的特征数量
+        hidden_size (int): LSTM隐藏层的维度,决定模型的容量
+        num_classes (int): 分类类别数(二分类为1)
+        
+    Returns:
+        outputs: 模型的预测概率(0-1之间)
+        attention_weights: 注意力权重分布,用于分析模型关注点
+    """
+    def __init__(self, input_size, hidden_size, num_classes):
+        super(BiLSTMAttentionClassifier, self).__init__()
+        # 双向LSTM层
+        self.lstm = nn.LSTM(
+            input_size,
+            hidden_size,
+            batch_first=True,
+            bidirectional=True
+        )
+        # 注意力层
+        self.attention = Attention(hidden_size)
+        # 全连接层,输入维度为hidden_size*2(双向LSTM的输出)
+        self.fc = nn.Linear(hidden_size * 2, num_classes)
+        # Sigmoid激活函数
+        self.sigmoid = nn.Sigmoid()
+
+    def forward(self, x, lengths=None):
+        # 通过双向LSTM层得到所有时间步的输出
+        if lengths is None:
+            lstm_out, _ = self.lstm(x)
+            mask = None
+        else:
+            lstm_out, _ = self.lstm(pack(x, lengths))
+            lstm_out, _ = pad_packed_sequence(lstm_out, batch_first=True, total_length=x.shape[1])
+            mask = torch.arange(x.shape[1], device=x.device) < lengths.to(x.device).unsqueeze(1)
+        # 应用注意力机制,补0的时间点不参与
+        context, attention_weights = self.attention(lstm_out, mask)
+        # 通过全连接层进行分类
+        out = self.fc(context)
+        return self.sigmoid(out), attention_weights
+
+    def forward_step(self, x, state=None, window=100):
+        """有状态的增量推理,前向方向携带 (h, c),反向方向和注意力使用最近 window 个间隔近似
+
+        Args:
+            x: 形状为 (batch, 新间隔数, input_size) 的新输入
+            state: 上一次调用返回的状态,None 表示序列的开始
+            window: 反向方向和注意力计算的间隔数,见 bidirectional_step
+
+        Returns:
+            probs: 形状为 (batch, num_classes) 的预测概率
+            attention_weights: 最近 window 个间隔的注意力权重
+            state: 新的状态,传给下一次调用
+        """
+        forward_out, backward_out, state = bidirectional_step(self, x, state, window)
+        context, attention_weights = self.attention(torch.cat((forward_out, backward_out), dim=2))
+        return self.sigmoid(self.fc(context)), attention_weights, state
+
+
+def bf16_supported():
+    """当前CPU是否原生支持 bfloat16 计算(AVX512-BF16/AMX),不支持时 bfloat16 由软件模拟,通常更慢"""
+    is_supported = getattr(torch.ops.mkldnn, '_is_mkldnn_bf16_supported', None)
+    return bool(is_supported is not None and is_supported())
+
+
+def autocast_context(device, enabled):
+    """前向计算使用的自动混合精度上下文,CPU 上使用 bfloat16,enabled 为 False 时不生效
+
+    模型参数和优化器状态仍为 float32,只有矩阵乘法和 LSTM 等计算密集的算子以 bfloat16 执行。
+    """
+    return torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=enabled)
+
+
+def quantize_model(model):
+    """训练后动态量化:nn.LSTM 和 nn.Linear 的权重转换为 int8,激活在推理时逐批动态量化
+
+    不需要校准数据,返回量化后的副本,原模型保持不变。量化后的模型只能在CPU上推理,模型类型不变,
+    forward 和 forward_step 的用法与原模型相同。量化后的双向 LSTM 无法再拆分为两个方向,
+    因此先把 forward_step 使用的两个单向 LSTM 分别量化。
+
+    Args:
+        model: 已训练的 LSTM/BiLSTM/BiLSTM+Attention 模型
+
+    Returns:
+        量化后的模型(已处于评估模式)
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    if model.lstm.bidirectional:
+        directions = torch.quantization.quantize_dynamic(
+            nn.Sequential(*lstm_directions(model.lstm)), {nn.LSTM}, dtype=torch.qint8)
+        model.__dict__['_directions'] = tuple(directions)
+    return torch.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def validation_loss(model, val_loader, criterion, device, autocast=False):
+    """计算模型在验证集上的平均损失"""
+    model.eval()  # 设置为评估模式
+    val_loss = 0.0
+    with torch.no_grad(), autocast_context(device, autocast):  # 不计算梯度
+        for X_val, len_val, y_val in val_loader:
+            X_val, y_val = X_val.to(device), y_val.to(device)
+            outputs = model(X_val, len_val)
+            outputs = outputs[0] if isinstance(model, BiLSTMAttentionClassifier) else outputs
+            val_loss += criterion(outputs.float().squeeze(), y_val).item()
+    return val_loss / len(val_loader)
+
+
+def train_model(model, train_loader, val_loader, num_epochs=30, learning_rate=0.001,
+                patience=5, min_delta=0.0, lr_patience=None, lr_factor=0.5,
+                autocast=False, autocast_tolerance=0.05, accumulation_steps=1):
+    """训练深度学习模型的函数
+    
+    完整的模型训练流程:
+    1. 配置训练设备(GPU/CPU)
+    2. 设定损失函数和优化器
+    3. 训练循环:
+       - 前向传播计算预测值
+       - 计算损失
+       - 反向传播计算梯度
+       - 更新模型参数
+    4. 验证评估当前模型性能,记录验证损失最低的模型参数
+    5. 验证损失连续 patience 轮没有降低时提前停止训练
+    6. 恢复验证损失最低那一轮的模型参数
+    
+    autocast 为 True 时前向计算使用 bfloat16 自动混合精度,损失仍以 float32 计算。bfloat16 的
+    指数范围与 float32 相同,不需要损失缩放,但有两道保护:训练损失出现 NaN/Inf 时恢复最佳参数,
+    用 float32 重新计算其验证损失,提前停止和学习率调整重新计数,之后改用 float32 继续训练;
+    训练结束后用 float32 重新计算最佳参数的验证损失,与 bfloat16 下的差距超过 autocast_tolerance
+    时给出警告,报告中记录的验证损失以 float32 的结果为准。
+
+    accumulation_steps 大于1时每 accumulation_steps 个批次才更新一次参数,各批次的损失按样本数
+    加权累加梯度,与批次大小为 batch_size * accumulation_steps 的一次更新等价。
+    
+    Args:
+        model: 待训练的模型(LSTM/BiLSTM/BiLSTM+Attention)
+        train_loader: 训练数据的 TensorBatches
+        val_loader: 验证数据的 TensorBatches
+        num_epochs: 最多训练的轮数,默认30轮
+        learning_rate: 学习率,默认0.001,控制参数更新步长
+        patience: 验证损失连续多少轮没有降低时提前停止,None 或 0 表示训练满 num_epochs 轮
+        min_delta: 验证损失至少降低多少才算有改善
+        lr_patience: 验证损失连续多少轮没有降低时把学习率乘以 lr_factor(ReduceLROnPlateau),
+            None 表示不调整学习率
+        lr_factor: 每次降低学习率的倍数
+        autocast: 是否使用 bfloat16 自动混合精度训练
+        autocast_tolerance: bfloat16 与 float32 验证损失的最大允许差距
+        accumulation_steps: 每次参数更新累加梯度的批次数
+        
+    Returns:
+        dict: 训练情况,包括最佳轮次 best_epoch、最低验证损失 best_val_loss、
+            实际训练轮数 epochs、是否提前停止 stopped_early、最终学习率 final_lr、
+            实际使用的精度 dtype(中途改用 float32 时为 'bfloat16->float32'),使用 bfloat16 时还包括
+            bfloat16 下最佳参数的验证损失 bf16_val_loss(中途改用 float32 时为改用之前的最低验证损失)
+    """
+    # 设置计算设备,优先使用GPU
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = model.to(device)  # 将模型移到指定设备
+    print(f"使用设备: {device}")
+    if autocast and device.type == 'cpu' and not bf16_supported():
+        print("警告: 当前CPU不支持原生 bfloat16 计算,混合精度训练可能比 float32 更慢")
+
+    # 定义损失函数和优化器
+    criterion = nn.BCELoss()  # 二分类交叉熵损失
+    optimizer = optim.Adam(
+        model.parameters(),  # 优化模型所有参数
+        lr=learning_rate  # 设置学习率
+    )
+    # 验证损失停滞时降低学习率
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(
+        optimizer, mode='min', factor=lr_factor, patience=lr_patience
+    ) if lr_patience else None
+
+    best_val_loss = float('inf')
+    # 验证损失最低时的模型参数副本,混合精度训练时先保存初始参数,以便出现 NaN 时恢复
+    best_state = {key: value.detach().clone() for key, value in model.state_dict().items()} if autocast else None
+    best_epoch = 0
+    bad_epochs = 0  # 验证损失连续没有改善的轮数
+    bf16_val_loss = None  # 改用 float32 之前 bfloat16 下的最低验证损失
+    fallback = False  # 是否因 NaN/Inf 从 bfloat16 改用 float32
+    epoch = -1  # num_epochs 为0时不进入训练循环
+
+    # 训练循环
+    for epoch in range(num_epochs):
+        # 训练阶段
+        model.train()  # 设置为训练模式
+        train_loss = 0.0
+        batches = iter(train_loader)
+        # 每次参数更新使用 accumulation_steps 个批次(每轮最后一组可能不足)
+        while group := list(itertools.islice(batches, accumulation_steps)):
+            # 清零梯度
+            optimizer.zero_grad()
+            group_size = sum(len(y_batch) for _, _, y_batch in group)
+
+            for X_batch, len_batch, y_batch in group:
+                # 将数据移到指定设备
+                X_batch = X_batch.to(device, non_blocking=True)
+                y_batch = y_batch.to(device, non_blocking=True)
+
+                # 前向传播,处理带注意力和不带注意力的模型
+                with autocast_context(device, autocast):
+                    outputs = model(X_batch, len_batch)
+                    outputs = outputs[0] if isinstance(model, BiLSTMAttentionClassifier) else outputs
+
+                # 输出不是有限值时 BCELoss 会直接报错,按训练损失不是有限值处理,本组不更新参数
+                if autocast and not torch.isfinite(outputs).all():
+                    train_loss = math.nan
+                    break
+
+                # 以 float32 计算损失
+                loss = criterion(outputs.float().squeeze(), y_batch)
+
+                # 按样本数加权后反向传播,梯度累加为整组样本的平均损失的梯度
+                (loss * (len(y_batch) / group_size)).backward()
+                train_loss += loss.item()
+
+            if not math.isfinite(train_loss):
+                break
+            optimizer.step()  # 更新参数
+
+        # 混合精度训练出现 NaN/Inf 时,恢复最佳参数并改用 float32 继续训练
+        if autocast and not math.isfinite(train_loss):
+            print(f"警告: 第 {epoch+1} 轮 bfloat16 训练损失不是有限值,恢复最佳参数并改用 float32 继续训练")
+            model.load_state_dict(best_state)
+            optimizer.state.clear()
+            autocast, fallback = False, True
+            if best_epoch:  # 之后的 float32 验证损失与 float32 下重新计算的最佳参数的验证损失比较
+                bf16_val_loss = best_val_loss
+                best_val_loss = validation_loss(model, val_loader, criterion, device)
+            # 提前停止和学习率调整的计数从 float32 重新开始
+            bad_epochs = 0
+            if scheduler is not None:
+                scheduler.best, scheduler.num_bad_epochs = best_val_loss, 0
+            continue
+
+        # 验证阶段
+        val_loss = validation_loss(model, val_loader, criterion, device, autocast)
+
+        # 打印训练进度
+        print(
+            f"Epoch [{epoch+1}/{num_epochs}], "  # 当前轮数/总轮数
+            f"Train Loss: {train_loss/len(train_loader):.4f}, "  # 平均训练损失
+            f"Val Loss: {val_loss:.4f}"  # 平均验证损失
+        )
+
+        if scheduler is not None:
+            scheduler.step(val_loss)
+
+        # 记录验证损失最低的模型参数,连续 patience 轮没有改善时停止训练
+        if val_loss < best_val_loss - min_delta:
+            best_val_loss = val_loss
+            best_epoch = epoch + 1
+            best_state = {key: value.detach().clone() for key, value in model.state_dict().items()}
+            bad_epochs = 0
+        else:
+            bad_epochs += 1
+            if patience and bad_epochs >= patience:
+                print(f"验证损失连续 {patience} 轮没有降低,在第 {epoch+1} 轮提前停止训练")
+                break
+
+    # 恢复验证损失最低那一轮的模型参数
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    report = {
+        'best_epoch': best_epoch,
+        'best_val_loss': best_val_loss,
+        'epochs': epoch + 1,
+        'stopped_early': epoch + 1 < num_epochs,
+        'final_lr': optimizer.param_groups[0]['lr'],
+        'dtype': 'bfloat16->float32' if fallback else 'bfloat16' if autocast else 'float32',
+    }
+    if bf16_val_loss is not None:
+        report['bf16_val_loss'] = bf16_val_loss
+
+    # 精度保护:用 float32 重新计算最佳参数的验证损失
+    if autocast and best_epoch:
+        report['bf16_val_loss'] = best_val_loss
+        report['best_val_loss'] = best_val_loss = validation_loss(model, val_loader, criterion, device)
+        if abs(report['bf16_val_loss'] - best_val_loss) > autocast_tolerance:
+            print(f"警告: bfloat16 验证损失 {report['bf16_val_loss']:.4f} 与 float32 验证损失 "
+                  f"{best_val_loss:.4f} 相差超过 {autocast_tolerance},建议使用 float32 训练")
+    print(f"最佳轮次: {best_epoch}, 最低验证损失: {best_val_loss:.4f}, 实际训练轮数: {epoch+1}")
+    return report
+
+
+def save_training_summary(reports, result_dir):
+    """把各模型的训练情况(最佳轮次、实际训练轮数等)保存为 training_summary.csv
+
+    Args:
+        reports: 模型名称 -> train_model 返回的训练情况
+        result_dir: 结果保存的目录路径
+    """
+    df = pd.DataFrame([{'Model': name, **report} for name, report in reports.items()])
+    print("\nTraining Summary:")
+    print(df)
+    df.to_csv(os.path.join(result_dir, "training_summary.csv"), index=False)
+
+
+def evaluate_predictions(predictions, model_name, result_dir):
+    """计算模型在测试集上的评估指标,并写入 model_results.txt 和 model_evaluation_results.csv
+
+    Args:
+        predictions: predict 返回的预测结果,包括真实标签、预测标签和预测概率
+        model_name: 模型名称,用于结果标识
+        result_dir: 结果保存的目录路径
+
+    Returns:
+        accuracy: 准确率,正确预测的比例
+        precision: 精确率,正确预测为正例的比例
+        recall: 召回率,正确识别出的正例比例
+        f1: F1分数,精确率和召回率的调和平均
+        auc: ROC曲线下面积,分类器的综合性能指标
+    """
+    y_true = predictions['y_true']  # 真实标签
+    y_pred = predictions['y_pred']  # 预测标签
+    y_prob = predictions['y_prob']  # 预测概率
+
+    # 计算性能指标
+    accuracy = accuracy_score(y_true, y_pred)  # 准确率
+    precision = precision_score(y_true, y_pred)  # 精确率
+    recall = recall_score(y_true, y_pred)  # 召回率
+    f1 = f1_score(y_true, y_pred)  # F1分数
+    auc = roc_auc_score(y_true, y_prob)  # AUC值
+
+    # 打印性能指标
+    print(
+        f"{model_name} - "
+        f"Accuracy: {accuracy:.4f}, "
+        f"Precision: {precision:.4f}, "
+        f"Recall: {recall:.4f}, "
+        f"F1-Score: {f1:.4f}, "
+        f"AUC: {auc:.4f}"
+    )
+
+    # 将结果写入文本文件
+    results_file = os.path.join(result_dir, "model_results.txt")
+    with open(results_file, 'a') as f:
+        f.write(
+            f"{model_name} - "
+            f"Accuracy: {accuracy:.4f}, "
+            f"Precision: {precision:.4f}, "
+            f"Recall: {recall:.4f}, "
+            f"F1-Score: {f1:.4f}, "
+            f"AUC: {auc:.4f}\n"
+        )
+
+    # 将结果保存到CSV文件
+    results_df = pd.DataFrame({
+        "Model": [model_name],
+        "Accuracy": [accuracy],
+        "Precision": [precision],
+        "Recall": [recall],
+        "F1-Score": [f1],
+        "AUC": [auc]
+    })
+
+    # 追加到CSV文件
+    csv_file = os.path.join(result_dir, "model_evaluation_results.csv")
+    results_df.to_csv(
+        csv_file,
+        mode='a',  # 追加模式
+        header=not os.path.exists(csv_file),  # 如果文件不存在则写入表头
+        index=False  # 不保存索引
+    )
+
+    return accuracy, precision, recall, f1, auc
+
+
+# 可训练的模型名称
+MODEL_NAMES = TSC_MODEL_NAMES
+
+
+def build_models(input_size, hidden_size=64, model_names=None):
+    """按名称创建待训练的模型
+
+    Args:
+        input_size: 输入特征的维度
+        hidden_size: LSTM隐藏层的大小
+        model_names: 要创建的模型名称,None 表示 MODEL_NAMES 中的全部模型
+
+    Returns:
+        list: (model, model_name) 元组列表,顺序与 MODEL_NAMES 一致
+    """
+    classes = {
+        "LSTM": LSTMClassifier,
+        "Bi-LSTM": BiLSTMClassifier,
+        "Bi-LSTM + Attention": BiLSTMAttentionClassifier,
+    }
+    return [
+        (classes[name](input_size=input_size, hidden_size=hidden_size, num_classes=1), name)
+        for name in MODEL_NAMES if model_names is None or name in model_names
+    ]
+
+
+def prepare_dataset(file_path, result_dir, batch_size=32):
+    """加载数据集并初始化结果目录
+
+    Args:
+        file_path: 数据集文件的路径
+        result_dir: 结果保存的目录路径
+        batch_size: 批次大小
+
+    Returns:
+        与 load_and_preprocess_data 相同
+    """
+    # 加载和预处理数据
+    train_loader, val_loader, test_loader, y_test, input_size, normalizer = load_and_preprocess_data(
+        file_path, batch_size=batch_size)
+
+    # 创建结果目录
+    os.makedirs(result_dir, exist_ok=True)
+
+    # 创建评估结果CSV文件
+    with open(os.path.join(result_dir, "model_evaluation_results.csv"), 'w') as f:
+        f.write("Model,Accuracy,Precision,Recall,F1-Score,AUC\n")
+
+    return train_loader, val_loader, test_loader, y_test, input_size, normalizer
+
+
+def evaluate_models(models, test_loader, y_test, result_dir, autocast=False):
+    """评估全部已训练的模型
+
+    每个模型只在测试集上推理一次,预测结果保存到结果目录(predictions_test_<模型名称>.npz),
+    之后 report 模块使用这份结果绘制混淆矩阵、注意力权重图和ROC曲线。
+
+    Args:
+        models: (model, model_name) 元组列表
+        test_loader: 测试数据的 TensorBatches
+        y_test: 测试集的真实标签
+        result_dir: 结果保存的目录路径
+        autocast: 是否以 bfloat16 自动混合精度推理
+
+    Returns:
+        metrics: 与 models 一一对应的评估指标字典列表
+    """
+    metrics = []
+    for model, model_name in models:
+        predictions = predict(model, test_loader, autocast)
+        save_predictions(result_dir, model_name, predictions)
+        acc, prec, rec, f1, auc = evaluate_predictions(predictions, model_name, result_dir)
+        metrics.append({
+            "Model": model_name,
+            "Accuracy": acc,
+            "Precision": prec,
+            "Recall": rec,
+            "F1-Score": f1,
+            "AUC": auc
+        })
+
+    # 打印模型性能比较
+    print("\nModel Performance Comparison:")
+    print(pd.DataFrame(metrics))
+    return metrics
+
+
+def predict(model, data_loader, autocast=False, device=None):
+    """对 data_loader 中的全部样本做一次推理,返回供指标计算和各类图表共用的预测结果
+
+    Args:
+        model: 已训练的模型
+        data_loader: 不打乱顺序的 TensorBatches,每个批次为 (特征, 长度, 标签)
+        autocast: 是否以 bfloat16 自动混合精度推理
+        device: 推理设备,None 表示优先使用GPU;量化后的模型只能使用CPU
+
+    Returns:
+        dict: 与样本顺序一致的
+            y_true: 真实标签 (int)
+            y_pred: 预测标签 (int),概率大于0.5时为1
+            y_prob: 预测为恶意的概率
+            lengths: 各样本的真实时间点数
+            attention: 注意力权重,形状为 (样本数, 时间点数),不带注意力的模型为 None
+    """
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = model.to(device)
+    model.eval()
+    y_true, y_prob, lengths, attention = [], [], [], []
+    with torch.no_grad(), autocast_context(device, autocast):
+        for X_batch, len_batch, y_batch in data_loader:
+            outputs = model(X_batch.to(device), len_batch)
+            if isinstance(model, BiLSTMAttentionClassifier):
+                outputs, attention_weights = outputs
+                attention.append(attention_weights.float().reshape(len(X_batch), -1).cpu().numpy())
+            y_prob.append(outputs.float().reshape(-1).cpu().numpy())
+            y_true.append(y_batch.numpy())
+            lengths.append(len_batch.numpy())
+    y_prob = np.concatenate(y_prob)
+    return {
+        'y_true': np.concatenate(y_true).astype(int),
+        'y_pred': (y_prob > 0.5).astype(int),  # 二分类阈值0.5
+        'y_prob': y_prob,
+        'lengths': np.concatenate(lengths),
+        'attention': np.concatenate(attention) if attention else None,
+    }
+
+
+def score_batch(model, sequences, lengths=None, container_ids=None, normalizer=None, max_batch=None):
+    """对多个容器的当前窗口做批量前向计算,返回各容器的恶意概率和注意力权重
+
+    各窗口补0到最长窗口的长度后按真实长度打包,长度不同的窗口也在同一次前向计算中完成,
+    前向计算的固定开销由全部容器分摊。结果与逐个窗口单独计算相同。
+
+    Args:
+        model: 处于评估模式的时序分类模型(在CPU上),可以是 quantize_model 量化后的模型
+        sequences: 各容器的窗口,每个为 (时间点数, 事件数) 的数组,长度可以不同;
+            也可以是已补0的 (容器数, 时间点数, 事件数) 数组
+        lengths: 各窗口的真实时间点数,None 表示各窗口的全部行
+        container_ids: 与 sequences 一一对应的容器ID,None 表示使用下标 0..n-1
+        normalizer: 对原始计数值做的输入归一化(SequenceNormalizer),None 表示输入已经归一化
+        max_batch: 一次前向计算最多包含的容器数,None 表示全部容器一次计算
+
+    Returns:
+        dict: 按输入顺序排列的 容器ID -> {'probability': 恶意概率,
+            'attention': 真实长度内的注意力权重数组,不带注意力的模型为 None}
+    """
+    if lengths is None:
+        lengths = [len(sequence) for sequence in sequences]
+    lengths = np.maximum(np.asarray(lengths, dtype=np.int64), 1)  # 没有数据的窗口按一个全0时间点处理
+    if container_ids is None:
+        container_ids = range(len(lengths))
+    x = np.zeros((len(lengths), int(lengths.max(initial=1)), model.lstm.input_size), dtype=np.float32)
+    for i, (sequence, length) in enumerate(zip(sequences, lengths)):
+        rows = min(len(sequence), length)  # 没有数据的窗口只有补0的时间点
+        x[i, :rows] = sequence[:rows]
+    if normalizer is not None:
+        normalizer.transform(x, out=x)
+        x[np.arange(x.shape[1]) >= lengths[:, None]] = 0  # 补0部分保持为0,与训练时相同
+
+    probs, attention = [], []
+    step = max_batch or max(len(x), 1)
+    with torch.no_grad():
+        for start in range(0, len(x), step):
+            batch_lengths = lengths[start:start + step]
+            batch = torch.from_numpy(x[start:start + step, :batch_lengths.max()])
+            packed = not (batch_lengths == batch.shape[1]).all()  # 窗口等长时不需要打包
+            outputs = model(batch, torch.from_numpy(batch_lengths) if packed else None)
+            if isinstance(model, BiLSTMAttentionClassifier):
+                outputs, attention_weights = outputs
+                attention.extend(attention_weights.reshape(len(batch), -1).numpy())
+            probs.extend(outputs.reshape(-1).numpy())
+
+    return {
+        container_id: {
+            'probability': float(prob),
+            'attention': attention[i][:lengths[i]] if attention else None,
+        }
+        for i, (container_id, prob) in enumerate(zip(container_ids, probs))
+    }
+
+
+def init_worker_threads(num_threads):
+    """训练进程池中工作进程的初始化函数,限制每个进程使用的 torch 线程数"""
+    torch.set_num_threads(num_threads)
+
+
+@lru_cache(maxsize=2)
+def load_dataset_cached(file_path, batch_size=32):
+    """在工作进程中缓存已加载的数据集,同一数据集的多个模型作业只加载一次
+
+    数据集划分使用固定的随机种子,因此工作进程与主进程得到相同的训练、验证和测试集。
+    """
+    return load_and_preprocess_data(file_path, batch_size=batch_size)
+
+
+def train_job(file_path, model_name, hidden_size=64, train_options=None, batch_size=32):
+    """训练单个 (数据集, 模型) 作业,在工作进程中执行
+
+    Args:
+        file_path: 数据集文件的路径
+        model_name: 模型名称
+        hidden_size: LSTM隐藏层的大小
+        train_options: 传给 train_model 的训练参数,例如 patience、lr_patience
+        batch_size: 批次大小
+
+    Returns:
+        state_dict: 训练后的模型参数(CPU张量),由主进程加载后评估
+        report: train_model 返回的训练情况
+    """
+    train_loader, val_loader, _, _, input_size, _ = load_dataset_cached(file_path, batch_size)
+    (model, _), = build_models(input_size, hidden_size, [model_name])
+    print(f"Training {model_name} ({os.path.basename(file_path)})...")
+    report = train_model(model, train_loader, val_loader, **(train_options or {}))
+    return {key: value.cpu() for key, value in model.state_dict().items()}, report
+
+
+class TrainingPool:
+    """在进程池中并行训练 (数据集, 模型) 作业
+
+    LSTM 的小批量训练无法用满全部CPU核心,因此把各数据集的各个模型作为独立作业分配给
+    workers 个工作进程。每个工作进程(以及负责评估和绘图的主进程)使用
+    CPU核心数 // workers 个 torch 线程,避免线程数超过核心数。
+
+    作业可以提前提交,主进程在评估前一个数据集时,其余作业继续在进程池中训练:
+
+        with TrainingPool(4) as pool:
+            for file_path, result_dir in datasets:
+                pool.submit(file_path)
+            for file_path, result_dir in datasets:
+                process_dataset(file_path, result_dir, pool=pool)
+
+    Args:
+        workers (int): 工作进程数
+        train_options (dict): 传给 train_model 的训练参数,所有作业相同
+        batch_size (int): 批次大小,所有作业相同
+    """
+    def __init__(self, workers, train_options=None, batch_size=32):
+        self.workers = workers
+        self.train_options = train_options
+        self.batch_size = batch_size
+        self.num_threads = max(1, (os.cpu_count() or 1) // workers)
+        torch.set_num_threads(self.num_threads)
+        # 使用 spawn 方式启动工作进程,避免 fork 继承主进程中已初始化的线程池
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker_threads,
+            initargs=(self.num_threads,)
+        )
+        self.futures = {}  # (file_path, model_name, hidden_size) -> Future
+
+    def submit(self, file_path, model_names=None, hidden_size=64):
+        """提交一个数据集的模型训练作业,已提交的作业不会重复提交"""
+        for model_name in MODEL_NAMES:
+            key = (file_path, model_name, hidden_size)
+            if (model_names is None or model_name in model_names) and key not in self.futures:
+                self.futures[key] = self.executor.submit(train_job, file_path, model_name, hidden_size,
+                                                         self.train_options, self.batch_size)
+
+    def result(self, file_path, model_name, hidden_size=64):
+        """等待并返回一个作业训练后的模型参数和训练情况,作业尚未提交时先提交"""
+        self.submit(file_path, [model_name], hidden_size)
+        return self.futures.pop((file_path, model_name, hidden_size)).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 出错时取消尚未开始的作业
+        self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+
+def process_dataset(file_path, result_dir, hidden_size=64, model_names=None, pool=None, model_dir=None,
+                    train_options=None, batch_size=32):
+    """处理单个数据集的完整流程
+    
+    执行完整的数据处理、模型训练和评估流程:
+    1. 加载和预处理数据
+    2. 创建结果目录
+    3. 训练多个模型(指定 pool 时在进程池中并行训练),验证损失停止降低时提前停止
+    4. 评估模型性能,保存预测结果和结果清单(图表由 report 模块绘制)
+    5. 把模型连同特征顺序、序列长度、评估指标和输入归一化保存到模型注册表
+    
+    Args:
+        file_path: 数据集文件的路径
+        result_dir: 结果保存的目录路径
+        hidden_size: LSTM隐藏层的大小,默认64
+        model_names: 要训练的模型名称,None 表示全部模型
+        pool: TrainingPool 实例,None 表示在当前进程中依次训练
+        model_dir: 数据集的模型注册表目录,None 表示不保存模型
+        train_options: 传给 train_model 的训练参数,例如 patience、lr_patience;
+            使用 pool 时由 TrainingPool 的 train_options 决定
+        batch_size: 批次大小,使用 pool 时应与 TrainingPool 的 batch_size 相同
+        
+    Returns:
+        无返回值,但会生成多个结果文件
+    """
+    if pool is not None:
+        pool.submit(file_path, model_names, hidden_size)  # 先提交全部模型,使其并行训练
+
+    train_loader, val_loader, test_loader, y_test, input_size, normalizer = prepare_dataset(
+        file_path, result_dir, batch_size)
+
+    # 定义要训练的模型列表
+    models = build_models(input_size, hidden_size, model_names)
+
+    # 训练每个模型
+    reports = {}  # 模型名称 -> 训练情况
+    for model, model_name in models:
+        if pool is not None:
+            state_dict, reports[model_name] = pool.result(file_path, model_name, hidden_size)
+            model.load_state_dict(state_dict)
+        else:
+            print(f"Training {model_name}...")
+            reports[model_name] = train_model(model, train_loader, val_loader, **(train_options or {}))
+    save_training_summary(reports, result_dir)
+
+    # 评估模型并生成比较结果
+    metrics = evaluate_models(models, test_loader, y_test, result_dir,
+                              autocast=(train_options or {}).get('autocast', False))
+    save_manifest(result_dir, 'tsc', {
+        name: class_counts(loader.dataset.tensors[-1])
+        for name, loader in (('train', train_loader), ('val', val_loader), ('test', test_loader))
+    }, metrics)
+
+    # 保存到模型注册表,推理时按相同的特征顺序和序列长度组织输入
+    if model_dir is not None:
+        features = dataset_features(file_path)
+        seq_len = test_loader.dataset.tensors[0].shape[1]
+        for (model, model_name), model_metrics in zip(models, metrics):
+            save_model(model_dir, model_name, model, {
+                'dataset': file_path,
+                'features': features,
+                'seq_len': seq_len,
+                'input_size': input_size,
+                'hidden_size': hidden_size,
+                'metrics': {key: float(value) for key, value in model_metrics.items() if key != 'Model'},
+                'training': reports[model_name],
+                'normalization': 'log1p+standard',
+                'test_sample_ids': test_loader.sample_ids.tolist(),  # 评估时使用与训练时完全相同的测试集
+            }, scaler=normalizer)
@@ -10,7 +10,7 @@ NC='\033[0m' # No Color
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 
 # 检查是否在正确的目录下运行脚本
-if [ ! -f "${SCRIPT_DIR}/Non_TSC_20s.py" ] || [ ! -f "${SCRIPT_DIR}/TSC_20s.py" ]; then
+if [ ! -f "${SCRIPT_DIR}/hpc_classification/cli.py" ]; then
     echo -e "${RED}错误: 请在项目根目录下运行此脚本${NC}"
     exit 1
 fi
@@ -30,39 +30,14 @@ if [ ! -d "${SCRIPT_DIR}/Datasets/Original/20s" ]; then
     exit 1
 fi
 
-# 1. 执行数据预处理 - 时分复用采样
-echo -e "${YELLOW}开始处理时分复用采样数据...${NC}"
-cd "${SCRIPT_DIR}/Preprocess/20s/Time-division Multiplexing" || exit 1
-for script in 4s.py 20s.py 20s_200ms.py 20s_20ms.py; do
-    if [ ! -f "$script" ]; then
-        echo -e "${RED}错误: 预处理脚本不存在: $script${NC}"
-        exit 1
-    fi
-    echo -e "${GREEN}执行 $script${NC}"
-    python "$script"
-    if [ $? -ne 0 ]; then
-        echo -e "${RED}错误: $script 执行失败${NC}"
-        exit 1
-    fi
-done
-cd "${SCRIPT_DIR}" || exit 1
-
-# 2. 执行数据预处理 - 非时分复用采样
-echo -e "${YELLOW}开始处理非时分复用采样数据...${NC}"
-cd "${SCRIPT_DIR}/Preprocess/20s/Non Time-division Multiplexing" || exit 1
-for script in 4s.py 20s.py 20s_200ms.py 20s_20ms.py; do
-    if [ ! -f "$script" ]; then
-        echo -e "${RED}错误: 预处理脚本不存在: $script${NC}"
-        exit 1
-    fi
-    echo -e "${GREEN}执行 $script${NC}"
-    python "$script"
-    if [ $? -ne 0 ]; then
-        echo -e "${RED}错误: $script 执行失败${NC}"
-        exit 1
-    fi
-done
+# 1. 执行数据预处理 - 时分复用和非时分复用采样的全部粒度
+echo -e "${YELLOW}开始处理时分复用和非时分复用采样数据...${NC}"
 cd "${SCRIPT_DIR}" || exit 1
+python -m hpc_classification preprocess --duration 20s --binary
+if [ $? -ne 0 ]; then
+    echo -e "${RED}错误: 数据预处理执行失败${NC}"
+    exit 1
+fi
 
 # 检查预处理结果
 echo -e "${YELLOW}检查预处理结果...${NC}"
@@ -84,24 +59,16 @@ for file in "${required_files[@]}"; do
     fi
 done
 
-# 3. 执行传统机器学习分类
-echo -e "${YELLOW}开始执行传统机器学习分类...${NC}"
+# 2. 执行传统机器学习分类和深度学习时序分类
+# 在同一个进程中依次处理汇总计数数据集和时序数据集,分类模块只加载一次
+echo -e "${YELLOW}开始执行传统机器学习分类和深度学习时序分类...${NC}"
 cd "${SCRIPT_DIR}" || exit 1
-python Non_TSC_20s.py
-if [ $? -ne 0 ]; then
-    echo -e "${RED}错误: Non_TSC_20s.py 执行失败${NC}"
-    exit 1
-fi
-echo -e "${GREEN}传统机器学习分类完成${NC}"
-
-# 4. 执行深度学习时序分类
-echo -e "${YELLOW}开始执行深度学习时序分类...${NC}"
-python TSC_20s.py
+python -m hpc_classification run --duration 20s
 if [ $? -ne 0 ]; then
-    echo -e "${RED}错误: TSC_20s.py 执行失败${NC}"
+    echo -e "${RED}错误: 模型分类执行失败${NC}"
     exit 1
 fi
-echo -e "${GREEN}深度学习时序分类完成${NC}"
+echo -e "${GREEN}传统机器学习分类和深度学习时序分类完成${NC}"
 
 echo -e "${GREEN}========================================${NC}"
 echo -e "${GREEN}所有任务执行完成！${NC}"
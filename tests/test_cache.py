@@ -0,0 +1,86 @@
+"""增量预处理缓存的行为测试"""
+import os
+
+from hpc_classification.preprocess.cache import cache_path, cached_imap
+
+CALLS = []  # 实际解析过的工作单元
+
+
+def parse_unit(paths):
+    """测试用的工作单元处理函数:读入全部文件的内容"""
+    CALLS.append(tuple(paths))
+    contents = []
+    for path in paths:
+        with open(path) as f:
+            contents.append(f.read())
+    return contents
+
+
+def make_tasks(root, n_samples=3):
+    tasks = []
+    for i in range(n_samples):
+        paths = []
+        for j in range(2):
+            path = os.path.join(root, f'B_{i}_{j}.txt')
+            with open(path, 'w') as f:
+                f.write(f'sample {i} file {j}\n')
+            paths.append(path)
+        tasks.append(paths)
+    return tasks
+
+
+def run(tasks, output_file, cache=True):
+    """运行一次预处理并写出输出文件,返回统计信息和各工作单元的结果"""
+    CALLS.clear()
+    stats, results = cached_imap(parse_unit, tasks, output_file, workers=1, cache=cache)
+    if stats['unchanged']:
+        return stats, None
+    results = list(results)
+    with open(output_file, 'w') as f:
+        f.write(repr(results))
+    return stats, results
+
+
+def test_cache_hits_and_misses(tmp_path):
+    tasks = make_tasks(str(tmp_path))
+    output_file = str(tmp_path / 'out.csv')
+
+    stats, results = run(tasks, output_file)
+    assert stats['cached'] == 0 and not stats['unchanged'] and len(CALLS) == 3
+    expected = results
+
+    # 没有变化时全部命中缓存,不需要重写输出
+    stats, _ = run(tasks, output_file)
+    assert stats == {'samples': 3, 'cached': 3, 'unchanged': True} and not CALLS
+
+    # 输出文件被删除时从缓存读入全部结果重新写出
+    os.remove(output_file)
+    stats, results = run(tasks, output_file)
+    assert stats['cached'] == 3 and not stats['unchanged'] and not CALLS
+    assert results == expected
+
+    # 只有内容变化的样本重新解析
+    with open(tasks[1][0], 'w') as f:
+        f.write('changed\n')
+    stats, results = run(tasks, output_file)
+    assert stats['cached'] == 2 and CALLS == [tuple(tasks[1])]
+    assert results[1][0] == 'changed\n' and results[0] == expected[0] and results[2] == expected[2]
+
+    # 不使用缓存时全部重新解析
+    stats, _ = run(tasks, output_file, cache=False)
+    assert stats['cached'] == 0 and len(CALLS) == 3
+
+
+def test_corrupt_cache_entry_is_reparsed(tmp_path):
+    tasks = make_tasks(str(tmp_path))
+    output_file = str(tmp_path / 'out.csv')
+    _, expected = run(tasks, output_file)
+
+    cache_dir = cache_path(output_file)
+    for name in os.listdir(cache_dir):
+        if name != 'index.pkl':
+            with open(os.path.join(cache_dir, name), 'wb') as f:
+                f.write(b'truncated')
+    os.remove(output_file)
+    stats, results = run(tasks, output_file)
+    assert results == expected and len(CALLS) == 3 and stats['cached'] == 0
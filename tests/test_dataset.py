@@ -0,0 +1,99 @@
+"""数据集整理和二进制数据集读写的行为测试"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hpc_classification.dataset import (SequenceNormalizer, group_sequences, load_binary_dataset,
+                                        save_interval_dataset)
+
+EVENTS = ['cycles', 'instructions', 'cache-misses']
+
+
+def random_tensor(rng, lengths, n_timesteps):
+    """各样本超出真实长度的部分为0的计数张量"""
+    tensor = rng.integers(0, 10 ** 6, size=(len(lengths), n_timesteps, len(EVENTS)))
+    tensor[np.arange(n_timesteps) >= np.asarray(lengths)[:, None]] = 0
+    return tensor
+
+
+def test_group_sequences_reorders_and_pads():
+    rng = np.random.default_rng(0)
+    sample_ids = ['B_2', 'M_1', 'B_10', 'M_3']
+    lengths = np.array([4, 2, 3, 4])
+    tensor = random_tensor(rng, lengths, 4)
+    frame = pd.DataFrame({
+        'sample_id': np.repeat(sample_ids, lengths),
+        'timestamp_id': np.concatenate([np.arange(1, n + 1) for n in lengths]),
+        'label': np.repeat([0, 1, 0, 1], lengths),
+    })
+    features = np.concatenate([tensor[i, :n] for i, n in enumerate(lengths)])
+    # 打乱全部行的顺序,按时间点编号放回各样本
+    order = rng.permutation(len(frame))
+    frame, features = frame.iloc[order], features[order]
+
+    unique_ids, sequences, labels, result_lengths = group_sequences(
+        frame['sample_id'].to_numpy(), frame['timestamp_id'].to_numpy(), frame['label'].to_numpy(), features)
+
+    expected = np.argsort(sample_ids)
+    assert unique_ids.tolist() == sorted(sample_ids)
+    np.testing.assert_array_equal(sequences, tensor[expected])
+    np.testing.assert_array_equal(labels, [0, 0, 1, 1])
+    np.testing.assert_array_equal(result_lengths, lengths[expected])
+
+
+@pytest.mark.parametrize('timestamp_ids', [[1, 2, 2], [1, 1, 3], [1, 3, 4], [2, 3, 4]])
+def test_group_sequences_rejects_duplicate_or_missing_timestamps(timestamp_ids):
+    sample_ids = ['B_1', 'B_1', 'B_1', 'M_1', 'M_1']
+    with pytest.raises(ValueError, match='B_1') as error:
+        group_sequences(sample_ids, timestamp_ids + [2, 1], [0, 0, 0, 1, 1], np.zeros((5, 2)))
+    assert 'M_1' not in str(error.value)
+
+
+def test_interval_dataset_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    sample_ids = ['B_1', 'B_2', 'M_1']
+    lengths = np.array([5, 2, 4])
+    tensor = random_tensor(rng, lengths, 5)
+    output_file = str(tmp_path / 'interval.csv')
+    frame = save_interval_dataset(output_file, sample_ids, tensor, EVENTS, binary=True, lengths=lengths)
+    assert len(frame) == lengths.sum()
+
+    values, labels, ids, columns, saved_lengths = load_binary_dataset(output_file)
+    np.testing.assert_array_equal(values, tensor)
+    np.testing.assert_array_equal(labels, [0, 0, 1])
+    assert ids.tolist() == sample_ids and columns == EVENTS
+    np.testing.assert_array_equal(saved_lengths, lengths)
+
+    # CSV 与二进制数据集内容一致
+    csv = pd.read_csv(output_file)
+    _, sequences, _, csv_lengths = group_sequences(
+        csv['sample_id'].to_numpy(), csv['timestamp_id'].to_numpy(), csv['label'].to_numpy(), csv[EVENTS].to_numpy())
+    np.testing.assert_array_equal(sequences, tensor)
+    np.testing.assert_array_equal(csv_lengths, lengths)
+
+
+def test_stale_binary_dataset_is_ignored(tmp_path):
+    tensor = random_tensor(np.random.default_rng(3), [2, 2], 2)
+    output_file = str(tmp_path / 'interval.csv')
+    save_interval_dataset(output_file, ['B_1', 'M_1'], tensor, EVENTS, binary=True)
+    assert load_binary_dataset(output_file) is not None
+
+    # 重新生成 CSV 而没有生成二进制文件时回退到读取 CSV
+    mtime = os.path.getmtime(output_file) + 10
+    os.utime(output_file, (mtime, mtime))
+    assert load_binary_dataset(output_file) is None
+
+
+def test_transform_sequences_keeps_padding_zero():
+    rng = np.random.default_rng(2)
+    lengths = np.array([3, 1, 4])
+    tensor = random_tensor(rng, lengths, 4)
+    normalizer = SequenceNormalizer(chunk_size=2).fit(tensor, lengths)
+    out = normalizer.transform_sequences(tensor, lengths)
+    mask = np.arange(4) < lengths[:, None]
+    assert np.all(out[~mask] == 0)
+    np.testing.assert_allclose(out[mask], normalizer.transform(tensor[mask]), rtol=1e-6)
+    # 只用真实长度内的时间点拟合,归一化后各事件均值为0
+    np.testing.assert_allclose(out[mask].mean(axis=0), 0, atol=1e-5)
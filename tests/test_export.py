@@ -0,0 +1,55 @@
+"""导出模型与原模型输出一致性的测试"""
+import numpy as np
+import pytest
+import torch
+
+from hpc_classification.export import ExportableClassifier, export_onnx, export_torchscript
+from hpc_classification.tsc import BiLSTMAttentionClassifier, BiLSTMClassifier, LSTMClassifier
+
+INPUT_SIZE = 5
+MODELS = (LSTMClassifier, BiLSTMClassifier, BiLSTMAttentionClassifier)
+
+
+def eager_probs(model, x, lengths):
+    """原模型的恶意概率,各样本只使用真实长度内的时间点"""
+    with torch.no_grad():
+        outputs = model(x, lengths)
+    outputs = outputs[0] if isinstance(outputs, tuple) else outputs
+    return outputs.squeeze(1)
+
+
+def variable_length_inputs():
+    torch.manual_seed(1)
+    x = torch.randn(4, 11, INPUT_SIZE)
+    lengths = torch.tensor([11, 3, 7, 1])
+    x[torch.arange(11) >= lengths.unsqueeze(1)] = 0
+    return x, lengths
+
+
+@pytest.mark.parametrize('model_class', MODELS)
+def test_torchscript_matches_eager(model_class, tmp_path):
+    torch.manual_seed(0)
+    model = model_class(INPUT_SIZE, 8, 1).eval()
+    x, lengths = variable_length_inputs()
+    expected = eager_probs(model, x, lengths)
+    with torch.no_grad():
+        torch.testing.assert_close(ExportableClassifier(model).eval()(x, lengths), expected, atol=1e-5, rtol=0)
+
+    path = str(tmp_path / 'model.pt')
+    export_torchscript(model, path, INPUT_SIZE)
+    with torch.no_grad():
+        torch.testing.assert_close(torch.jit.load(path)(x, lengths), expected, atol=1e-5, rtol=0)
+
+
+@pytest.mark.parametrize('model_class', MODELS)
+def test_onnx_matches_eager(model_class, tmp_path):
+    pytest.importorskip('onnx')
+    onnxruntime = pytest.importorskip('onnxruntime')
+    torch.manual_seed(0)
+    model = model_class(INPUT_SIZE, 8, 1).eval()
+    x, lengths = variable_length_inputs()
+    path = str(tmp_path / 'model.onnx')
+    export_onnx(model, path, INPUT_SIZE)
+    session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
+    probs, = session.run(None, {'x': x.numpy(), 'lengths': lengths.numpy()})
+    np.testing.assert_allclose(probs, eager_probs(model, x, lengths).numpy(), atol=1e-5)
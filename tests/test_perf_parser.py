@@ -0,0 +1,93 @@
+"""向量化 perf 解析引擎与逐行解析的一致性测试"""
+import numpy as np
+
+from hpc_classification.perf_parser import parse_perf_buffer, records_to_counts, records_to_intervals
+
+EVENTS = ['branch-instructions', 'branch-misses', 'cache-misses', 'LLC-loads', 'LLC-load-misses']
+
+
+def parse_intervals_by_line(text, events):
+    """原预处理脚本的逐行解析方式:时间戳变化即开始新的间隔,后出现的值覆盖先出现的值"""
+    times, rows = [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        if parts[1] == '<not' and len(parts) >= 4:
+            value, event = 0, parts[3]
+        else:
+            try:
+                value = int(parts[1].replace(',', ''))
+            except ValueError:
+                value = 0
+            event = parts[2]
+        time = float(parts[0])
+        if not times or times[-1] != time:
+            times.append(time)
+            rows.append({})
+        if event in events:
+            rows[-1][events.index(event)] = value
+    values = np.zeros((len(times), len(events)), dtype=np.int64)
+    for i, row in enumerate(rows):
+        for event_id, value in row.items():
+            values[i, event_id] = value
+    return np.array(times), values
+
+
+def random_interval_text(rng, n_intervals):
+    """生成带注释、千位分隔符、<not counted>、未知事件和重复事件的间隔模式输出"""
+    lines = ['# started on Mon Jan  1 00:00:00 2024', '']
+    for i in range(n_intervals):
+        time = f"{(i + 1) * 0.1 + rng.random() * 1e-3:.9f}"
+        for _ in range(rng.integers(1, 8)):
+            event = rng.choice(EVENTS + ['instructions', 'cycles'])
+            kind = rng.integers(0, 4)
+            if kind == 0:
+                value = '<not counted>'
+            elif kind == 1:
+                value = f"{rng.integers(0, 10 ** 12):,}"
+            else:
+                value = str(rng.integers(0, 10 ** 6))
+            lines.append(f"{' ' * rng.integers(0, 6)}{time} {value:>20} {event}  # {rng.random():.2f}% of all")
+        if rng.random() < 0.2:
+            lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def test_interval_parser_matches_line_by_line():
+    rng = np.random.default_rng(0)
+    for trial in range(50):
+        text = random_interval_text(rng, rng.integers(0, 20))
+        if trial % 2:
+            text = text.replace('\n', '\r\n')
+        expected_times, expected_values = parse_intervals_by_line(text, EVENTS)
+        times, values, _ = records_to_intervals(parse_perf_buffer(text.encode(), EVENTS), len(EVENTS))
+        np.testing.assert_allclose(times, expected_times)
+        np.testing.assert_array_equal(values, expected_values)
+
+
+def test_counts_mode():
+    text = (
+        "# started on Mon Jan  1 00:00:00 2024\n"
+        "\n"
+        " Performance counter stats for 'sleep 1':\n"
+        "\n"
+        "     1,234,567      branch-instructions\n"
+        "           890      branch-misses             #    0.07% of all branches\n"
+        "   <not counted>      cache-misses\n"
+        "            42      unknown-event\n"
+        "            77      branch-misses\n"
+        "\n"
+        "       1.001 seconds time elapsed\n"
+    )
+    values, present = records_to_counts(parse_perf_buffer(text.encode(), EVENTS, interval=False), len(EVENTS))
+    np.testing.assert_array_equal(values, [1234567, 77, 0, 0, 0])
+    np.testing.assert_array_equal(present, [True, True, False, False, False])
+
+
+def test_empty_buffer():
+    times, values, present = records_to_intervals(parse_perf_buffer(b'# only a comment\n', EVENTS), len(EVENTS))
+    assert times.shape == (0,) and values.shape == (0, len(EVENTS)) and present.shape == (0, len(EVENTS))
@@ -0,0 +1,53 @@
+"""共享交叉验证折的超参数搜索和按样本ID分组划分的测试"""
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.model_selection import GridSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from hpc_classification.search import FoldCache, grid_search, group_train_test_split
+
+
+def test_grid_search_matches_grid_search_cv():
+    X, y = make_classification(n_samples=120, n_features=6, random_state=0)
+    param_grid = {'n_neighbors': [1, 3, 5, 9, 15], 'weights': ['uniform', 'distance']}
+    with FoldCache(X, y, n_splits=5, n_jobs=1) as folds:
+        assert len(folds.folds) == 5
+        for X_train, _, _, _ in folds.folds:  # 每一折只用训练部分拟合标准化器
+            np.testing.assert_allclose(X_train.mean(axis=0), 0, atol=1e-8)
+        best_params, n_candidates = grid_search(KNeighborsClassifier(), param_grid, folds)
+
+    # 与每折内标准化的 GridSearchCV(cv=5) 选出相同的参数
+    reference = GridSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()),
+                             {f'kneighborsclassifier__{k}': v for k, v in param_grid.items()}, cv=5).fit(X, y)
+    assert n_candidates == 10
+    assert best_params == {k.split('__')[1]: v for k, v in reference.best_params_.items()}
+
+
+def grouped_rows(rng, n_groups=40, repeats=5):
+    """每个样本重复采样 repeats 次,同一样本的各行标签相同"""
+    groups = np.repeat([f"{'M' if i % 2 else 'B'}_{i}" for i in range(n_groups)], repeats)
+    y = np.repeat(np.arange(n_groups) % 2, repeats)
+    order = rng.permutation(len(groups))
+    return groups[order], y[order]
+
+
+def test_group_train_test_split_keeps_groups_apart():
+    groups, y = grouped_rows(np.random.default_rng(0))
+    train_index, test_index = group_train_test_split(y, groups, test_size=0.25)
+    assert sorted(np.r_[train_index, test_index]) == list(range(len(y)))
+    assert not set(groups[train_index]) & set(groups[test_index])
+    # 在样本这一级保持类别比例
+    test_groups = np.unique(groups[test_index])
+    assert len(test_groups) == 10
+    assert sum(group.startswith('M') for group in test_groups) == 5
+
+
+def test_fold_cache_keeps_groups_apart():
+    groups, y = grouped_rows(np.random.default_rng(1))
+    X = np.random.default_rng(2).normal(size=(len(y), 3))
+    splits = list(FoldCache(X, y, groups=groups, n_splits=4, n_jobs=1).split())
+    assert len(splits) == 4
+    for train_index, val_index in splits:
+        assert not set(groups[train_index]) & set(groups[val_index])
@@ -0,0 +1,77 @@
+"""实时分类服务的行为测试"""
+import asyncio
+import io
+import json
+import threading
+
+import numpy as np
+
+from hpc_classification.streaming import RingBuffer, StreamingClassifier
+from hpc_classification.tsc import LSTMClassifier
+
+
+def test_ring_buffer_keeps_latest_intervals():
+    buffer = RingBuffer(4, 2)
+    buffer.extend(np.arange(6, dtype=np.float32).reshape(3, 2))
+    buffer.extend(np.arange(6, 12, dtype=np.float32).reshape(3, 2))
+    np.testing.assert_array_equal(buffer.window(), np.arange(4, 12).reshape(4, 2))
+
+
+def run_infer_loop(service, timeout=0.5):
+    """运行推理任务直到队列为空后超时,返回输出的判定结果行"""
+    async def run():
+        try:
+            await asyncio.wait_for(service.infer_loop(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    asyncio.run(run())
+    return service.output.getvalue().splitlines()
+
+
+def test_recreated_container_without_new_intervals_is_skipped():
+    for stateful in (True, False):
+        service = StreamingClassifier(LSTMClassifier(2, 4, 1).eval(), ['a', 'b'], window=4,
+                                      output=io.StringIO(), stateful=stateful)
+        service.queue = asyncio.Queue()
+        # 输出文件被删除后重新创建:缓冲区已重新加入,但还没有读到新间隔,容器ID仍在队列中
+        service.buffers['c'] = RingBuffer(4, 2)
+        service.queued.add('c')
+        service.queue.put_nowait('c')
+        assert run_infer_loop(service) == []
+
+
+def write_intervals(path, n_intervals, events):
+    """写入 n_intervals 个完整采样间隔的 perf stat -I 输出"""
+    with open(path, 'w') as f:
+        f.write('# started on Mon Jan  1 00:00:00 2024\n')
+        for i in range(n_intervals):
+            for j, event in enumerate(events):
+                f.write(f"{(i + 1) * 0.1:.9f} {100 * (i + 1) + j:>12} {event}\n")
+
+
+def test_poll_loop_reads_files_off_the_event_loop(tmp_path):
+    events = ['a', 'b']
+    for name in ('c1', 'c2'):
+        write_intervals(tmp_path / f'{name}.txt', 3, events)
+    service = StreamingClassifier(LSTMClassifier(2, 4, 1).eval(), events, window=4,
+                                  poll_interval=0.01, output=io.StringIO())
+    threads = []
+    read = service.read
+
+    def recording_read(tailers):
+        threads.append(threading.current_thread())
+        return read(tailers)
+
+    service.read = recording_read
+
+    async def run():
+        try:
+            await asyncio.wait_for(service.run([str(tmp_path)]), 1.0)
+        except asyncio.TimeoutError:
+            pass
+    asyncio.run(run())
+
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+    verdicts = [json.loads(line) for line in service.output.getvalue().splitlines()]
+    assert {verdict['container'] for verdict in verdicts} == {'c1', 'c2'}
+    assert all(verdict['intervals'] == 3 for verdict in verdicts)
@@ -0,0 +1,142 @@
+"""时序分类模型的行为测试"""
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+
+from hpc_classification.dataset import save_interval_dataset
+from hpc_classification.tsc import (BiLSTMAttentionClassifier, BiLSTMClassifier, LSTMClassifier, TensorBatches,
+                                    load_and_preprocess_data, load_sequences, score_batch, select_test_split,
+                                    train_model, validation_loss)
+
+
+def single_window(model, window):
+    """单独对一个窗口做前向计算,没有数据的窗口按一个全0时间点处理"""
+    if len(window) == 0:
+        window = np.zeros((1, window.shape[1]), dtype=np.float32)
+    with torch.no_grad():
+        outputs = model(torch.from_numpy(np.asarray(window, dtype=np.float32)).unsqueeze(0))
+    if isinstance(outputs, tuple):
+        return float(outputs[0]), outputs[1].reshape(-1).numpy()
+    return float(outputs), None
+
+
+def test_score_batch_matches_single_windows():
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    windows = [rng.normal(size=(n, 5)).astype(np.float32) for n in (3, 0, 7, 1, 5)]
+    for model in (LSTMClassifier(5, 8, 1).eval(), BiLSTMAttentionClassifier(5, 8, 1).eval()):
+        ids = [f'c{i}' for i in range(len(windows))]
+        scores = score_batch(model, windows, container_ids=ids, max_batch=2)
+        assert list(scores) == ids
+        for container_id, window in zip(ids, windows):
+            prob, attention = single_window(model, window)
+            assert np.isclose(scores[container_id]['probability'], prob, atol=1e-6)
+            if attention is None:
+                assert scores[container_id]['attention'] is None
+            else:
+                np.testing.assert_allclose(scores[container_id]['attention'], attention, atol=1e-6)
+
+
+def test_score_batch_empty_window():
+    model = LSTMClassifier(5, 8, 1).eval()
+    scores = score_batch(model, [np.ones((3, 5)), np.zeros((0, 5))])
+    assert np.isclose(scores[1]['probability'], single_window(model, np.zeros((0, 5)))[0], atol=1e-6)
+
+
+def stream_chunks(model, x, sizes, **kwargs):
+    """把序列按 sizes 切成若干段依次调用 forward_step,返回最后一次的预测概率"""
+    state, start = None, 0
+    with torch.no_grad():
+        for size in sizes:
+            outputs = model.forward_step(x[:, start:start + size], state, **kwargs)
+            state, start = outputs[-1], start + size
+    return outputs[0]
+
+
+def test_forward_step_matches_forward():
+    torch.manual_seed(0)
+    x = torch.randn(2, 12, 5)
+    sizes = (1, 4, 2, 5)
+    model = LSTMClassifier(5, 8, 1).eval()
+    with torch.no_grad():
+        expected = model(x)
+    torch.testing.assert_close(stream_chunks(model, x, sizes), expected)
+
+    # 双向模型在已到达的间隔数不超过 window 时与完整的前向计算相同
+    for model in (BiLSTMClassifier(5, 8, 1).eval(), BiLSTMAttentionClassifier(5, 8, 1).eval()):
+        with torch.no_grad():
+            expected = model(x)
+        expected = expected[0] if isinstance(expected, tuple) else expected
+        torch.testing.assert_close(stream_chunks(model, x, sizes, window=12), expected)
+
+
+def test_select_test_split_uses_recorded_ids(tmp_path):
+    rng = np.random.default_rng(0)
+    sample_ids = [f'{kind}_{i}' for kind in 'BM' for i in range(10)]
+    tensor = rng.integers(0, 1000, size=(20, 4, 3))
+    lengths = rng.integers(1, 5, size=20)
+    tensor[np.arange(4) >= lengths[:, None]] = 0
+    file_path = str(tmp_path / 'interval.csv')
+    save_interval_dataset(file_path, sample_ids, tensor, ['a', 'b', 'c'], lengths=lengths)
+    _, _, test_loader, y_test, _, _ = load_and_preprocess_data(file_path, normalize=False)
+    test_ids = test_loader.sample_ids.tolist()
+
+    # 数据集加入新样本后重新划分的测试集不同,按记录的样本ID仍然得到训练时的测试集
+    extra = rng.integers(0, 1000, size=(5, 4, 3))
+    save_interval_dataset(file_path, sample_ids + [f'B_new{i}' for i in range(5)],
+                          np.concatenate([tensor, extra]), ['a', 'b', 'c'], lengths=np.r_[lengths, [4] * 5])
+    data = load_sequences(file_path)
+    X_test, len_test, y_selected = select_test_split(data, test_ids)
+    X_expected, len_expected, _ = test_loader.dataset.tensors
+    torch.testing.assert_close(X_test, X_expected)
+    torch.testing.assert_close(len_test, len_expected)
+    torch.testing.assert_close(y_selected, y_test)
+
+    with pytest.raises(ValueError, match='B_gone'):
+        select_test_split(data, test_ids + ['B_gone'])
+    with pytest.raises(ValueError):
+        select_test_split(data, None)
+
+
+class UnstableBF16LSTM(LSTMClassifier):
+    """第一轮之后 bfloat16 下的训练输出为 NaN 的 LSTM,用于触发改用 float32 的保护"""
+    def __init__(self, *args, batches_per_epoch):
+        super().__init__(*args)
+        self.batches_per_epoch = batches_per_epoch
+        self.training_calls = 0
+
+    def forward(self, x, lengths=None):
+        out = super().forward(x, lengths)
+        if self.training and torch.is_autocast_enabled('cpu'):
+            self.training_calls += 1
+            if self.training_calls > self.batches_per_epoch:
+                out = out * float('nan')
+        return out
+
+
+def small_loaders():
+    torch.manual_seed(0)
+    X = torch.randn(48, 6, 5)
+    lengths = torch.randint(1, 7, (48,))
+    y = (X[:, 0, 0] > 0).float()
+    train_loader = TensorBatches((X[:32], lengths[:32], y[:32]), 8)
+    val_loader = TensorBatches((X[32:], lengths[32:], y[32:]), 8)
+    return train_loader, val_loader
+
+
+def test_bf16_fallback_reports_float32_loss():
+    train_loader, val_loader = small_loaders()
+    model = UnstableBF16LSTM(5, 8, 1, batches_per_epoch=len(train_loader))
+    report = train_model(model, train_loader, val_loader, num_epochs=4, patience=2, autocast=True)
+    assert report['dtype'] == 'bfloat16->float32'
+    assert report['epochs'] == 4 and 'bf16_val_loss' in report
+    # 报告的最低验证损失是恢复的参数在 float32 下的验证损失
+    loss = validation_loss(model, val_loader, nn.BCELoss(), torch.device('cpu'))
+    assert np.isclose(report['best_val_loss'], loss, atol=1e-6)
+
+
+def test_train_model_zero_epochs():
+    train_loader, val_loader = small_loaders()
+    report = train_model(LSTMClassifier(5, 8, 1), train_loader, val_loader, num_epochs=0)
+    assert report['epochs'] == 0 and report['best_epoch'] == 0 and not report['stopped_early']